@@ -4,12 +4,18 @@ Finance Forecast API for Glance Dashboard
 Provides savings forecasts, investment projections, and insurance tracking
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, Response, g
 from flask_cors import CORS
+from collections import OrderedDict
+from functools import wraps
+import copy
+import hashlib
 import json
 import os
-from datetime import datetime, timedelta
+import threading
+from datetime import datetime
 import math
+import numpy as np
 
 app = Flask(__name__)
 CORS(app)
@@ -19,11 +25,37 @@ CONFIG_DIR = os.environ.get('CONFIG_DIR', '/app/config')
 INSURANCE_FILE = os.path.join(CONFIG_DIR, 'insurance.json')
 SAVINGS_FILE = os.path.join(CONFIG_DIR, 'savings.json')
 
+# Monte Carlo defaults
+DEFAULT_PATHS = 10000
+MAX_PATHS = 50000
+MAX_YEARS = 60
+SIMULATION_BLOCK = 2000
+
+# Memoized forecast responses, keyed by config + query params
+RESPONSE_CACHE_SIZE = 128
+response_cache = OrderedDict()   # key -> (body, etag)
+config_cache = {}                # filepath -> ((mtime_ns, size), data)
+cache_lock = threading.Lock()
+
 def load_json_file(filepath, default=None):
-    """Load JSON file with fallback to default"""
+    """Load JSON file with fallback to default.
+
+    Parsed contents are kept until the file's mtime or size changes; callers
+    get their own copy.
+    """
     try:
+        st = os.stat(filepath)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with cache_lock:
+            cached = config_cache.get(filepath)
+        if cached and cached[0] == stamp:
+            return copy.deepcopy(cached[1])
+
         with open(filepath, 'r') as f:
-            return json.load(f)
+            data = json.load(f)
+        with cache_lock:
+            config_cache[filepath] = (stamp, data)
+        return copy.deepcopy(data)
     except (FileNotFoundError, json.JSONDecodeError):
         return default if default is not None else {}
 
@@ -32,6 +64,61 @@ def save_json_file(filepath, data):
     os.makedirs(os.path.dirname(filepath), exist_ok=True)
     with open(filepath, 'w') as f:
         json.dump(data, f, indent=2)
+    invalidate_cache(filepath)
+
+def invalidate_cache(filepath=None):
+    """Drop memoized responses, and the parsed copy of filepath if given"""
+    with cache_lock:
+        if filepath:
+            config_cache.pop(filepath, None)
+        response_cache.clear()
+
+def memoized_response(*config_files):
+    """Cache a JSON view's response by a hash of its config files and query params.
+
+    Responses carry an ETag; a matching If-None-Match gets a 304. Entries for
+    an old config simply stop being hit when the config changes (its hash is
+    part of the key) and age out of the LRU. The key is also exposed as
+    g.cache_key so views can derive a stable default seed from it.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key_source = json.dumps({
+                'path': request.path,
+                'args': sorted(request.args.items(multi=True)),
+                'config': [load_json_file(f) for f in config_files],
+                'date': str(datetime.now().date()),
+            }, sort_keys=True, default=str)
+            key = hashlib.blake2b(key_source.encode(), digest_size=16).hexdigest()
+            g.cache_key = key
+
+            with cache_lock:
+                cached = response_cache.get(key)
+                if cached:
+                    response_cache.move_to_end(key)
+
+            if cached is None:
+                resp = app.make_response(view(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+                body = resp.get_data()
+                cached = (body, hashlib.blake2b(body, digest_size=12).hexdigest())
+                with cache_lock:
+                    response_cache[key] = cached
+                    while len(response_cache) > RESPONSE_CACHE_SIZE:
+                        response_cache.popitem(last=False)
+
+            body, etag = cached
+            if request.if_none_match.contains(etag):
+                resp = Response(status=304)
+            else:
+                resp = Response(body, mimetype='application/json')
+            resp.set_etag(etag)
+            resp.headers['Cache-Control'] = 'no-cache'
+            return resp
+        return wrapper
+    return decorator
 
 def calculate_compound_growth(principal, monthly_contribution, annual_rate, years):
     """Calculate compound growth with monthly contributions"""
@@ -47,26 +134,117 @@ def calculate_compound_growth(principal, monthly_contribution, annual_rate, year
     else:
         return principal + (monthly_contribution * months)
 
-def generate_forecast_series(principal, monthly_contribution, annual_rate, years):
-    """Generate yearly forecast data points"""
+def grow(principal, monthly_contribution, monthly_rates):
+    """Balance after each month for one or many return paths.
+
+    monthly_rates has shape (months,) or (paths, months). Contributions are
+    made at the end of each month, matching calculate_compound_growth.
+    Returns an array with one more column than monthly_rates, starting at the
+    principal.
+    """
+    # B_t = G_t * (P + PMT * sum_{k<=t} 1/G_k), with G_t the cumulative growth factor
+    growth = np.cumprod(1 + monthly_rates, axis=-1)
+    balances = growth * (principal + monthly_contribution * np.cumsum(1 / growth, axis=-1))
+    start = np.full(balances.shape[:-1] + (1,), float(principal))
+    return np.concatenate([start, balances], axis=-1)
+
+def forecast_trajectory(principal, monthly_contribution, annual_rate, years):
+    """Deterministic monthly balances for a fixed annual rate"""
+    return grow(principal, monthly_contribution, np.full(years * 12, annual_rate / 12))
+
+def simulate_paths(principal, monthly_contribution, mean_return, volatility, years,
+                   paths=DEFAULT_PATHS, inflation=0.0, seed=None):
+    """Monte Carlo year-end balances, shape (paths, years + 1).
+
+    Monthly growth factors are lognormal with mean 1 + mean_return / 12 (so a
+    zero volatility reproduces forecast_trajectory) and annual volatility.
+    Paths are simulated in blocks of SIMULATION_BLOCK to bound memory. With
+    inflation set, balances are deflated to today's money.
+    """
+    rng = np.random.default_rng(seed)
+    months = years * 12
+    monthly_vol = volatility / math.sqrt(12)
+    monthly_drift = math.log1p(mean_return / 12) - monthly_vol ** 2 / 2
+    year_ends = slice(11, None, 12)
+
+    balances = np.empty((paths, years + 1))
+    balances[:, 0] = principal
+    for start in range(0, paths, SIMULATION_BLOCK):
+        block = min(SIMULATION_BLOCK, paths - start)
+        # Log growth, then 1/G_t and its running sum, all in place
+        inv_growth = rng.standard_normal((block, months))
+        inv_growth *= monthly_vol
+        inv_growth += monthly_drift
+        np.cumsum(inv_growth, axis=1, out=inv_growth)
+        np.negative(inv_growth, out=inv_growth)
+        np.exp(inv_growth, out=inv_growth)
+        discounted = np.cumsum(inv_growth, axis=1)
+        balances[start:start + block, 1:] = (
+            (principal + monthly_contribution * discounted[:, year_ends]) / inv_growth[:, year_ends]
+        )
+
+    if inflation:
+        balances /= (1 + inflation) ** np.arange(years + 1)
+    return balances
+
+def percentile_bands(balances):
+    """p10/p50/p90 of yearly balances across simulated paths"""
+    p10, p50, p90 = np.percentile(balances, [10, 50, 90], axis=0)
+    return {'p10': p10, 'p50': p50, 'p90': p90}
+
+def generate_forecast_series(principal, monthly_contribution, annual_rate, years, bands=None):
+    """Generate yearly forecast data points, with Monte Carlo bands when given"""
+    values = forecast_trajectory(principal, monthly_contribution, annual_rate, years)[::12]
+    this_year = datetime.now().year
     data_points = []
-    for year in range(years + 1):
-        value = calculate_compound_growth(principal, monthly_contribution, annual_rate, year)
-        data_points.append({
+    for year, value in enumerate(values.tolist()):
+        contributions = principal + (monthly_contribution * 12 * year)
+        point = {
             'year': year,
-            'date': (datetime.now() + timedelta(days=year*365)).strftime('%Y'),
+            'date': str(this_year + year),
             'value': round(value, 2),
-            'contributions': round(principal + (monthly_contribution * 12 * year), 2),
-            'growth': round(value - principal - (monthly_contribution * 12 * year), 2)
-        })
+            'contributions': round(contributions, 2),
+            'growth': round(value - contributions, 2)
+        }
+        if bands:
+            for band, band_values in bands.items():
+                point[band] = round(float(band_values[year]), 2)
+        data_points.append(point)
     return data_points
 
+def monte_carlo_params(default_volatility, config=None):
+    """Read Monte Carlo query params (volatility, inflation, paths, seed).
+
+    Without a seed param, the seed is derived from the response cache key, so
+    the same config and query give the same bands on every worker and miss.
+    """
+    config = config or {}
+    volatility = float(request.args.get('volatility', config.get('volatility', default_volatility)))
+    inflation = float(request.args.get('inflation', config.get('inflation', 0)))
+    paths = min(max(int(request.args.get('paths', DEFAULT_PATHS)), 1), MAX_PATHS)
+    seed = request.args.get('seed', type=int)
+    if seed is None and 'cache_key' in g:
+        seed = int(g.cache_key, 16)
+    return volatility, inflation, paths, seed
+
+def monte_carlo_summary(bands, volatility, inflation, paths):
+    """Monte Carlo settings and horizon percentiles for the response"""
+    return {
+        'paths': paths,
+        'volatility': volatility,
+        'inflation': inflation,
+        'p10': round(float(bands['p10'][-1]), 2),
+        'p50': round(float(bands['p50'][-1]), 2),
+        'p90': round(float(bands['p90'][-1]), 2)
+    }
+
 @app.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint"""
     return jsonify({'status': 'healthy', 'service': 'finance-forecast-api'})
 
 @app.route('/api/savings-forecast', methods=['GET'])
+@memoized_response(SAVINGS_FILE)
 def savings_forecast():
     """
     Calculate savings forecast
@@ -75,6 +253,10 @@ def savings_forecast():
     - monthly: monthly contribution (default from config)
     - rate: annual interest rate as decimal (default 0.05 = 5%)
     - years: forecast years (default 10)
+    - volatility: annual rate volatility for the Monte Carlo bands (default 0.01)
+    - inflation: annual inflation; bands are in today's money when set (default 0)
+    - paths: simulated paths (default 10000)
+    - seed: random seed for reproducible bands
     """
     # Load saved configuration
     savings_config = load_json_file(SAVINGS_FILE, {
@@ -88,10 +270,12 @@ def savings_forecast():
     balance = float(request.args.get('balance', savings_config.get('current_balance', 10000)))
     monthly = float(request.args.get('monthly', savings_config.get('monthly_contribution', 500)))
     rate = float(request.args.get('rate', savings_config.get('interest_rate', 0.05)))
-    years = int(request.args.get('years', 10))
+    years = min(max(int(request.args.get('years', 10)), 0), MAX_YEARS)
+    volatility, inflation, paths, seed = monte_carlo_params(0.01, savings_config)
 
     # Calculate projections
-    forecast_data = generate_forecast_series(balance, monthly, rate, years)
+    bands = percentile_bands(simulate_paths(balance, monthly, rate, volatility, years, paths, inflation, seed))
+    forecast_data = generate_forecast_series(balance, monthly, rate, years, bands)
 
     projected_5yr = calculate_compound_growth(balance, monthly, rate, 5)
     projected_10yr = calculate_compound_growth(balance, monthly, rate, 10)
@@ -108,10 +292,12 @@ def savings_forecast():
         'total_contributions_10yr': round(balance + (monthly * 12 * 10), 2),
         'growth_5yr': round(projected_5yr - balance - (monthly * 12 * 5), 2),
         'growth_10yr': round(projected_10yr - balance - (monthly * 12 * 10), 2),
+        'monte_carlo': monte_carlo_summary(bands, volatility, inflation, paths),
         'forecast': forecast_data
     })
 
 @app.route('/api/investment-forecast', methods=['GET'])
+@memoized_response()
 def investment_forecast():
     """
     Calculate investment portfolio forecast
@@ -120,14 +306,20 @@ def investment_forecast():
     - return_rate: expected annual return (default 0.07 = 7%)
     - monthly: monthly investment (default 0)
     - years: forecast years (default 10)
+    - volatility: annual return volatility for the Monte Carlo bands (default 0.15)
+    - inflation: annual inflation; bands are in today's money when set (default 0)
+    - paths: simulated paths (default 10000)
+    - seed: random seed for reproducible bands
     """
     portfolio = float(request.args.get('portfolio', 50000))
     return_rate = float(request.args.get('return_rate', 0.07))
     monthly = float(request.args.get('monthly', 0))
-    years = int(request.args.get('years', 10))
+    years = min(max(int(request.args.get('years', 10)), 0), MAX_YEARS)
+    volatility, inflation, paths, seed = monte_carlo_params(0.15)
 
     # Calculate projections
-    forecast_data = generate_forecast_series(portfolio, monthly, return_rate, years)
+    bands = percentile_bands(simulate_paths(portfolio, monthly, return_rate, volatility, years, paths, inflation, seed))
+    forecast_data = generate_forecast_series(portfolio, monthly, return_rate, years, bands)
 
     # Calculate with different scenarios
     conservative = calculate_compound_growth(portfolio, monthly, return_rate * 0.5, years)  # 50% of expected
@@ -146,6 +338,7 @@ def investment_forecast():
         },
         'projected_5yr': round(calculate_compound_growth(portfolio, monthly, return_rate, 5), 2),
         'projected_10yr': round(expected, 2),
+        'monte_carlo': monte_carlo_summary(bands, volatility, inflation, paths),
         'forecast': forecast_data
     })
 
@@ -207,6 +400,7 @@ def update_savings_config():
     return jsonify({'status': 'success', 'message': 'Savings configuration updated'})
 
 @app.route('/api/net-worth-summary', methods=['GET'])
+@memoized_response(SAVINGS_FILE)
 def net_worth_summary():
     """
     Get a summary of net worth including savings and investments
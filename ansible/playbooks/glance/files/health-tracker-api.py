@@ -11,7 +11,11 @@ from flask_cors import CORS
 import json
 import os
 import time
+import atexit
+import sqlite3
+import threading
 import requests
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 
 app = Flask(__name__)
@@ -20,7 +24,7 @@ CORS(app)
 # Configuration paths
 CONFIG_DIR = os.environ.get('CONFIG_DIR', '/app/config')
 TOKENS_FILE = os.path.join(CONFIG_DIR, 'strava_tokens.json')
-ACTIVITIES_FILE = os.path.join(CONFIG_DIR, 'activities_cache.json')
+ACTIVITIES_DB = os.path.join(CONFIG_DIR, 'activities.db')
 WEIGHT_FILE = os.path.join(CONFIG_DIR, 'weight_log.json')
 SETTINGS_FILE = os.path.join(CONFIG_DIR, 'settings.json')
 
@@ -28,6 +32,9 @@ STRAVA_AUTH_URL = 'https://www.strava.com/oauth/authorize'
 STRAVA_TOKEN_URL = 'https://www.strava.com/oauth/token'
 STRAVA_API_URL = 'https://www.strava.com/api/v3'
 
+# Re-fetch this far behind the newest stored activity to pick up edits
+SYNC_OVERLAP_HOURS = int(os.environ.get('SYNC_OVERLAP_HOURS', '48'))
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -102,53 +109,372 @@ def strava_get(path, params=None):
     app.logger.error(f'Strava API {path} returned {resp.status_code}')
     return None
 
-def sync_activities():
-    """Fetch last N days of activities from Strava, cache them."""
-    settings = get_settings()
-    cache = load_json(ACTIVITIES_FILE, {'last_fetched': 0, 'activities': []})
-    ttl = settings.get('cache_ttl_minutes', 30) * 60
-    if time.time() - cache.get('last_fetched', 0) < ttl:
-        return cache['activities']
+# ---------------------------------------------------------------------------
+# Activity store (SQLite, kept fresh by a background sync thread)
+# ---------------------------------------------------------------------------
 
-    days = settings.get('calendar_days', 60)
-    after = int((datetime.now() - timedelta(days=days)).timestamp())
-    page = 1
-    all_acts = []
-    while True:
-        data = strava_get('/athlete/activities', {
-            'after': after, 'per_page': 100, 'page': page
-        })
-        if not data:
-            break
-        all_acts.extend(data)
-        if len(data) < 100:
-            break
-        page += 1
-
-    processed = []
-    for a in all_acts:
-        processed.append({
-            'id': a.get('id'),
-            'name': a.get('name', ''),
-            'type': a.get('type', 'Workout'),
-            'sport_type': a.get('sport_type', a.get('type', 'Workout')),
-            'date': a.get('start_date_local', '')[:10],
-            'start_time': a.get('start_date_local', ''),
-            'distance_m': a.get('distance', 0),
-            'moving_time_s': a.get('moving_time', 0),
-            'elapsed_time_s': a.get('elapsed_time', 0),
-            'elevation_gain': a.get('total_elevation_gain', 0),
-            'average_speed': a.get('average_speed', 0),
-            'max_speed': a.get('max_speed', 0),
-            'average_heartrate': a.get('average_heartrate'),
-            'max_heartrate': a.get('max_heartrate'),
-            'calories': a.get('calories', 0),
-            'kudos': a.get('kudos_count', 0),
-        })
+ACTIVITY_COLUMNS = (
+    'id', 'name', 'type', 'sport_type', 'date', 'start_time', 'start_epoch',
+    'distance_m', 'moving_time_s', 'elapsed_time_s', 'elevation_gain',
+    'average_speed', 'max_speed', 'average_heartrate', 'max_heartrate',
+    'calories', 'kudos',
+)
+
+RIDE_TYPES = ('Ride', 'VirtualRide')
+GYM_TYPES = ('WeightTraining', 'Workout', 'Crossfit')
+
+# Bump to rebuild the aggregate tables from activities on startup
+AGGREGATES_VERSION = '1'
 
-    cache = {'last_fetched': time.time(), 'activities': processed}
-    save_json(ACTIVITIES_FILE, cache)
-    return processed
+sync_lock = threading.Lock()
+athlete_stats_lock = threading.Lock()
+sync_wakeup = threading.Event()
+stop_event = threading.Event()
+sync_thread = None
+
+def init_db():
+    os.makedirs(CONFIG_DIR, exist_ok=True)
+    with get_db() as conn:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS activities (
+                id INTEGER PRIMARY KEY,
+                name TEXT,
+                type TEXT,
+                sport_type TEXT,
+                date TEXT,
+                start_time TEXT,
+                start_epoch INTEGER,
+                distance_m REAL,
+                moving_time_s INTEGER,
+                elapsed_time_s INTEGER,
+                elevation_gain REAL,
+                average_speed REAL,
+                max_speed REAL,
+                average_heartrate REAL,
+                max_heartrate REAL,
+                calories REAL,
+                kudos INTEGER
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_activities_date ON activities(date)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_activities_start_epoch ON activities(start_epoch)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_activities_type ON activities(type)')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS sync_state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+
+        # Aggregates, maintained by refresh_aggregates() whenever activities change
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS daily_totals (
+                date TEXT PRIMARY KEY,
+                count INTEGER,
+                rides INTEGER,
+                gym INTEGER,
+                moving_time_s INTEGER,
+                distance_m REAL,
+                calories REAL,
+                elevation_gain REAL,
+                types TEXT
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS weekly_totals (
+                week TEXT PRIMARY KEY,
+                week_start TEXT,
+                count INTEGER,
+                active_days INTEGER,
+                rides INTEGER,
+                gym INTEGER,
+                moving_time_s INTEGER,
+                distance_m REAL,
+                calories REAL,
+                elevation_gain REAL
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS sport_bests (
+                type TEXT PRIMARY KEY,
+                count INTEGER,
+                longest_distance_m REAL,
+                biggest_climb_m REAL,
+                total_distance_m REAL,
+                total_elevation_m REAL
+            )
+        ''')
+
+        version = conn.execute("SELECT value FROM sync_state WHERE key = 'aggregates_version'").fetchone()
+        if not version or version['value'] != AGGREGATES_VERSION:
+            conn.execute('DELETE FROM daily_totals')
+            conn.execute('DELETE FROM weekly_totals')
+            conn.execute('DELETE FROM sport_bests')
+            dates = [r['date'] for r in conn.execute('SELECT DISTINCT date FROM activities')]
+            types = [r['type'] for r in conn.execute('SELECT DISTINCT type FROM activities')]
+            refresh_aggregates(conn, dates, types)
+            conn.execute(
+                'INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)',
+                ('aggregates_version', AGGREGATES_VERSION)
+            )
+        conn.commit()
+
+@contextmanager
+def get_db():
+    conn = sqlite3.connect(ACTIVITIES_DB, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+def get_sync_state(key, default=None):
+    with get_db() as conn:
+        row = conn.execute('SELECT value FROM sync_state WHERE key = ?', (key,)).fetchone()
+    return row['value'] if row else default
+
+def set_sync_state(key, value):
+    with get_db() as conn:
+        conn.execute('INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)', (key, value))
+        conn.commit()
+
+def iso_week(date_str):
+    """'2024-05-01' -> ('2024-W18', '2024-04-29')"""
+    d = datetime.strptime(date_str, '%Y-%m-%d').date()
+    year, week, weekday = d.isocalendar()
+    return f'{year}-W{week:02d}', str(d - timedelta(days=weekday - 1))
+
+def refresh_aggregates(conn, dates, types):
+    """Recompute the aggregate rows for the given dates (and their ISO weeks) and activity types.
+
+    Called inside the transaction that changed the activities, so only the
+    touched days, weeks and sports are recomputed.
+    """
+    dates = sorted(set(d for d in dates if d))
+    if dates:
+        days = {d: {'count': 0, 'rides': 0, 'gym': 0, 'moving_time_s': 0, 'distance_m': 0,
+                    'calories': 0, 'elevation_gain': 0, 'types': []} for d in dates}
+        rows = conn.execute(
+            f'SELECT date, type, moving_time_s, distance_m, calories, elevation_gain FROM activities '
+            f'WHERE date IN ({", ".join("?" for _ in dates)}) ORDER BY start_time',
+            dates
+        )
+        for r in rows:
+            day = days[r['date']]
+            day['count'] += 1
+            day['rides'] += r['type'] in RIDE_TYPES
+            day['gym'] += r['type'] in GYM_TYPES
+            day['moving_time_s'] += r['moving_time_s'] or 0
+            day['distance_m'] += r['distance_m'] or 0
+            day['calories'] += r['calories'] or 0
+            day['elevation_gain'] += r['elevation_gain'] or 0
+            day['types'].append(r['type'])
+
+        conn.execute(f'DELETE FROM daily_totals WHERE date IN ({", ".join("?" for _ in dates)})', dates)
+        conn.executemany(
+            'INSERT INTO daily_totals (date, count, rides, gym, moving_time_s, distance_m, calories, elevation_gain, types) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            [(d, t['count'], t['rides'], t['gym'], t['moving_time_s'], t['distance_m'],
+              t['calories'], t['elevation_gain'], json.dumps(t['types']))
+             for d, t in days.items() if t['count']]
+        )
+
+        for week, week_start in set(iso_week(d) for d in dates):
+            week_end = str(datetime.strptime(week_start, '%Y-%m-%d').date() + timedelta(days=6))
+            totals = conn.execute(
+                'SELECT COUNT(*) AS active_days, SUM(count) AS count, SUM(rides) AS rides, SUM(gym) AS gym, '
+                'SUM(moving_time_s) AS moving_time_s, SUM(distance_m) AS distance_m, '
+                'SUM(calories) AS calories, SUM(elevation_gain) AS elevation_gain '
+                'FROM daily_totals WHERE date BETWEEN ? AND ?',
+                (week_start, week_end)
+            ).fetchone()
+            if totals['active_days']:
+                conn.execute(
+                    'INSERT OR REPLACE INTO weekly_totals (week, week_start, count, active_days, rides, gym, '
+                    'moving_time_s, distance_m, calories, elevation_gain) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (week, week_start, totals['count'], totals['active_days'], totals['rides'], totals['gym'],
+                     totals['moving_time_s'], totals['distance_m'], totals['calories'], totals['elevation_gain'])
+                )
+            else:
+                conn.execute('DELETE FROM weekly_totals WHERE week = ?', (week,))
+
+    for activity_type in set(t for t in types if t):
+        bests = conn.execute(
+            'SELECT COUNT(*) AS count, MAX(distance_m) AS longest, MAX(elevation_gain) AS climb, '
+            'SUM(distance_m) AS distance, SUM(elevation_gain) AS elevation '
+            'FROM activities WHERE type = ?',
+            (activity_type,)
+        ).fetchone()
+        if bests['count']:
+            conn.execute(
+                'INSERT OR REPLACE INTO sport_bests (type, count, longest_distance_m, biggest_climb_m, '
+                'total_distance_m, total_elevation_m) VALUES (?, ?, ?, ?, ?, ?)',
+                (activity_type, bests['count'], bests['longest'] or 0, bests['climb'] or 0,
+                 bests['distance'] or 0, bests['elevation'] or 0)
+            )
+        else:
+            conn.execute('DELETE FROM sport_bests WHERE type = ?', (activity_type,))
+
+def process_activity(a):
+    """Flatten a Strava activity into an activities row."""
+    start_date = a.get('start_date', '')
+    start_epoch = int(datetime.fromisoformat(start_date.replace('Z', '+00:00')).timestamp()) if start_date else 0
+    return {
+        'id': a.get('id'),
+        'name': a.get('name', ''),
+        'type': a.get('type', 'Workout'),
+        'sport_type': a.get('sport_type', a.get('type', 'Workout')),
+        'date': a.get('start_date_local', '')[:10],
+        'start_time': a.get('start_date_local', ''),
+        'start_epoch': start_epoch,
+        'distance_m': a.get('distance', 0),
+        'moving_time_s': a.get('moving_time', 0),
+        'elapsed_time_s': a.get('elapsed_time', 0),
+        'elevation_gain': a.get('total_elevation_gain', 0),
+        'average_speed': a.get('average_speed', 0),
+        'max_speed': a.get('max_speed', 0),
+        'average_heartrate': a.get('average_heartrate'),
+        'max_heartrate': a.get('max_heartrate'),
+        'calories': a.get('calories', 0),
+        'kudos': a.get('kudos_count', 0),
+    }
+
+def sync_activities():
+    """Fetch activities newer than the newest stored one (minus an overlap window).
+
+    The first sync backfills the calendar_days window. Activities inside the
+    overlap window are upserted, and stored ones Strava no longer returns for
+    that window are removed. Aggregates for the affected days, weeks and sports
+    are updated in the same transaction. Returns the number of activities
+    fetched, or None if Strava could not be reached.
+    """
+    with sync_lock:
+        with get_db() as conn:
+            newest = conn.execute('SELECT MAX(start_epoch) FROM activities').fetchone()[0]
+
+        if newest:
+            after = newest - SYNC_OVERLAP_HOURS * 3600
+        else:
+            days = get_settings().get('calendar_days', 60)
+            after = int((datetime.now() - timedelta(days=days)).timestamp())
+
+        page = 1
+        fetched = []
+        while True:
+            data = strava_get('/athlete/activities', {
+                'after': after, 'per_page': 100, 'page': page
+            })
+            if data is None:
+                return None
+            fetched.extend(process_activity(a) for a in data)
+            if len(data) < 100:
+                break
+            page += 1
+
+        placeholders = ', '.join('?' for _ in ACTIVITY_COLUMNS)
+        updates = ', '.join(f'{c} = excluded.{c}' for c in ACTIVITY_COLUMNS[1:])
+        ids = [a['id'] for a in fetched]
+        id_list = ', '.join('?' for _ in ids)
+        with get_db() as conn:
+            # Days and sports touched by this sync, before and after the change
+            previous = conn.execute(
+                f'SELECT date, type FROM activities WHERE start_epoch > ? OR id IN ({id_list})',
+                [after, *ids]
+            ).fetchall()
+            dates = {r['date'] for r in previous} | {a['date'] for a in fetched}
+            types = {r['type'] for r in previous} | {a['type'] for a in fetched}
+
+            conn.executemany(
+                f'INSERT INTO activities ({", ".join(ACTIVITY_COLUMNS)}) VALUES ({placeholders}) '
+                f'ON CONFLICT(id) DO UPDATE SET {updates}',
+                [tuple(a[c] for c in ACTIVITY_COLUMNS) for a in fetched]
+            )
+            conn.execute(
+                f'DELETE FROM activities WHERE start_epoch > ? AND id NOT IN ({id_list})',
+                [after, *ids]
+            )
+            refresh_aggregates(conn, dates, types)
+            conn.execute(
+                'INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)',
+                ('last_sync', str(time.time()))
+            )
+            conn.commit()
+        return len(fetched)
+
+def get_daily_totals(since):
+    """Per-day totals from `since` (YYYY-MM-DD) onwards. Days without activities have no row."""
+    with get_db() as conn:
+        rows = conn.execute('SELECT * FROM daily_totals WHERE date >= ? ORDER BY date', (since,)).fetchall()
+    return [dict(r) for r in rows]
+
+def get_recent_activities(limit, days=None):
+    """Newest stored activities from the last N days (default: calendar_days)."""
+    if days is None:
+        days = get_settings().get('calendar_days', 60)
+    since = str(datetime.now().date() - timedelta(days=days - 1))
+    with get_db() as conn:
+        rows = conn.execute(
+            'SELECT * FROM activities WHERE date >= ? ORDER BY start_time DESC LIMIT ?', (since, limit)
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+def get_athlete_stats(athlete_id):
+    """Strava athlete totals, cached in sync_state for cache_ttl_minutes.
+
+    Falls back to the last cached totals when Strava cannot be reached.
+    """
+    ttl = get_settings().get('cache_ttl_minutes', 30) * 60
+    with athlete_stats_lock:
+        cached = json.loads(get_sync_state('athlete_stats', 'null') or 'null')
+        if cached and cached.get('athlete_id') == athlete_id and time.time() - cached['fetched'] < ttl:
+            return cached['stats']
+
+        stats = strava_get(f'/athletes/{athlete_id}/stats')
+        if stats:
+            set_sync_state('athlete_stats', json.dumps({
+                'athlete_id': athlete_id, 'fetched': time.time(), 'stats': stats
+            }))
+            return stats
+        if cached and cached.get('athlete_id') == athlete_id:
+            return cached['stats']
+        return None
+
+def background_sync():
+    """Background thread that keeps the activity store in sync with Strava."""
+    app.logger.info('Starting background Strava sync')
+    while not stop_event.is_set():
+        if strava_connected():
+            try:
+                count = sync_activities()
+                if count is not None:
+                    app.logger.info(f'Strava sync: {count} activities fetched')
+            except Exception as e:
+                app.logger.error(f'Strava sync failed: {e}')
+
+        interval = get_settings().get('cache_ttl_minutes', 30) * 60
+        sync_wakeup.wait(timeout=interval)
+        sync_wakeup.clear()
+
+def request_sync():
+    """Wake the background sync thread without waiting for it."""
+    sync_wakeup.set()
+
+def start_background_sync():
+    global sync_thread
+    init_db()
+    if sync_thread is None or not sync_thread.is_alive():
+        stop_event.clear()
+        sync_thread = threading.Thread(target=background_sync, daemon=True)
+        sync_thread.start()
+
+def stop_background_sync():
+    stop_event.set()
+    sync_wakeup.set()
+    if sync_thread and sync_thread.is_alive():
+        sync_thread.join(timeout=5)
+
+atexit.register(stop_background_sync)
 
 def get_weight_log():
     return load_json(WEIGHT_FILE, {'unit': 'kg', 'goal_weight': None, 'entries': []})
@@ -192,13 +518,14 @@ def health():
 def strava_status():
     tokens = get_tokens()
     connected = strava_connected()
-    cache = load_json(ACTIVITIES_FILE, {})
-    last_sync = cache.get('last_fetched', 0)
+    last_sync = float(get_sync_state('last_sync', 0))
+    with get_db() as conn:
+        activities_cached = conn.execute('SELECT COUNT(*) FROM activities').fetchone()[0]
     return jsonify({
         'connected': connected,
         'athlete': tokens.get('athlete', {}).get('firstname', '') + ' ' + tokens.get('athlete', {}).get('lastname', '') if connected else '',
         'last_sync': datetime.fromtimestamp(last_sync).strftime('%Y-%m-%d %H:%M') if last_sync else 'Never',
-        'activities_cached': len(cache.get('activities', [])),
+        'activities_cached': activities_cached,
     })
 
 @app.route('/api/strava/authorize')
@@ -236,7 +563,7 @@ def strava_callback():
             tokens['expires_at'] = data['expires_at']
             tokens['athlete'] = data.get('athlete', {})
             save_tokens(tokens)
-            sync_activities()
+            request_sync()
             return redirect('/page/setup?success=1')
         return jsonify({'error': f'Token exchange failed: {resp.status_code}',
                         'detail': resp.text}), 400
@@ -245,22 +572,19 @@ def strava_callback():
 
 @app.route('/api/activities/weekly')
 def activities_weekly():
-    activities = sync_activities() if strava_connected() else []
     today = datetime.now().date()
     seven_days_ago = today - timedelta(days=6)  # Rolling 7 days including today
-    week_acts = [a for a in activities
-                 if a.get('date') and a['date'] >= str(seven_days_ago)]
-    active_days = len(set(a['date'] for a in week_acts))
-    rides = sum(1 for a in week_acts if a['type'] in ('Ride', 'VirtualRide'))
-    gym = sum(1 for a in week_acts
-              if a['type'] in ('WeightTraining', 'Workout', 'Crossfit'))
-    total_time = sum(a.get('moving_time_s', 0) for a in week_acts)
-    total_dist = sum(a.get('distance_m', 0) for a in week_acts)
-    total_cal = sum(a.get('calories', 0) for a in week_acts)
+    week_days = get_daily_totals(str(seven_days_ago)) if strava_connected() else []
+    active_days = len(week_days)
+    rides = sum(d['rides'] for d in week_days)
+    gym = sum(d['gym'] for d in week_days)
+    total_time = sum(d['moving_time_s'] for d in week_days)
+    total_dist = sum(d['distance_m'] for d in week_days)
+    total_cal = sum(d['calories'] for d in week_days)
 
     return jsonify({
         'active_days': active_days,
-        'total_activities': len(week_acts),
+        'total_activities': sum(d['count'] for d in week_days),
         'rides': rides,
         'gym_sessions': gym,
         'total_time': format_duration(total_time),
@@ -274,16 +598,13 @@ def activities_weekly():
 
 @app.route('/api/activities/calendar')
 def activities_calendar():
-    activities = sync_activities() if strava_connected() else []
     settings = get_settings()
     days = settings.get('calendar_days', 60)
     today = datetime.now().date()
 
-    day_map = {}
-    for a in activities:
-        d = a.get('date')
-        if d:
-            day_map.setdefault(d, []).append(a['type'])
+    since = str(today - timedelta(days=days - 1))
+    day_map = {d['date']: json.loads(d['types'])
+               for d in (get_daily_totals(since) if strava_connected() else [])}
 
     calendar = []
     for i in range(days - 1, -1, -1):
@@ -298,6 +619,26 @@ def activities_calendar():
         })
     return jsonify({'days': calendar, 'total_days': days})
 
+@app.route('/api/activities/weeks')
+def activities_weeks():
+    """Totals per ISO week, newest first."""
+    count = request.args.get('count', 12, type=int)
+    with get_db() as conn:
+        rows = conn.execute('SELECT * FROM weekly_totals ORDER BY week DESC LIMIT ?', (count,)).fetchall()
+    return jsonify({'weeks': [{
+        'week': r['week'],
+        'week_start': r['week_start'],
+        'active_days': r['active_days'],
+        'total_activities': r['count'],
+        'rides': r['rides'],
+        'gym_sessions': r['gym'],
+        'total_time': format_duration(r['moving_time_s']),
+        'total_time_s': r['moving_time_s'],
+        'total_distance': format_distance(r['distance_m']),
+        'total_distance_m': r['distance_m'],
+        'total_calories': r['calories'],
+    } for r in rows]})
+
 @app.route('/api/weight', methods=['GET'])
 def weight_get():
     log = get_weight_log()
@@ -368,17 +709,21 @@ def athlete_stats():
     if not athlete_id:
         return jsonify({'error': 'No athlete ID'}), 400
 
-    stats = strava_get(f'/athletes/{athlete_id}/stats')
+    stats = get_athlete_stats(athlete_id)
     if not stats:
         return jsonify({'error': 'Failed to fetch stats'}), 502
 
-    activities = sync_activities()
-
-    # Best efforts from cached activities (rides)
-    rides = [a for a in activities if a.get('type') in ('Ride', 'VirtualRide')]
-    longest_ride = max((a.get('distance_m', 0) for a in rides), default=0)
-    biggest_climb = max((a.get('elevation_gain', 0) for a in rides), default=0)
-    total_elev = sum(a.get('elevation_gain', 0) for a in rides)
+    # Best efforts from stored activities (rides)
+    with get_db() as conn:
+        bests = conn.execute(
+            f'SELECT MAX(longest_distance_m) AS longest, MAX(biggest_climb_m) AS climb, '
+            f'SUM(total_elevation_m) AS elevation FROM sport_bests '
+            f'WHERE type IN ({", ".join("?" for _ in RIDE_TYPES)})',
+            RIDE_TYPES
+        ).fetchone()
+    longest_ride = bests['longest'] or 0
+    biggest_climb = bests['climb'] or 0
+    total_elev = bests['elevation'] or 0
 
     def fmt_totals(t):
         return {
@@ -422,22 +767,18 @@ a:hover { text-decoration: underline; }
 
 @app.route('/page/calendar')
 def page_calendar():
-    activities = sync_activities() if strava_connected() else []
     settings = get_settings()
     days = settings.get('calendar_days', 60)
     today = datetime.now().date()
 
-    day_map = {}
-    for a in activities:
-        d = a.get('date')
-        if d:
-            day_map.setdefault(d, []).append(a)
+    since = str(today - timedelta(days=days - 1))
+    day_counts = {d['date']: d['count'] for d in (get_daily_totals(since) if strava_connected() else [])}
 
     cells = []
     for i in range(days - 1, -1, -1):
         d = today - timedelta(days=i)
         ds = str(d)
-        count = len(day_map.get(ds, []))
+        count = day_counts.get(ds, 0)
         cells.append({'date': ds, 'count': count, 'weekday': d.weekday(),
                       'label': d.strftime('%b %d')})
 
@@ -632,8 +973,7 @@ function logWeight() {
 
 @app.route('/page/activities')
 def page_activities():
-    activities = sync_activities() if strava_connected() else []
-    recent = sorted(activities, key=lambda a: a.get('start_time', ''), reverse=True)[:15]
+    recent = get_recent_activities(15) if strava_connected() else []
     return render_template_string(ACTIVITIES_HTML, activities=recent,
                                   connected=strava_connected(),
                                   format_duration=format_duration,
@@ -694,7 +1034,9 @@ def page_setup():
     connected = strava_connected()
     success = request.args.get('success')
     return render_template_string(SETUP_HTML, connected=connected,
-                                  tokens=tokens, success=success)
+                                  tokens=tokens, success=success,
+                                  sync_minutes=get_settings().get('cache_ttl_minutes', 30),
+                                  activities_db=ACTIVITIES_DB)
 
 SETUP_HTML = """<!DOCTYPE html>
 <html><head><meta charset="UTF-8"><style>
@@ -744,8 +1086,8 @@ code {
         </div>
         <p style="font-size:12px; color:#71717a;">
             Strava is connected and tokens will auto-refresh. No action needed.
-            <br><br>Activities sync every 30 minutes.
-            <br>Last sync data is cached in <code>/app/config/activities_cache.json</code>.
+            <br><br>Activities sync in the background every {{ sync_minutes }} minutes.
+            <br>Synced activities are stored in <code>{{ activities_db }}</code>.
         </p>
         {% else %}
         {% if tokens.client_id %}
@@ -903,6 +1245,8 @@ window.addEventListener('DOMContentLoaded', loadStats);
 # Main
 # ---------------------------------------------------------------------------
 
+start_background_sync()
+
 if __name__ == '__main__':
     os.makedirs(CONFIG_DIR, exist_ok=True)
 
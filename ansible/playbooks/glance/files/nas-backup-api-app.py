@@ -4,15 +4,18 @@ NAS Backup Status API - Enhanced with durations and VM names
 Reports PBS backups stored on NAS for Glance dashboard
 """
 
-import subprocess
 import json
 import re
 import time
+import uuid
 import threading
 import atexit
+from collections import deque
 from datetime import datetime, timedelta
 from flask import Flask, jsonify
 
+from ssh_transport import SSHTransport
+
 app = Flask(__name__)
 
 # Configuration
@@ -24,6 +27,33 @@ NAS_BACKUP_DIR = "/mnt/nas-backup/pbs-offsite"
 PBS_DAILY_PATH = "/backup-ssd"
 PBS_MAIN_PATH = "/backup"
 
+# Sync log follower
+SYNC_LOG_MAX_READ = 256 * 1024  # bytes per poll (and initial backfill)
+SYNC_HISTORY_SIZE = 30
+
+# Walks <datastore>/<vm|ct>/<vmid>/<snapshot>/ under NAS_BACKUP_DIR in one
+# remote command and prints a JSON array with, per backup group, the newest
+# snapshot, the snapshot count and the total size of its snapshot files
+# (indexes and manifests; chunk data is deduplicated in .chunks).
+INVENTORY_CMD = r"""cd %s 2>/dev/null && find main/vm main/ct daily/vm daily/ct -mindepth 2 -maxdepth 3 -printf '%%p\t%%y\t%%s\n' 2>/dev/null | awk -F '\t' '
+{
+    n = split($1, p, "/")
+    if (p[3] !~ /^[0-9]+$/ || p[4] !~ /^[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]T/) next
+    k = p[1] "/" p[2] "/" p[3]
+    if (n == 4 && $2 == "d") { count[k]++; if (p[4] > newest[k]) newest[k] = p[4] }
+    else if (n == 5 && $2 == "f") size[k] += $3
+}
+END {
+    printf "["
+    sep = ""
+    for (k in count) {
+        split(k, q, "/")
+        printf "%%s{\"datastore\":\"%%s\",\"type\":\"%%s\",\"vmid\":\"%%s\",\"newest\":\"%%s\",\"snapshots\":%%d,\"size_bytes\":%%.0f}", sep, q[1], q[2], q[3], newest[k], count[k], size[k]
+        sep = ","
+    }
+    print "]"
+}'""" % NAS_BACKUP_DIR
+
 # VM/CT Name mapping (VMID -> Name)
 VM_NAMES = {
     "100": "pbs-server",
@@ -76,17 +106,15 @@ cache_lock = threading.Lock()
 background_thread = None
 stop_event = threading.Event()
 
+# Pooled SSH connection to PBS (replaces one ssh process per command)
+ssh_transport = SSHTransport(SSH_KEY, connect_timeout=10, keepalive=5)
+
 def run_ssh_command(cmd, timeout=30):
     """Run command on PBS via SSH"""
     try:
-        result = subprocess.run(
-            ["ssh", "-i", SSH_KEY, "-o", "StrictHostKeyChecking=no",
-             "-o", "ConnectTimeout=10", "-o", "ServerAliveInterval=5",
-             f"root@{PBS_HOST}", cmd],
-            capture_output=True, text=True, timeout=timeout
-        )
-        return result.stdout.strip(), result.returncode
-    except subprocess.TimeoutExpired:
+        stdout, _, rc = ssh_transport.run(PBS_HOST, cmd, "root", timeout=timeout)
+        return stdout.strip(), rc
+    except TimeoutError:
         return "SSH timeout", 1
     except Exception as e:
         return str(e), 1
@@ -107,68 +135,210 @@ def format_duration(seconds):
         minutes = (seconds % 3600) // 60
         return f"{hours}h {minutes}m"
 
-def get_sync_status():
-    """Get current backup sync status"""
-    lock_check, _ = run_ssh_command(f"test -f {LOCK_FILE} && echo 'running' || echo 'not_running'")
-    if lock_check == "running":
-        return "running"
-
-    log_check, rc = run_ssh_command(f"tail -10 {LOG_FILE} 2>/dev/null | grep -E '(completed successfully|ERROR|FAILED)'")
-    if rc == 0:
-        if "completed successfully" in log_check:
-            return "success"
-        elif "ERROR" in log_check or "FAILED" in log_check:
-            return "failed"
-
-    dir_check, rc = run_ssh_command(f"test -d {NAS_BACKUP_DIR} && echo 'exists'")
-    if dir_check == "exists":
-        return "success"
-
-    return "unknown"
-
-def get_last_sync_info():
-    """Get timestamp, sizes, and duration from log file"""
-    log_output, rc = run_ssh_command(f"tail -100 {LOG_FILE} 2>/dev/null")
-
-    last_sync = "Never"
-    main_size = "N/A"
-    daily_size = "N/A"
-    duration = "N/A"
-    start_time = None
-    end_time = None
-
-    if rc == 0 and log_output:
-        lines = log_output.split('\n')
-
-        # Find the most recent complete backup session
-        for i, line in enumerate(lines):
-            if "Starting PBS backup to NAS" in line:
-                match = re.match(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})', line)
-                if match:
-                    start_time = datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S")
-
-            elif "Backup completed successfully" in line:
-                match = re.match(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})', line)
-                if match:
-                    end_time = datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S")
-                    last_sync = match.group(1)
-
-            elif "Main datastore on NAS:" in line:
-                match = re.search(r'Main datastore on NAS:\s*(\S+)', line)
-                if match:
-                    main_size = match.group(1)
-
-            elif "Daily datastore on NAS:" in line:
-                match = re.search(r'Daily datastore on NAS:\s*(\S+)', line)
-                if match:
-                    daily_size = match.group(1)
-
-        # Calculate duration if we have both times
-        if start_time and end_time and end_time > start_time:
-            diff = (end_time - start_time).total_seconds()
-            duration = format_duration(diff)
+def format_size(num_bytes):
+    """Format a byte count like du -h"""
+    for unit in ("B", "K", "M", "G", "T"):
+        if num_bytes < 1024 or unit == "T":
+            return f"{num_bytes:.0f}{unit}" if unit == "B" else f"{num_bytes:.1f}{unit}"
+        num_bytes /= 1024
+
+class SyncLogFollower:
+    """Follows the PBS->NAS sync log by inode and byte offset.
+
+    Each poll runs one SSH command that reports the lock file and NAS
+    directory state and returns only the bytes appended since the last poll.
+    When the log was rotated, the rest of the rotated file (LOG.1) is read
+    before the new file. A checksum of the first bytes catches copytruncate
+    rotation, where the inode stays the same. Lines feed a small state machine that records each
+    sync run in a ring buffer of the last SYNC_HISTORY_SIZE runs.
+    """
+
+    TIMESTAMP_RE = re.compile(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})')
+
+    def __init__(self):
+        self.inode = 0
+        self.offset = 0
+        self.fingerprint = ""
+        self.pending = ""
+        self.locked = False
+        self.dir_exists = False
+        self.current = None
+        self.history = deque(maxlen=SYNC_HISTORY_SIZE)
+        self.main_size = "N/A"
+        self.daily_size = "N/A"
+        self.lock = threading.Lock()
+
+    def poll(self):
+        """Fetch and parse new log lines, then return the sync summary."""
+        with self.lock:
+            try:
+                self._poll()
+            except Exception as e:
+                print(f"[{datetime.now()}] Sync log poll failed: {e}")
+            return self._summary()
+
+    def recent(self, limit=None):
+        """Finished runs, newest first."""
+        with self.lock:
+            runs = list(self.history)[::-1]
+        return [self._run_json(r) for r in runs[:limit]]
+
+    # ------------------------------------------------------------
+    # Remote read
+    # ------------------------------------------------------------
+
+    def _command(self, marker):
+        return f"""
+LOG={LOG_FILE}; INO={self.inode}; OFF={self.offset}; FP="{self.fingerprint}"; MAX={SYNC_LOG_MAX_READ}
+test -f {LOCK_FILE} && echo lock running || echo lock idle
+test -d {NAS_BACKUP_DIR} && echo dir exists || echo dir missing
+set -- $(stat -c '%i %s' "$LOG" 2>/dev/null) 0 0
+CUR=$1; SIZE=$2; OLD=0; ROT_OFF=0
+HEAD=""
+if [ "$SIZE" -ge 128 ]; then HEAD=$(head -c 128 "$LOG" | md5sum | cut -c1-32); fi
+echo fingerprint $HEAD
+if [ -n "$FP" ] && [ "$CUR" = "$INO" ] && [ "$HEAD" != "$FP" ]; then OFF=0; fi
+if [ "$CUR" != "$INO" ] || [ "$SIZE" -lt "$OFF" ]; then
+    if [ "$INO" != 0 ] && [ -f "$LOG.1" ] && [ "$(stat -c %i "$LOG.1")" = "$INO" ]; then OLD=1; ROT_OFF=$OFF; fi
+    OFF=0
+fi
+START=$OFF
+if [ $((SIZE - START)) -gt $MAX ]; then START=$((SIZE - MAX)); fi
+echo log $CUR $START $SIZE
+echo {marker}
+if [ $OLD = 1 ]; then tail -c +$((ROT_OFF + 1)) "$LOG.1" | head -c $MAX; fi
+echo {marker}
+if [ $SIZE -gt $START ]; then tail -c +$((START + 1)) "$LOG" | head -c $((SIZE - START)); fi
+"""
 
-    return last_sync, main_size, daily_size, duration
+    def _poll(self):
+        marker = f"@@sync-log-{uuid.uuid4().hex}@@"
+        # Not run_ssh_command: its strip() would drop the final newline
+        stdout, stderr, rc = ssh_transport.run(PBS_HOST, self._command(marker), "root", timeout=30)
+        if rc != 0:
+            raise RuntimeError(stderr.strip() or f"exit code {rc}")
+
+        header, rotated, appended = stdout.split(f"{marker}\n")
+        fields = dict(line.split(" ", 1) for line in header.splitlines() if " " in line)
+        self.locked = fields.get("lock") == "running"
+        self.dir_exists = fields.get("dir") == "exists"
+        inode, start, size = (int(v) for v in fields["log"].split())
+        fingerprint = fields.get("fingerprint", "").strip()
+
+        if inode != self.inode or start != self.offset:
+            # Rotated, truncated, or too far behind: finish the old file, then start over
+            self._feed(rotated, complete=True)
+            if start > 0:
+                # Started mid-file; skip the partial first line
+                appended = appended.split("\n", 1)[1] if "\n" in appended else ""
+        self._feed(appended)
+        self.inode, self.offset, self.fingerprint = inode, size, fingerprint
+
+    def _feed(self, text, complete=False):
+        text = self.pending + text
+        lines = text.split("\n")
+        self.pending = "" if complete else lines.pop()
+        for line in lines:
+            if line.strip():
+                self._parse(line)
+
+    # ------------------------------------------------------------
+    # State machine
+    # ------------------------------------------------------------
+
+    def _parse(self, line):
+        match = self.TIMESTAMP_RE.match(line)
+        ts = match.group(1) if match else None
+
+        if "Starting PBS backup to NAS" in line:
+            if self.current:
+                self._finish("failed" if self.current["errors"] else "incomplete")
+            self.current = {"start": ts, "end": None, "main_size": None, "daily_size": None, "errors": []}
+
+        elif "Backup completed successfully" in line:
+            if not self.current:
+                self.current = {"start": None, "end": None, "main_size": None, "daily_size": None, "errors": []}
+            self.current["end"] = ts
+            self._finish("success")
+
+        elif "Main datastore on NAS:" in line or "Daily datastore on NAS:" in line:
+            size_match = re.search(r'(Main|Daily) datastore on NAS:\s*(\S+)', line)
+            if size_match:
+                key = "main_size" if size_match.group(1) == "Main" else "daily_size"
+                setattr(self, key, size_match.group(2))
+                if self.current:
+                    self.current[key] = size_match.group(2)
+
+        elif "ERROR" in line or "FAILED" in line:
+            if not self.current:
+                self.current = {"start": None, "end": None, "main_size": None, "daily_size": None, "errors": []}
+            self.current["errors"].append(line.strip()[:200])
+
+    def _finish(self, status):
+        run = self.current
+        run["status"] = status
+        run["duration_seconds"] = None
+        if run["start"] and run["end"]:
+            start = datetime.strptime(run["start"], "%Y-%m-%d %H:%M:%S")
+            end = datetime.strptime(run["end"], "%Y-%m-%d %H:%M:%S")
+            if end > start:
+                run["duration_seconds"] = (end - start).total_seconds()
+        self.history.append(run)
+        self.current = None
+
+    # ------------------------------------------------------------
+    # Summaries
+    # ------------------------------------------------------------
+
+    def _summary(self):
+        last = self.history[-1] if self.history else None
+        last_success = next((r for r in reversed(self.history) if r["status"] == "success"), None)
+
+        if self.locked:
+            status = "running"
+        elif self.current and self.current["errors"]:
+            status = "failed"
+        elif last:
+            status = "success" if last["status"] == "success" else "failed"
+        elif self.dir_exists:
+            status = "success"
+        else:
+            status = "unknown"
+
+        durations = [r["duration_seconds"] for r in self.history
+                     if r["status"] == "success" and r["duration_seconds"]]
+        trend = {"last": "N/A", "average": "N/A", "change_percent": None}
+        if durations:
+            trend["last"] = format_duration(durations[-1])
+            if len(durations) > 1:
+                average = sum(durations[:-1]) / len(durations[:-1])
+                trend["average"] = format_duration(average)
+                trend["change_percent"] = round((durations[-1] - average) / average * 100, 1)
+
+        return {
+            "status": status,
+            "last_sync": last_success["end"] if last_success else "Never",
+            "main_size": self.main_size,
+            "daily_size": self.daily_size,
+            "duration": format_duration(last_success["duration_seconds"]) if last_success else "N/A",
+            "recent_syncs": [self._run_json(r) for r in list(self.history)[::-1][:10]],
+            "duration_trend": trend
+        }
+
+    @staticmethod
+    def _run_json(run):
+        return {
+            "start": run["start"],
+            "end": run["end"],
+            "status": run["status"],
+            "duration": format_duration(run["duration_seconds"]),
+            "duration_seconds": run["duration_seconds"],
+            "main_size": run["main_size"],
+            "daily_size": run["daily_size"],
+            "errors": run["errors"][-3:]
+        }
+
+sync_log = SyncLogFollower()
 
 def get_backup_job_status():
     """Get last backup time, status, and duration for each datastore"""
@@ -238,35 +408,33 @@ def get_backup_job_status():
 
 def fetch_nas_backups():
     """Fetch list of backups stored on NAS with VM names"""
-    backups = []
+    output, rc = run_ssh_command(INVENTORY_CMD, timeout=60)
+    if rc != 0:
+        raise RuntimeError(f"Inventory of {NAS_BACKUP_DIR} failed (rc {rc}): {output}")
 
-    for datastore in ["main", "daily"]:
-        for btype in ["vm", "ct"]:
-            cmd = f"ls -1 {NAS_BACKUP_DIR}/{datastore}/{btype}/ 2>/dev/null"
-            output, rc = run_ssh_command(cmd)
-
-            if rc == 0 and output:
-                for vmid in output.strip().split('\n'):
-                    if vmid and vmid.isdigit():
-                        snap_cmd = f"ls -1 {NAS_BACKUP_DIR}/{datastore}/{btype}/{vmid}/ 2>/dev/null | grep -E '^[0-9]{{4}}-[0-9]{{2}}-[0-9]{{2}}T' | sort -r | head -1"
-                        snap_output, snap_rc = run_ssh_command(snap_cmd)
-
-                        if snap_rc == 0 and snap_output:
-                            last_backup = "Unknown"
-                            match = re.match(r'(\d{4}-\d{2}-\d{2})T(\d{2}:\d{2})', snap_output)
-                            if match:
-                                last_backup = f"{match.group(1)} {match.group(2)}"
-
-                            # Get VM name from lookup table
-                            vm_name = VM_NAMES.get(vmid, f"{btype.upper()}-{vmid}")
-
-                            backups.append({
-                                "vmid": vmid,
-                                "name": vm_name,
-                                "type": btype.upper(),
-                                "datastore": datastore,
-                                "last_backup": last_backup
-                            })
+    # Same order the per-directory listing used (main before daily, vm before ct),
+    # so the stable vmid sort and dedup below pick the same entries
+    groups = sorted(json.loads(output), key=lambda g: (g["datastore"] != "main", g["type"] != "vm"))
+
+    backups = []
+    for group in groups:
+        vmid = group["vmid"]
+        btype = group["type"]
+        last_backup = "Unknown"
+        match = re.match(r'(\d{4}-\d{2}-\d{2})T(\d{2}:\d{2})', group["newest"])
+        if match:
+            last_backup = f"{match.group(1)} {match.group(2)}"
+
+        backups.append({
+            "vmid": vmid,
+            "name": VM_NAMES.get(vmid, f"{btype.upper()}-{vmid}"),
+            "type": btype.upper(),
+            "datastore": group["datastore"],
+            "last_backup": last_backup,
+            "snapshot_count": group["snapshots"],
+            "size_bytes": group["size_bytes"],
+            "size": format_size(group["size_bytes"])
+        })
 
     backups.sort(key=lambda x: int(x["vmid"]))
 
@@ -281,19 +449,20 @@ def fetch_nas_backups():
 
 def fetch_status():
     """Fetch sync status with durations"""
-    sync_status = get_sync_status()
-    last_sync, main_size, daily_size, nas_duration = get_last_sync_info()
+    sync = sync_log.poll()
     job_status = get_backup_job_status()
 
     return {
-        "status": sync_status,
-        "last_sync": last_sync,
-        "main_size": main_size,
-        "daily_size": daily_size,
-        "nas_sync_duration": nas_duration,
+        "status": sync["status"],
+        "last_sync": sync["last_sync"],
+        "main_size": sync["main_size"],
+        "daily_size": sync["daily_size"],
+        "nas_sync_duration": sync["duration"],
         "nas_target": "192.168.20.31:/volume2/ProxmoxData/pbs-offsite",
         "schedule": "Daily at 2:00 AM",
-        "job_status": job_status
+        "job_status": job_status,
+        "recent_syncs": sync["recent_syncs"],
+        "sync_duration_trend": sync["duration_trend"]
     }
 
 def refresh_cache():
@@ -341,6 +510,7 @@ def stop_background_refresh():
     stop_event.set()
     if background_thread and background_thread.is_alive():
         background_thread.join(timeout=5)
+    ssh_transport.close()
 
 atexit.register(stop_background_refresh)
 
@@ -392,6 +562,11 @@ def job_status():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/sync-history')
+def sync_history():
+    runs = sync_log.recent()
+    return jsonify({"syncs": runs, "count": len(runs)})
+
 @app.route('/refresh')
 def refresh():
     refresh_cache()
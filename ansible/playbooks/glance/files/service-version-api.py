@@ -6,18 +6,27 @@ Designed for Glance dashboard custom-api widgets.
 """
 
 import subprocess
+import gzip
+import hashlib
 import json
 import os
+import random
 import re
 import time
 import uuid
 import threading
 import atexit
+import heapq
 import logging
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime
-from flask import Flask, jsonify, request
+from email.utils import parsedate_to_datetime
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 
+from ssh_transport import SSHTransport
+
 try:
     import requests as http_requests
 except ImportError:
@@ -35,7 +44,6 @@ logger = logging.getLogger(__name__)
 
 SSH_KEY = "/root/.ssh/homelab_ed25519"
 SSH_USER = "hermes-admin"
-SSH_OPTS = f"-i {SSH_KEY} -o StrictHostKeyChecking=no -o ConnectTimeout=5 -o BatchMode=yes"
 UPDATE_API_KEY = os.environ.get("UPDATE_API_KEY", "svm-homelab-secret")
 
 # Services that CANNOT be updated via one-click (critical infrastructure)
@@ -46,10 +54,37 @@ HEALTH_CACHE_TTL = 60       # 1 minute
 VERSION_CACHE_TTL = 3600    # 1 hour
 REGISTRY_CACHE_TTL = 21600  # 6 hours
 
+# Registry digests survive restarts; lookups pause when the pull budget runs low
+REGISTRY_CACHE_FILE = os.environ.get("REGISTRY_CACHE_FILE", "/app/data/registry-cache.json")
+REGISTRY_RATE_LIMIT_FLOOR = 10
+
 # Background refresh intervals
 HEALTH_REFRESH_INTERVAL = 55
 VERSION_REFRESH_INTERVAL = 3600
 
+# Version scheduler: per-service check intervals adapt to how often the tag moves
+VERSION_INTERVAL_FLOATING = 1800   # latest/release-style tags
+VERSION_INTERVAL_PINNED = 21600    # full semver tags (e.g. 1.2.3, v2.0.1-alpine)
+VERSION_INTERVAL_RETRY = 600       # after a failed or inconclusive check
+VERSION_JITTER = 0.15              # +/- fraction applied to every interval
+VERSION_STARTUP_DELAY = 10
+VERSION_STARTUP_SPREAD = 60        # first checks are spread over this window
+VERSION_BATCH_WINDOW = 5           # checks due this close together run as one batch
+FLOATING_TAGS = {"latest", "release", "stable", "main", "master", "nightly", "develop", "dev", "edge", "rolling"}
+PINNED_TAG_RE = re.compile(r'^v?\d+\.\d+\.\d+')
+
+# Health engine: checks run in parallel, a cycle never runs past its deadline
+HEALTH_WORKERS = 16
+HEALTH_CYCLE_DEADLINE = 45  # seconds, kept below HEALTH_REFRESH_INTERVAL
+SSH_MAX_PER_HOST = 4        # concurrent SSH sessions per host
+
+# Update jobs: bounded worker pool, one compose operation per host at a time
+UPDATE_WORKERS = 4
+UPDATE_MAX_PER_HOST = 1
+UPDATE_TASKS_MAX = 200       # task records kept; oldest finished ones are evicted
+UPDATE_TASK_MAX_LINES = 2000
+SSE_KEEPALIVE = 15           # seconds between keepalive comments on idle streams
+
 # ============================================================
 # Service Registry
 # ============================================================
@@ -596,35 +631,55 @@ CATEGORIES = {
 # ============================================================
 
 cache = {
-    "health": {},       # service_name -> {"status": "online"/"offline", "timestamp": float}
+    "health": {},       # service_name -> {"status": "online"/"offline", "latency_ms": int, "timestamp": float}
     "versions": {},     # service_name -> {"current": str, "current_digest": str, "latest_digest": str, "update_available": bool, "timestamp": float}
-    "registry": {},     # image_ref -> {"digest": str, "timestamp": float}
 }
 cache_lock = threading.Lock()
 
-# Update tasks
-update_tasks = {}  # task_id -> {"status", "service", "started", "output", "completed"}
-update_locks = {}  # service_name -> threading.Lock()
+# Pre-serialized API responses, rebuilt by the refresh threads whenever the
+# cache changes. Request handlers only read this dict (replaced atomically).
+published = {"version": 0, "responses": {}}  # path -> (body, gzipped_body, etag)
+publish_lock = threading.Lock()
 
 # Background thread control
 stop_event = threading.Event()
 
+# Version scheduler: heap of (due, service_name). version_due holds each
+# service's authoritative next check; heap entries that disagree are stale.
+version_heap = []
+version_due = {}
+version_sched_lock = threading.Lock()
+version_wakeup = threading.Event()
+
+# Health engine: shared worker pool and keep-alive HTTP session
+health_executor = ThreadPoolExecutor(max_workers=HEALTH_WORKERS, thread_name_prefix="health")
+http_session = None
+if http_requests:
+    http_session = http_requests.Session()
+    _adapter = http_requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=HEALTH_WORKERS)
+    http_session.mount("http://", _adapter)
+    http_session.mount("https://", _adapter)
+
+# Pooled SSH connections (one per user@host, SSH_MAX_PER_HOST commands at a time)
+ssh_transport = SSHTransport(SSH_KEY, connect_timeout=5, max_per_host=SSH_MAX_PER_HOST)
+
 
 # ============================================================
 # SSH Utility
 # ============================================================
 
-def run_ssh_command(host_ip, cmd, user=None, timeout=30):
-    """Run command on a remote host via SSH. Returns (stdout, return_code)."""
+def run_ssh_command(host_ip, cmd, user=None, timeout=30, on_line=None):
+    """Run command on a remote host via SSH. Returns (stdout, return_code).
+
+    The command is passed to the remote user's shell as-is. on_line, if given,
+    receives each output line (stdout and stderr) as it is produced.
+    """
     if user is None:
         user = SSH_USER
-    full_cmd = f"ssh {SSH_OPTS} {user}@{host_ip} {cmd}"
     try:
-        result = subprocess.run(
-            full_cmd, shell=True, capture_output=True, text=True, timeout=timeout
-        )
-        return result.stdout.strip(), result.returncode
-    except subprocess.TimeoutExpired:
+        stdout, _, rc = ssh_transport.run(host_ip, cmd, user, timeout=timeout, on_line=on_line)
+        return stdout.strip(), rc
+    except TimeoutError:
         logger.warning(f"SSH timeout: {host_ip} cmd={cmd[:60]}")
         return "", -1
     except Exception as e:
@@ -647,7 +702,7 @@ def check_health(service_name, service_cfg):
         if host_ip and container:
             stdout, rc = run_ssh_command(
                 host_ip,
-                f"'docker inspect --format={{{{.State.Status}}}} {container} 2>/dev/null'"
+                f"docker inspect --format={{{{.State.Status}}}} {container} 2>/dev/null"
             )
             return "online" if stdout == "running" else "offline"
         return "unknown"
@@ -656,7 +711,7 @@ def check_health(service_name, service_cfg):
     if http_requests:
         try:
             verify = not service_cfg.get("health_insecure", False)
-            resp = http_requests.get(health_url, timeout=5, verify=verify, allow_redirects=True)
+            resp = http_session.get(health_url, timeout=5, verify=verify, allow_redirects=True)
             return "online" if resp.status_code < 500 else "offline"
         except Exception:
             return "offline"
@@ -674,74 +729,66 @@ def check_health(service_name, service_cfg):
             return "offline"
 
 
+def _timed_health_check(name, cfg):
+    """Run one health check and measure it. Returns (status, latency_ms)."""
+    started = time.monotonic()
+    try:
+        status = check_health(name, cfg)
+    except Exception as e:
+        logger.error(f"Health check failed for {name}: {e}")
+        status = "unknown"
+    return status, round((time.monotonic() - started) * 1000)
+
+
 def refresh_all_health():
-    """Refresh health status for all services."""
-    for name, cfg in SERVICE_REGISTRY.items():
-        try:
-            status = check_health(name, cfg)
-            with cache_lock:
-                cache["health"][name] = {"status": status, "timestamp": time.time()}
-        except Exception as e:
-            logger.error(f"Health check failed for {name}: {e}")
-            with cache_lock:
-                cache["health"][name] = {"status": "unknown", "timestamp": time.time()}
+    """Refresh health status for all services concurrently.
+
+    Checks share a worker pool and keep-alive HTTP session, so a cycle takes
+    about as long as the slowest service. Checks still running at
+    HEALTH_CYCLE_DEADLINE are recorded as "unknown" with timed_out set.
+    """
+    started = time.monotonic()
+    futures = {
+        health_executor.submit(_timed_health_check, name, cfg): name
+        for name, cfg in SERVICE_REGISTRY.items()
+    }
+    done, not_done = wait(futures, timeout=HEALTH_CYCLE_DEADLINE)
+
+    now = time.time()
+    results = {}
+    for future in done:
+        status, latency_ms = future.result()
+        results[futures[future]] = {"status": status, "latency_ms": latency_ms, "timestamp": now}
+    for future in not_done:
+        name = futures[future]
+        logger.warning(f"Health check for {name} missed the {HEALTH_CYCLE_DEADLINE}s cycle deadline")
+        results[name] = {"status": "unknown", "latency_ms": None, "timed_out": True, "timestamp": now}
+
+    with cache_lock:
+        cache["health"].update(results)
+    publish_responses()
+
+    logger.info(
+        f"Health cycle: {len(done)}/{len(futures)} checks in {time.monotonic() - started:.1f}s"
+        + (f", {len(not_done)} timed out" if not_done else "")
+    )
 
 
 # ============================================================
 # Version Detection
 # ============================================================
 
-def get_container_version_info(host_ip, container_name):
-    """Get current image ref, container image ID, tag image ID, tag RepoDigest,
-    and version label from a running container.
+def _repo_digest(raw):
+    """Extract sha256:... from a RepoDigests entry (repo@sha256:...)."""
+    if "@" in raw:
+        return raw.split("@", 1)[1]
+    if raw.startswith("sha256:"):
+        return raw
+    return None
 
-    Uses a multi-step approach to handle the case where a tag has been re-pulled
-    but the container not yet recreated:
-    1. docker inspect (container) → image ref, container image ID, version label
-    2. docker image inspect (tag) → tag image ID, RepoDigests
-
-    Returns: (image_ref, container_image_id, tag_image_id, tag_repo_digest, version_label)
-    """
-    # Step 1: Get image reference, container image ID, and version label
-    inspect_fmt = (
-        "'docker inspect {cname} --format "
-        "\"{{{{.Config.Image}}}}|{{{{.Image}}}}|{{{{index .Config.Labels \\\"org.opencontainers.image.version\\\"}}}}\" "
-        "2>/dev/null'"
-    ).format(cname=container_name)
-
-    stdout, rc = run_ssh_command(host_ip, inspect_fmt, timeout=15)
-    if rc != 0 or not stdout:
-        return None, None, None, None, None
-
-    parts = stdout.split("|")
-    if len(parts) < 3:
-        return None, None, None, None, None
-
-    image_ref = parts[0]            # e.g., ghcr.io/immich-app/immich-server:release
-    container_image_id = parts[1]   # e.g., sha256:e6a6298e... (image the container runs)
-    version_label = parts[2]        # e.g., v2.4.1 or empty
-
-    # Step 2: Get tag's current image ID and RepoDigests
-    tag_cmd = (
-        "'docker image inspect {image} --format "
-        "\"{{{{.Id}}}}|{{{{index .RepoDigests 0}}}}\" 2>/dev/null'"
-    ).format(image=image_ref)
-
-    tag_image_id = None
-    tag_repo_digest = None
-    tag_stdout, tag_rc = run_ssh_command(host_ip, tag_cmd, timeout=15)
-    if tag_rc == 0 and tag_stdout:
-        tag_parts = tag_stdout.split("|")
-        if len(tag_parts) >= 1:
-            tag_image_id = tag_parts[0]      # sha256:... (current tag image ID)
-        if len(tag_parts) >= 2 and tag_parts[1]:
-            raw = tag_parts[1]
-            # Extract sha256:... from repo@sha256:...
-            if "@" in raw:
-                tag_repo_digest = raw.split("@", 1)[1]
-            elif raw.startswith("sha256:"):
-                tag_repo_digest = raw
 
+def _derive_version(image_ref, container_image_id, version_label):
+    """Pick a display version: OCI label, else semver-ish tag, else short image ID."""
     # Try to extract version from tag if no label
     if not version_label:
         tag_match = re.search(r':([v]?[\d]+\.[\d]+[\.\d]*)', image_ref)
@@ -752,127 +799,353 @@ def get_container_version_info(host_ip, container_name):
     if not version_label and container_image_id:
         version_label = container_image_id[:19] if container_image_id.startswith("sha256:") else container_image_id[:12]
 
-    return image_ref, container_image_id, tag_image_id, tag_repo_digest, version_label or "unknown"
+    return version_label or "unknown"
 
 
-def get_registry_digest(image_ref):
-    """Query Docker Hub or GHCR for the latest manifest digest of an image."""
-    if not http_requests:
-        return None
+def _normalize_image_ref(ref):
+    """Normalize an image reference the way Docker lists it in RepoTags."""
+    for prefix in ("docker.io/library/", "index.docker.io/library/", "docker.io/", "index.docker.io/"):
+        if ref.startswith(prefix):
+            ref = ref[len(prefix):]
+            break
+    if "@" not in ref and ":" not in ref.rsplit("/", 1)[-1]:
+        ref += ":latest"
+    return ref
 
-    # Check registry cache first
-    with cache_lock:
-        cached = cache["registry"].get(image_ref)
-        if cached and (time.time() - cached["timestamp"]) < REGISTRY_CACHE_TTL:
-            return cached["digest"]
+
+def collect_host_versions(host_ip):
+    """Collect version info for every container on a host in two SSH calls.
+
+    1. docker inspect $(docker ps -aq) → image ref, image ID and labels of all containers
+    2. docker image inspect <all referenced tags> → tag image IDs and RepoDigests
+
+    Returns: {container_name: (image_ref, container_image_id, tag_image_id,
+              tag_repo_digest, version_label)}, or None if the host is unreachable.
+    """
+    # A container removed between ps and inspect (e.g. a Watchtower recreate)
+    # makes docker inspect exit non-zero, but the others are still printed.
+    stdout, rc = run_ssh_command(
+        host_ip, 'ids=$(docker ps -aq); [ -z "$ids" ] || docker inspect $ids 2>/dev/null', timeout=30
+    )
+    if rc in (-1, 255):
+        # SSH itself failed (transport error/timeout, or ssh's own exit code)
+        return None
+    if not stdout:
+        return {}
 
     try:
-        # Parse image reference: namespace/repo:tag
-        ref = image_ref
-        tag = "latest"
-        if ":" in ref:
+        containers = json.loads(stdout)
+    except ValueError as e:
+        logger.warning(f"Bulk inspect on {host_ip} returned invalid JSON: {e}")
+        return None
+
+    image_refs = sorted({c.get("Config", {}).get("Image", "") for c in containers} - {""})
+
+    # One image inspect for every referenced tag. Missing images make docker exit
+    # non-zero but the ones it found are still printed, so parse stdout regardless.
+    tags = {}  # normalized ref -> (image ID, repo digest)
+    if image_refs:
+        quoted = " ".join(f'"{ref}"' for ref in image_refs)
+        img_stdout, _ = run_ssh_command(host_ip, f"docker image inspect {quoted} 2>/dev/null", timeout=30)
+        try:
+            images = json.loads(img_stdout) if img_stdout else []
+        except ValueError:
+            images = []
+        for image in images:
+            digests = image.get("RepoDigests") or []
+            info = (image.get("Id"), _repo_digest(digests[0]) if digests else None)
+            for tag in image.get("RepoTags") or []:
+                tags[_normalize_image_ref(tag)] = info
+
+    results = {}
+    for c in containers:
+        config = c.get("Config", {})
+        image_ref = config.get("Image", "")
+        container_image_id = c.get("Image", "")
+        labels = config.get("Labels") or {}
+        tag_image_id, tag_repo_digest = tags.get(_normalize_image_ref(image_ref), (None, None)) if image_ref else (None, None)
+        version = _derive_version(image_ref, container_image_id, labels.get("org.opencontainers.image.version", ""))
+        results[c.get("Name", "").lstrip("/")] = (image_ref, container_image_id, tag_image_id, tag_repo_digest, version)
+
+    return results
+
+
+class RegistryClient:
+    """Manifest digest lookups against Docker Hub and GHCR.
+
+    - One keep-alive session per registry
+    - Bearer tokens cached per repository until they expire
+    - Digests cached with a TTL and persisted to disk across restarts
+    - Docker Hub RateLimit-Remaining and Retry-After defer further lookups
+      (stale cached digests are served meanwhile)
+    - Concurrent lookups of the same image share one request
+    """
+
+    REGISTRIES = {
+        "docker.io": {
+            "token_url": "https://auth.docker.io/token",
+            "service": "registry.docker.io",
+            "api": "https://registry-1.docker.io",
+        },
+        "ghcr.io": {
+            "token_url": "https://ghcr.io/token",
+            "service": "ghcr.io",
+            "api": "https://ghcr.io",
+        },
+    }
+    MANIFEST_ACCEPT = ", ".join([
+        # Manifest list/index types first so multi-arch images return the list
+        # digest (matching what Docker stores in RepoDigests at pull time)
+        "application/vnd.oci.image.index.v1+json",
+        "application/vnd.docker.distribution.manifest.list.v2+json",
+        "application/vnd.docker.distribution.manifest.v2+json",
+        "application/vnd.oci.image.manifest.v1+json",
+    ])
+
+    def __init__(self, cache_file, ttl, rate_limit_floor):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.rate_limit_floor = rate_limit_floor
+
+        self._sessions = {}        # registry -> requests.Session
+        self._tokens = {}          # (registry, repo) -> (token, expires_at)
+        self._digests = {}         # image_ref -> {"digest": str, "timestamp": float}
+        self._deferred_until = {}  # registry -> timestamp
+        self._inflight = {}        # image_ref -> Future
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    # ------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------
+
+    def get_digest(self, image_ref):
+        """Latest manifest digest for an image reference, or None."""
+        with self._lock:
+            cached = self._digests.get(image_ref)
+            if cached and (time.time() - cached["timestamp"]) < self.ttl:
+                return cached["digest"]
+
+            registry, repo, tag = self._parse(image_ref)
+            if self.deferred(registry):
+                return cached["digest"] if cached else None
+
+            future = self._inflight.get(image_ref)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[image_ref] = future
+
+        if not owner:
+            return future.result()
+
+        digest = None
+        try:
+            digest = self._fetch_digest(registry, repo, tag)
+        except Exception as e:
+            logger.warning(f"Registry lookup failed for {image_ref}: {e}")
+        finally:
+            with self._lock:
+                if digest:
+                    self._digests[image_ref] = {"digest": digest, "timestamp": time.time()}
+                    self._dirty = True
+                elif cached:
+                    digest = cached["digest"]
+                self._inflight.pop(image_ref, None)
+            future.set_result(digest)
+        return digest
+
+    def deferred(self, registry):
+        return time.time() < self._deferred_until.get(registry, 0)
+
+    def flush(self):
+        """Write the digest cache to disk if it changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = dict(self._digests)
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_path = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            logger.warning(f"Could not persist registry cache: {e}")
+
+    def close(self):
+        self.flush()
+        for session in self._sessions.values():
+            session.close()
+
+    # ------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------
+
+    def _load(self):
+        try:
+            with open(self.cache_file) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        cutoff = time.time() - self.ttl
+        self._digests = {
+            ref: entry for ref, entry in data.items()
+            if isinstance(entry, dict) and entry.get("digest") and entry.get("timestamp", 0) > cutoff
+        }
+        logger.info(f"Loaded {len(self._digests)} cached registry digests")
+
+    @staticmethod
+    def _parse(image_ref):
+        """Split an image reference into (registry, repo, tag)."""
+        ref, tag = image_ref, "latest"
+        if ":" in ref.rsplit("/", 1)[-1]:
             ref, tag = ref.rsplit(":", 1)
 
-        # Determine registry
         if ref.startswith("ghcr.io/"):
-            return _get_ghcr_digest(ref, tag, image_ref)
-        elif ref.startswith("lscr.io/"):
+            return "ghcr.io", ref[len("ghcr.io/"):], tag
+        if ref.startswith("lscr.io/"):
             # LinuxServer images are on GHCR
-            ghcr_ref = ref.replace("lscr.io/", "ghcr.io/")
-            return _get_ghcr_digest(ghcr_ref, tag, image_ref)
-        else:
-            return _get_dockerhub_digest(ref, tag, image_ref)
-    except Exception as e:
-        logger.warning(f"Registry lookup failed for {image_ref}: {e}")
-        return None
+            return "ghcr.io", ref[len("lscr.io/"):], tag
+        if ref.startswith("docker.io/"):
+            ref = ref[len("docker.io/"):]
+        if "/" not in ref:
+            ref = f"library/{ref}"
+        return "docker.io", ref, tag
+
+    def _session(self, registry):
+        with self._lock:
+            session = self._sessions.get(registry)
+            if session is None:
+                session = http_requests.Session()
+                session.mount("https://", http_requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4))
+                self._sessions[registry] = session
+            return session
+
+    def _token(self, registry, repo):
+        """Anonymous pull token for a repository, reused until it expires."""
+        key = (registry, repo)
+        token, expires_at = self._tokens.get(key, (None, 0))
+        if token and time.time() < expires_at:
+            return token
+
+        cfg = self.REGISTRIES[registry]
+        resp = self._session(registry).get(
+            cfg["token_url"],
+            params={"service": cfg["service"], "scope": f"repository:{repo}:pull"},
+            timeout=10,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        token = data.get("token") or data.get("access_token")
+        # Tokens default to 60s when the registry doesn't say; renew a little early
+        expires_in = data.get("expires_in", 60)
+        self._tokens[key] = (token, time.time() + max(expires_in - 10, 0))
+        return token
+
+    def _fetch_digest(self, registry, repo, tag):
+        url = f"{self.REGISTRIES[registry]['api']}/v2/{repo}/manifests/{tag}"
+        for attempt in range(2):
+            headers = {
+                "Authorization": f"Bearer {self._token(registry, repo)}",
+                "Accept": self.MANIFEST_ACCEPT,
+            }
+            resp = self._session(registry).head(url, headers=headers, timeout=10)
+            if resp.status_code == 401 and attempt == 0:
+                # Token revoked or expired early; fetch a new one once
+                self._tokens.pop((registry, repo), None)
+                continue
+            break
 
+        self._note_rate_limit(registry, resp)
+        if resp.status_code == 429:
+            return None
+        resp.raise_for_status()
+        return resp.headers.get("Docker-Content-Digest")
 
-def _get_dockerhub_digest(repo, tag, cache_key):
-    """Get digest from Docker Hub.
+    def _note_rate_limit(self, registry, resp):
+        """Defer lookups to a registry that is out of (or close to) its pull budget."""
+        defer_for = 0
 
-    Requests manifest list/index types first so multi-arch images return the
-    manifest list digest (matching what Docker stores in RepoDigests at pull time).
-    """
-    # Normalize repo name
-    if "/" not in repo:
-        repo = f"library/{repo}"
-
-    # Get auth token (anonymous)
-    token_url = f"https://auth.docker.io/token?service=registry.docker.io&scope=repository:{repo}:pull"
-    token_resp = http_requests.get(token_url, timeout=10)
-    token_resp.raise_for_status()
-    token = token_resp.json()["token"]
-
-    # Get manifest digest via HEAD request
-    # Include manifest list/index types so multi-arch images return the list digest
-    manifest_url = f"https://registry-1.docker.io/v2/{repo}/manifests/{tag}"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": ", ".join([
-            "application/vnd.oci.image.index.v1+json",
-            "application/vnd.docker.distribution.manifest.list.v2+json",
-            "application/vnd.docker.distribution.manifest.v2+json",
-            "application/vnd.oci.image.manifest.v1+json",
-        ])
-    }
-    resp = http_requests.head(manifest_url, headers=headers, timeout=10)
+        retry_after = resp.headers.get("Retry-After")
+        if retry_after:
+            try:
+                defer_for = int(retry_after)
+            except ValueError:
+                try:
+                    defer_for = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    defer_for = 60
+
+        # Docker Hub: "RateLimit-Remaining: 76;w=21600"
+        remaining = resp.headers.get("RateLimit-Remaining")
+        if remaining:
+            count, _, window = remaining.partition(";w=")
+            try:
+                count = int(count)
+                if count <= self.rate_limit_floor:
+                    logger.warning(f"{registry} rate limit nearly exhausted ({count} left)")
+                    defer_for = max(defer_for, int(window or 3600))
+                else:
+                    logger.debug(f"{registry} rate limit remaining: {count}")
+            except ValueError:
+                pass
 
-    # Log rate limit
-    remaining = resp.headers.get("RateLimit-Remaining")
-    if remaining:
-        logger.info(f"Docker Hub rate limit remaining: {remaining}")
+        if resp.status_code == 429:
+            defer_for = max(defer_for, 60)
 
-    digest = resp.headers.get("Docker-Content-Digest")
-    if digest:
-        with cache_lock:
-            cache["registry"][cache_key] = {"digest": digest, "timestamp": time.time()}
-    return digest
+        if defer_for > 0:
+            with self._lock:
+                self._deferred_until[registry] = time.time() + defer_for
+            logger.warning(f"Deferring {registry} lookups for {int(defer_for)}s")
 
 
-def _get_ghcr_digest(repo, tag, cache_key):
-    """Get digest from GitHub Container Registry.
+registry_client = RegistryClient(REGISTRY_CACHE_FILE, REGISTRY_CACHE_TTL, REGISTRY_RATE_LIMIT_FLOOR) if http_requests else None
 
-    Requests manifest list/index types first so multi-arch images return the
-    manifest list digest (matching what Docker stores in RepoDigests at pull time).
-    """
-    # Remove ghcr.io/ prefix for API
-    repo_path = repo.replace("ghcr.io/", "")
-
-    # Get anonymous token
-    token_url = f"https://ghcr.io/token?service=ghcr.io&scope=repository:{repo_path}:pull"
-    token_resp = http_requests.get(token_url, timeout=10)
-    token_resp.raise_for_status()
-    token = token_resp.json()["token"]
-
-    # Get manifest digest
-    # Include manifest list/index types so multi-arch images return the list digest
-    manifest_url = f"https://ghcr.io/v2/{repo_path}/manifests/{tag}"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": ", ".join([
-            "application/vnd.oci.image.index.v1+json",
-            "application/vnd.docker.distribution.manifest.list.v2+json",
-            "application/vnd.docker.distribution.manifest.v2+json",
-            "application/vnd.oci.image.manifest.v1+json",
-        ])
-    }
-    resp = http_requests.head(manifest_url, headers=headers, timeout=10)
-    digest = resp.headers.get("Docker-Content-Digest")
-    if digest:
-        with cache_lock:
-            cache["registry"][cache_key] = {"digest": digest, "timestamp": time.time()}
-    return digest
+
+def get_registry_digest(image_ref):
+    """Query Docker Hub or GHCR for the latest manifest digest of an image."""
+    if not registry_client:
+        return None
+    return registry_client.get_digest(image_ref)
 
 
 def refresh_all_versions():
-    """Refresh version info for all Docker-based services.
+    """Refresh version info for all Docker-based services now."""
+    refresh_versions([name for name, cfg in SERVICE_REGISTRY.items() if cfg.get("type") != "http_only"])
+
+
+def refresh_versions(names):
+    """Refresh version info for the given Docker-based services and schedule
+    each one's next check.
 
     Update detection uses a two-tier approach:
     1. Local check: compare container image ID vs tag image ID (catches pulled-but-not-recreated)
     2. Remote check: compare tag RepoDigest vs registry digest (catches new upstream releases)
     An update is available if EITHER check shows a difference.
+
+    Container data is collected per host in bulk (see collect_host_versions),
+    with all hosts queried in parallel.
     """
-    for name, cfg in SERVICE_REGISTRY.items():
+    # Checks requested while this batch runs (after an update, Watchtower)
+    # must not be pushed back by the rescheduling at the end
+    with version_sched_lock:
+        due_at_start = {name: version_due.get(name) for name in names}
+
+    hosts = sorted({
+        SERVICE_REGISTRY[name]["host_ip"] for name in names
+        if SERVICE_REGISTRY[name].get("type") != "http_only" and SERVICE_REGISTRY[name].get("host_ip")
+    })
+    with ThreadPoolExecutor(max_workers=len(hosts) or 1, thread_name_prefix="version-host") as pool:
+        host_versions = dict(zip(hosts, pool.map(collect_host_versions, hosts)))
+
+    def version_info(host_ip, container):
+        return (host_versions.get(host_ip) or {}).get(container, (None, None, None, None, None))
+
+    for name in names:
+        cfg = SERVICE_REGISTRY[name]
         if cfg.get("type") == "http_only":
             continue
         if cfg.get("registry") == "local":
@@ -881,7 +1154,7 @@ def refresh_all_versions():
             container = cfg.get("container_name")
             if host_ip and container:
                 image_ref, container_image_id, tag_image_id, tag_repo_digest, version = \
-                    get_container_version_info(host_ip, container)
+                    version_info(host_ip, container)
                 with cache_lock:
                     cache["versions"][name] = {
                         "current": version or "custom",
@@ -901,7 +1174,7 @@ def refresh_all_versions():
 
         try:
             image_ref, container_image_id, tag_image_id, tag_repo_digest, version = \
-                get_container_version_info(host_ip, container)
+                version_info(host_ip, container)
             if not image_ref:
                 with cache_lock:
                     cache["versions"][name] = {
@@ -944,71 +1217,278 @@ def refresh_all_versions():
                     "update_available": False, "timestamp": time.time(),
                 }
 
+    for name in names:
+        if SERVICE_REGISTRY[name].get("type") != "http_only":
+            set_next_version_check(name, version_check_interval(name), unless_moved_from=due_at_start[name])
+
+    publish_responses()
+    if registry_client:
+        registry_client.flush()
+
+
+def version_check_interval(name):
+    """Seconds until a service's next version check, with jitter applied.
+
+    Floating tags (latest, release, ...) are checked often, full semver pins
+    rarely, and anything else at VERSION_REFRESH_INTERVAL. Failed or
+    inconclusive checks are retried sooner.
+    """
+    cfg = SERVICE_REGISTRY[name]
+    with cache_lock:
+        data = cache["versions"].get(name, {})
+
+    if data.get("current") in ("error", "unknown") or not data.get("image_ref"):
+        interval = VERSION_INTERVAL_RETRY
+    elif cfg.get("registry") == "local":
+        interval = VERSION_REFRESH_INTERVAL
+    else:
+        ref = data["image_ref"].split("@", 1)[0]
+        last = ref.rsplit("/", 1)[-1]
+        tag = last.split(":", 1)[1] if ":" in last else "latest"
+        if tag in FLOATING_TAGS:
+            interval = VERSION_INTERVAL_FLOATING
+        elif PINNED_TAG_RE.match(tag):
+            interval = VERSION_INTERVAL_PINNED
+        else:
+            interval = VERSION_REFRESH_INTERVAL
+
+    return interval * random.uniform(1 - VERSION_JITTER, 1 + VERSION_JITTER)
+
+
+def set_next_version_check(name, delay, unless_moved_from=False):
+    """Set a service's next version check to `delay` seconds from now.
+
+    With unless_moved_from, leave the schedule alone if the service's due
+    time is no longer that value (someone requested a check meanwhile).
+    """
+    due = time.time() + delay
+    with version_sched_lock:
+        if unless_moved_from is not False and version_due.get(name) != unless_moved_from:
+            return
+        version_due[name] = due
+        heapq.heappush(version_heap, (due, name))
+    version_wakeup.set()
+
+
+def request_version_check(name, delay=0):
+    """Bring a service's next version check forward (never pushes it back)."""
+    due = time.time() + delay
+    with version_sched_lock:
+        if version_due.get(name, float("inf")) <= due:
+            return
+        version_due[name] = due
+        heapq.heappush(version_heap, (due, name))
+    version_wakeup.set()
+
+
+def pop_due_version_checks():
+    """Pop services due for a check (batched by VERSION_BATCH_WINDOW).
+
+    Returns (names, seconds until the next check is due).
+    """
+    names = []
+    with version_sched_lock:
+        now = time.time()
+        while version_heap and version_heap[0][0] <= now + VERSION_BATCH_WINDOW:
+            due, name = heapq.heappop(version_heap)
+            if version_due.get(name) == due:
+                del version_due[name]
+                names.append(name)
+        wait_for = version_heap[0][0] - now if version_heap else VERSION_REFRESH_INTERVAL
+    return names, max(wait_for, 0)
+
 
 # ============================================================
 # Update Mechanism
 # ============================================================
 
+class UpdateTaskStore:
+    """Size-bounded store of update task records.
+
+    Output is kept as a list of lines so streams can follow it by index.
+    When full, the oldest finished tasks are evicted; queued and running
+    tasks are never dropped.
+    """
+
+    FINISHED = ("success", "failed")
+
+    def __init__(self, max_tasks, max_lines):
+        self.max_tasks = max_tasks
+        self.max_lines = max_lines
+        self._tasks = OrderedDict()  # task_id -> task dict (insertion = age order)
+        self._active = {}            # service_name -> task_id (queued or running)
+        self._cond = threading.Condition()
+
+    def create(self, service_name):
+        """Create a queued task, or return None if the service already has one."""
+        with self._cond:
+            if service_name in self._active:
+                return None
+            task_id = str(uuid.uuid4())[:8]
+            self._tasks[task_id] = {
+                "status": "queued",
+                "service": service_name,
+                "started": datetime.now().isoformat(),
+                "lines": [],
+                "completed": None,
+            }
+            self._active[service_name] = task_id
+            self._evict()
+            return task_id
+
+    def append(self, task_id, line):
+        with self._cond:
+            task = self._tasks.get(task_id)
+            if not task:
+                return
+            if len(task["lines"]) < self.max_lines:
+                task["lines"].append(line)
+            elif len(task["lines"]) == self.max_lines:
+                task["lines"].append("... output truncated")
+            self._cond.notify_all()
+
+    def set_status(self, task_id, status):
+        with self._cond:
+            task = self._tasks.get(task_id)
+            if not task:
+                return
+            task["status"] = status
+            if status in self.FINISHED:
+                task["completed"] = datetime.now().isoformat()
+                self._active.pop(task["service"], None)
+            self._cond.notify_all()
+
+    def get(self, task_id):
+        """Task record in the /api/update-status shape, or None."""
+        with self._cond:
+            task = self._tasks.get(task_id)
+            if not task:
+                return None
+            return {
+                "status": task["status"],
+                "service": task["service"],
+                "started": task["started"],
+                "output": "".join(f"{line}\n" for line in task["lines"]),
+                "completed": task["completed"],
+            }
+
+    def wait_for_output(self, task_id, index, timeout):
+        """Block until there are lines past `index` or the task finishes.
+
+        Returns (new_lines, status, finished); new_lines is None if the task
+        is unknown (or was evicted).
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: task_id not in self._tasks
+                or len(self._tasks[task_id]["lines"]) > index
+                or self._tasks[task_id]["completed"],
+                timeout,
+            )
+            task = self._tasks.get(task_id)
+            if not task:
+                return None, None, True
+            return task["lines"][index:], task["status"], bool(task["completed"])
+
+    def _evict(self):
+        while len(self._tasks) > self.max_tasks:
+            oldest_finished = next((tid for tid, t in self._tasks.items() if t["completed"]), None)
+            if oldest_finished is None:
+                break
+            del self._tasks[oldest_finished]
+
+
+update_tasks = UpdateTaskStore(UPDATE_TASKS_MAX, UPDATE_TASK_MAX_LINES)
+
+# Update jobs run on a bounded pool; jobs beyond a host's limit wait in that
+# host's queue (not on a pool thread) so other hosts keep progressing.
+update_executor = ThreadPoolExecutor(max_workers=UPDATE_WORKERS, thread_name_prefix="update")
+update_host_queues = {}   # host_ip -> deque of (task_id, service_name, cfg)
+update_host_running = {}  # host_ip -> running job count
+update_queue_lock = threading.Lock()
+
+
+def submit_update(task_id, service_name, cfg):
+    """Queue an update job, respecting UPDATE_MAX_PER_HOST."""
+    host_ip = cfg["host_ip"]
+    with update_queue_lock:
+        if update_host_running.get(host_ip, 0) >= UPDATE_MAX_PER_HOST:
+            update_host_queues.setdefault(host_ip, deque()).append((task_id, service_name, cfg))
+            return
+        update_host_running[host_ip] = update_host_running.get(host_ip, 0) + 1
+    update_executor.submit(_run_update_job, task_id, service_name, cfg)
+
+
+def _run_update_job(task_id, service_name, cfg):
+    """Run one update, then hand the host's slot to its next queued job."""
+    host_ip = cfg["host_ip"]
+    try:
+        perform_update(task_id, service_name, cfg)
+    finally:
+        with update_queue_lock:
+            queue = update_host_queues.get(host_ip)
+            next_job = queue.popleft() if queue else None
+            if next_job is None:
+                update_host_running[host_ip] -= 1
+        if next_job:
+            update_executor.submit(_run_update_job, *next_job)
+
+
 def perform_update(task_id, service_name, cfg):
-    """Execute docker compose pull + up for a service. Runs in background thread."""
-    lock = update_locks.setdefault(service_name, threading.Lock())
-    with lock:
-        host_ip = cfg["host_ip"]
-        compose_dir = cfg["compose_dir"]
-        container = cfg["container_name"]
-        # Use compose_service if defined (for services where compose service name != container name)
-        compose_svc = cfg.get("compose_service", container)
-
-        logger.info(f"UPDATE START: {service_name} on {host_ip} in {compose_dir}")
-        update_tasks[task_id]["output"] += f"Pulling {compose_svc} on {host_ip}...\n"
+    """Execute docker compose pull + up for a service. Output is streamed into
+    the task record line by line as the remote commands produce it."""
+    host_ip = cfg["host_ip"]
+    compose_dir = cfg["compose_dir"]
+    container = cfg["container_name"]
+    # Use compose_service if defined (for services where compose service name != container name)
+    compose_svc = cfg.get("compose_service", container)
 
+    def emit(line):
+        update_tasks.append(task_id, line)
+
+    update_tasks.set_status(task_id, "running")
+    logger.info(f"UPDATE START: {service_name} on {host_ip} in {compose_dir}")
+
+    try:
         # Step 1: Pull new image
-        stdout, rc = run_ssh_command(
+        emit(f"Pulling {compose_svc} on {host_ip}...")
+        _, rc = run_ssh_command(
             host_ip,
-            f"'cd {compose_dir} && docker compose pull {compose_svc}'",
-            timeout=300
+            f"cd {compose_dir} && docker compose pull {compose_svc}",
+            timeout=300, on_line=emit
         )
-        update_tasks[task_id]["output"] += f"Pull output: {stdout}\n"
-
         if rc != 0:
-            update_tasks[task_id]["status"] = "failed"
-            update_tasks[task_id]["output"] += f"Pull failed (rc={rc})\n"
-            update_tasks[task_id]["completed"] = datetime.now().isoformat()
+            emit(f"Pull failed (rc={rc})")
+            update_tasks.set_status(task_id, "failed")
             logger.error(f"UPDATE FAILED (pull): {service_name} rc={rc}")
             return
 
         # Step 2: Recreate container
-        stdout, rc = run_ssh_command(
+        emit(f"Recreating {compose_svc}...")
+        _, rc = run_ssh_command(
             host_ip,
-            f"'cd {compose_dir} && docker compose up -d --force-recreate {compose_svc}'",
-            timeout=180
+            f"cd {compose_dir} && docker compose up -d --force-recreate {compose_svc}",
+            timeout=180, on_line=emit
         )
-        update_tasks[task_id]["output"] += f"Recreate output: {stdout}\n"
-
-        if rc == 0:
-            update_tasks[task_id]["status"] = "success"
-            logger.info(f"UPDATE SUCCESS: {service_name}")
-            # Refresh version cache for this service
-            try:
-                image_ref, container_image_id, tag_image_id, tag_repo_digest, version = \
-                    get_container_version_info(host_ip, container)
-                with cache_lock:
-                    cache["versions"][service_name] = {
-                        "current": version or "unknown",
-                        "current_digest": container_image_id or "",
-                        "image_ref": image_ref or "",
-                        "latest_digest": tag_repo_digest or "",
-                        "update_available": False,
-                        "timestamp": time.time(),
-                    }
-            except Exception:
-                pass
-        else:
-            update_tasks[task_id]["status"] = "failed"
-            update_tasks[task_id]["output"] += f"Recreate failed (rc={rc})\n"
+        if rc != 0:
+            emit(f"Recreate failed (rc={rc})")
+            update_tasks.set_status(task_id, "failed")
             logger.error(f"UPDATE FAILED (recreate): {service_name} rc={rc}")
-
-        update_tasks[task_id]["completed"] = datetime.now().isoformat()
+            return
+    except Exception as e:
+        emit(f"Update error: {e}")
+        update_tasks.set_status(task_id, "failed")
+        logger.error(f"UPDATE FAILED: {service_name} - {e}")
+        return
+
+    update_tasks.set_status(task_id, "success")
+    logger.info(f"UPDATE SUCCESS: {service_name}")
+    # Re-check the new container right away
+    with cache_lock:
+        if service_name in cache["versions"]:
+            cache["versions"][service_name]["update_available"] = False
+    publish_responses()
+    request_version_check(service_name)
 
 
 # ============================================================
@@ -1026,29 +1506,24 @@ def health_refresh_loop():
 
 
 def version_refresh_loop():
-    """Background thread that refreshes version data."""
-    # Initial delay to let the app start
-    stop_event.wait(10)
+    """Background thread that runs version checks as they come due."""
+    # Spread the first checks out after a short startup delay
+    for name, cfg in SERVICE_REGISTRY.items():
+        if cfg.get("type") != "http_only":
+            request_version_check(name, VERSION_STARTUP_DELAY + random.uniform(0, VERSION_STARTUP_SPREAD))
+
     while not stop_event.is_set():
+        version_wakeup.clear()
+        names, wait_for = pop_due_version_checks()
+        if not names:
+            version_wakeup.wait(wait_for)
+            continue
         try:
-            refresh_all_versions()
+            refresh_versions(names)
         except Exception as e:
             logger.error(f"Version refresh error: {e}")
-        stop_event.wait(VERSION_REFRESH_INTERVAL)
-
-
-def cleanup_old_tasks():
-    """Remove update tasks older than 1 hour."""
-    while not stop_event.is_set():
-        cutoff = time.time() - 3600
-        to_remove = [
-            tid for tid, task in update_tasks.items()
-            if task.get("completed") and
-            datetime.fromisoformat(task["completed"]).timestamp() < cutoff
-        ]
-        for tid in to_remove:
-            update_tasks.pop(tid, None)
-        stop_event.wait(600)
+            for name in names:
+                request_version_check(name, VERSION_INTERVAL_RETRY)
 
 
 def start_background_threads():
@@ -1056,7 +1531,6 @@ def start_background_threads():
     threads = [
         threading.Thread(target=health_refresh_loop, daemon=True, name="health-refresh"),
         threading.Thread(target=version_refresh_loop, daemon=True, name="version-refresh"),
-        threading.Thread(target=cleanup_old_tasks, daemon=True, name="task-cleanup"),
     ]
     for t in threads:
         t.start()
@@ -1064,15 +1538,11 @@ def start_background_threads():
 
 
 # ============================================================
-# Helper: Build service response
+# Helper: Build and publish responses
 # ============================================================
 
-def build_service_data(name, cfg):
+def build_service_data(name, cfg, health_data, version_data):
     """Build the JSON response for a single service."""
-    with cache_lock:
-        health_data = cache["health"].get(name, {})
-        version_data = cache["versions"].get(name, {})
-
     is_http_only = cfg.get("type") == "http_only"
     is_local = cfg.get("registry") == "local"
     is_blacklisted = name in UPDATE_BLACKLIST
@@ -1083,6 +1553,7 @@ def build_service_data(name, cfg):
         "category": cfg["category"],
         "icon": cfg["icon"],
         "health": health_data.get("status", "unknown"),
+        "health_latency_ms": health_data.get("latency_ms"),
         "web_url": cfg.get("web_url", ""),
         "host": cfg.get("host_ip", ""),
         "type": "http_only" if is_http_only else ("local" if is_local else "docker"),
@@ -1094,46 +1565,128 @@ def build_service_data(name, cfg):
     return result
 
 
+def _serialize(body):
+    """Finish an encoded response body: (body, gzipped body, content-hash ETag)."""
+    return body, gzip.compress(body, 6), hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+def publish_responses():
+    """Rebuild the pre-serialized /api/services and /api/summary responses.
+
+    Called by the refresh threads after they update the cache. ETags are derived
+    from the content, so both gunicorn workers agree when their data does.
+    Responses whose body did not change are kept as they are, and the data
+    version only moves when at least one of them changed.
+    """
+    global published
+    with publish_lock:
+        with cache_lock:
+            health_snapshot = dict(cache["health"])
+            versions_snapshot = dict(cache["versions"])
+
+        grouped = {}
+        for cat_key, cat_name in CATEGORIES.items():
+            services = [
+                build_service_data(name, cfg, health_snapshot.get(name, {}), versions_snapshot.get(name, {}))
+                for name, cfg in SERVICE_REGISTRY.items() if cfg["category"] == cat_key
+            ]
+            grouped[cat_key] = {
+                "category": cat_key,
+                "category_display": cat_name,
+                "services": services,
+                "total": len(services),
+                "online": sum(1 for s in services if s["health"] == "online"),
+                "updates_available": sum(1 for s in services if s["update_available"]),
+            }
+
+        total = sum(g["total"] for g in grouped.values())
+        online = sum(g["online"] for g in grouped.values())
+        updates = sum(g["updates_available"] for g in grouped.values())
+        last_check = max((h["timestamp"] for h in health_snapshot.values()), default=None)
+
+        payloads = {
+            "/api/services": {
+                "categories": grouped,
+                "summary": {
+                    "total": total,
+                    "online": online,
+                    "updates_available": updates,
+                    "last_health_check": datetime.fromtimestamp(last_check).isoformat() if last_check else None,
+                },
+            },
+            "/api/summary": {
+                "total": total,
+                "online": online,
+                "offline": total - online,
+                "updates_available": updates,
+                "categories": {
+                    cat_key: {
+                        "name": group["category_display"],
+                        "total": group["total"],
+                        "online": group["online"],
+                        "updates": group["updates_available"],
+                    }
+                    for cat_key, group in grouped.items()
+                },
+            },
+        }
+        for cat_key, group in grouped.items():
+            payloads[f"/api/services/{cat_key}"] = {**group, "api_key": UPDATE_API_KEY}
+
+        responses = {}
+        changed = payloads.keys() != published["responses"].keys()
+        for path, payload in payloads.items():
+            body = json.dumps(payload).encode()
+            previous = published["responses"].get(path)
+            if previous and previous[0] == body:
+                responses[path] = previous
+            else:
+                responses[path] = _serialize(body)
+                changed = True
+
+        if changed:
+            published = {"version": published["version"] + 1, "responses": responses}
+
+
+def published_response(path):
+    """Serve a pre-serialized response with ETag/304 and gzip support.
+
+    The gzip and identity bodies differ byte for byte, so each gets its own
+    strong ETag.
+    """
+    body, gzipped, etag = published["responses"][path]
+    use_gzip = bool(request.accept_encodings["gzip"])
+    if use_gzip:
+        etag += "-gz"
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    elif use_gzip:
+        resp = Response(gzipped, mimetype="application/json")
+        resp.headers["Content-Encoding"] = "gzip"
+    else:
+        resp = Response(body, mimetype="application/json")
+    resp.set_etag(etag)
+    resp.headers["Vary"] = "Accept-Encoding"
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
+publish_responses()
+
+
 # ============================================================
 # API Routes
 # ============================================================
 
 @app.route('/health')
 def health():
-    return jsonify({"status": "ok", "services": len(SERVICE_REGISTRY)})
+    return jsonify({"status": "ok", "services": len(SERVICE_REGISTRY), "data_version": published["version"]})
 
 
 @app.route('/api/services')
 def all_services():
     """Return all services grouped by category."""
-    grouped = {}
-    for cat_key, cat_name in CATEGORIES.items():
-        services = []
-        for name, cfg in SERVICE_REGISTRY.items():
-            if cfg["category"] == cat_key:
-                services.append(build_service_data(name, cfg))
-        grouped[cat_key] = {
-            "category": cat_key,
-            "category_display": cat_name,
-            "services": services,
-            "total": len(services),
-            "online": sum(1 for s in services if s["health"] == "online"),
-            "updates_available": sum(1 for s in services if s["update_available"]),
-        }
-
-    total_services = sum(g["total"] for g in grouped.values())
-    total_online = sum(g["online"] for g in grouped.values())
-    total_updates = sum(g["updates_available"] for g in grouped.values())
-
-    return jsonify({
-        "categories": grouped,
-        "summary": {
-            "total": total_services,
-            "online": total_online,
-            "updates_available": total_updates,
-            "last_health_check": datetime.now().isoformat(),
-        }
-    })
+    return published_response("/api/services")
 
 
 @app.route('/api/services/<category>')
@@ -1141,61 +1694,17 @@ def services_by_category(category):
     """Return services for a specific category."""
     if category not in CATEGORIES:
         return jsonify({"error": "Unknown category"}), 404
-
-    services = []
-    for name, cfg in SERVICE_REGISTRY.items():
-        if cfg["category"] == category:
-            services.append(build_service_data(name, cfg))
-
-    return jsonify({
-        "category": category,
-        "category_display": CATEGORIES[category],
-        "services": services,
-        "total": len(services),
-        "online": sum(1 for s in services if s["health"] == "online"),
-        "updates_available": sum(1 for s in services if s["update_available"]),
-        "api_key": UPDATE_API_KEY,
-    })
+    return published_response(f"/api/services/{category}")
 
 
 @app.route('/api/summary')
 def summary():
     """Return a summary of all services for the sidebar widget."""
-    total = len(SERVICE_REGISTRY)
-    with cache_lock:
-        online = sum(1 for h in cache["health"].values() if h.get("status") == "online")
-        updates = sum(1 for v in cache["versions"].values() if v.get("update_available"))
-
-    categories_summary = {}
-    for cat_key, cat_name in CATEGORIES.items():
-        cat_services = [n for n, c in SERVICE_REGISTRY.items() if c["category"] == cat_key]
-        with cache_lock:
-            cat_online = sum(1 for n in cat_services if cache["health"].get(n, {}).get("status") == "online")
-            cat_updates = sum(1 for n in cat_services if cache["versions"].get(n, {}).get("update_available"))
-        categories_summary[cat_key] = {
-            "name": cat_name,
-            "total": len(cat_services),
-            "online": cat_online,
-            "updates": cat_updates,
-        }
-
-    return jsonify({
-        "total": total,
-        "online": online,
-        "offline": total - online,
-        "updates_available": updates,
-        "categories": categories_summary,
-    })
+    return published_response("/api/summary")
 
 
-@app.route('/api/update/<service_name>', methods=['POST'])
-def trigger_update(service_name):
-    """Trigger an update for a specific service."""
-    # Auth check
-    api_key = request.headers.get('X-API-Key', '')
-    if api_key != UPDATE_API_KEY:
-        return jsonify({"error": "Unauthorized"}), 401
-
+def update_refusal(service_name):
+    """Why a service can't be one-click updated, as (response, status), or None."""
     if service_name not in SERVICE_REGISTRY:
         return jsonify({"error": "Unknown service"}), 404
 
@@ -1210,26 +1719,53 @@ def trigger_update(service_name):
     if service_name in UPDATE_BLACKLIST:
         return jsonify({"error": f"Service '{service_name}' is blacklisted from one-click updates for safety."}), 403
 
-    # Check if already updating
-    if service_name in update_locks and update_locks[service_name].locked():
+    return None
+
+
+@app.route('/api/update/<service_name>', methods=['POST'])
+def trigger_update(service_name):
+    """Trigger an update for a specific service."""
+    # Auth check
+    api_key = request.headers.get('X-API-Key', '')
+    if api_key != UPDATE_API_KEY:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    refusal = update_refusal(service_name)
+    if refusal:
+        return refusal
+
+    task_id = update_tasks.create(service_name)
+    if not task_id:
         return jsonify({"error": "Update already in progress"}), 409
 
-    task_id = str(uuid.uuid4())[:8]
-    update_tasks[task_id] = {
-        "status": "running",
-        "service": service_name,
-        "started": datetime.now().isoformat(),
-        "output": "",
-        "completed": None,
-    }
+    submit_update(task_id, service_name, SERVICE_REGISTRY[service_name])
 
-    thread = threading.Thread(
-        target=perform_update, args=(task_id, service_name, cfg),
-        daemon=True, name=f"update-{service_name}"
-    )
-    thread.start()
+    return jsonify({
+        "task_id": task_id, "status": "started", "service": service_name,
+        "stream": f"/api/update-stream/{task_id}",
+    })
 
-    return jsonify({"task_id": task_id, "status": "started", "service": service_name})
+
+@app.route('/api/update-all', methods=['POST'])
+def trigger_update_all():
+    """Queue updates for every outdated service that allows one-click updates."""
+    api_key = request.headers.get('X-API-Key', '')
+    if api_key != UPDATE_API_KEY:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    with cache_lock:
+        outdated = [name for name, info in cache["versions"].items() if info.get("update_available")]
+
+    started = []
+    for service_name in outdated:
+        if update_refusal(service_name):
+            continue
+        task_id = update_tasks.create(service_name)
+        if task_id:
+            submit_update(task_id, service_name, SERVICE_REGISTRY[service_name])
+            started.append({"service": service_name, "task_id": task_id})
+
+    return jsonify({"status": "started", "tasks": started})
 
 
 @app.route('/api/update-status/<task_id>')
@@ -1241,6 +1777,57 @@ def update_status(task_id):
     return jsonify(task)
 
 
+@app.route('/api/update-stream/<task_id>')
+def update_stream(task_id):
+    """Stream an update task's output as Server-Sent Events.
+
+    Each output line is a `data:` event; a final `done` event carries the
+    task status. Streams from the start, so late subscribers see everything.
+    """
+    if not update_tasks.get(task_id):
+        return jsonify({"error": "Unknown task"}), 404
+
+    def events():
+        index = 0
+        while not stop_event.is_set():
+            lines, status, finished = update_tasks.wait_for_output(task_id, index, SSE_KEEPALIVE)
+            if lines is None:
+                return
+            for line in lines:
+                yield f"data: {line}\n\n"
+            index += len(lines)
+            if finished:
+                yield f"event: done\ndata: {json.dumps({'status': status})}\n\n"
+                return
+            if not lines:
+                yield ": keepalive\n\n"
+
+    return Response(events(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.route('/api/watchtower', methods=['POST'])
+def watchtower_event():
+    """Watchtower shoutrrr webhook: re-check services whose image it reported.
+
+    Add generic+http://<host>:5070/api/watchtower to WATCHTOWER_NOTIFICATION_URL
+    (space-separated alongside existing URLs).
+    """
+    data = request.get_data(as_text=True)
+    images = {_normalize_image_ref(img) for img in re.findall(r'Found new (.+?) image', data)}
+
+    with cache_lock:
+        matched = [
+            name for name, info in cache["versions"].items()
+            if info.get("image_ref") and _normalize_image_ref(info["image_ref"]) in images
+        ]
+    for name in matched:
+        request_version_check(name)
+
+    logger.info(f"Watchtower event: {len(images)} images, re-checking {matched or 'nothing'}")
+    return jsonify({"scheduled": matched})
+
+
 @app.route('/refresh', methods=['POST', 'GET'])
 def force_refresh():
     """Force refresh all caches."""
@@ -1266,6 +1853,12 @@ def ensure_threads():
 
 def shutdown():
     stop_event.set()
+    version_wakeup.set()
+    health_executor.shutdown(wait=False, cancel_futures=True)
+    update_executor.shutdown(wait=False, cancel_futures=True)
+    ssh_transport.close()
+    if registry_client:
+        registry_client.close()
 
 
 atexit.register(shutdown)
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Shared SSH Transport for the Glance API containers
+Runs remote commands over pooled, persistent SSH connections instead of
+spawning a fresh `ssh` process (and handshake) per command.
+
+Two modes:
+- paramiko (default when installed): one kept-alive connection per
+  user@host, many channels over it, reconnected on failure.
+- controlmaster: OpenSSH with ControlMaster/ControlPersist multiplexing.
+Select with SSH_TRANSPORT=paramiko|controlmaster.
+"""
+
+import os
+import select
+import socket
+import subprocess
+import threading
+import time
+import logging
+
+try:
+    import paramiko
+except ImportError:
+    paramiko = None
+
+logger = logging.getLogger(__name__)
+
+
+class SSHTransport:
+    """Thread-safe SSH command runner with per-host connection reuse and limits."""
+
+    def __init__(self, key_path, connect_timeout=10, keepalive=15, max_per_host=4, mode=None):
+        self.key_path = key_path
+        self.connect_timeout = connect_timeout
+        self.keepalive = keepalive
+        self.max_per_host = max_per_host
+
+        mode = mode or os.environ.get("SSH_TRANSPORT", "paramiko")
+        if mode == "paramiko" and paramiko is None:
+            logger.warning("paramiko not installed, using OpenSSH ControlMaster transport")
+            mode = "controlmaster"
+        self.mode = mode
+
+        self._clients = {}      # user@host -> paramiko.SSHClient
+        self._conn_locks = {}   # user@host -> threading.Lock (connect/reconnect)
+        self._slots = {}        # user@host -> threading.BoundedSemaphore
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------
+
+    def run(self, host, cmd, user, timeout=30, on_line=None):
+        """Run a command through the remote user's shell.
+
+        Returns (stdout, stderr, return_code). Raises TimeoutError when the
+        command does not finish in time and OSError/SSH errors when the host
+        cannot be reached.
+
+        If on_line is given it is called with each line of output (stdout and
+        stderr interleaved) as soon as the remote command produces it.
+        """
+        key = f"{user}@{host}"
+        with self._slot(key):
+            if self.mode == "controlmaster":
+                if on_line:
+                    return self._stream_controlmaster(host, cmd, user, timeout, on_line)
+                return self._run_controlmaster(host, cmd, user, timeout)
+            return self._run_paramiko(key, host, cmd, user, timeout, on_line)
+
+    def close(self):
+        """Close all pooled connections."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------
+
+    def _slot(self, key):
+        """Semaphore limiting concurrent commands per user@host."""
+        with self._lock:
+            if key not in self._slots:
+                self._slots[key] = threading.BoundedSemaphore(self.max_per_host)
+                self._conn_locks[key] = threading.Lock()
+            return self._slots[key]
+
+    def _get_client(self, key, host, user, fresh=False):
+        """Get the pooled connection for user@host, (re)connecting if needed."""
+        with self._conn_locks[key]:
+            client = self._clients.get(key)
+            transport = client.get_transport() if client else None
+            if client and not fresh and transport and transport.is_active():
+                return client
+
+            if client:
+                client.close()
+
+            client = paramiko.SSHClient()
+            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            client.connect(
+                host,
+                username=user,
+                key_filename=self.key_path,
+                timeout=self.connect_timeout,
+                banner_timeout=self.connect_timeout,
+                auth_timeout=self.connect_timeout,
+                look_for_keys=False,
+                allow_agent=False,
+            )
+            transport = client.get_transport()
+            transport.set_keepalive(self.keepalive)
+            # Commands are small request/response exchanges; don't let Nagle delay them
+            transport.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._clients[key] = client
+            logger.debug(f"SSH connected to {key}")
+            return client
+
+    def _open_channel(self, key, host, user):
+        """Open a session channel, reconnecting once if the connection went stale."""
+        client = self._get_client(key, host, user)
+        try:
+            return client.get_transport().open_session(timeout=self.connect_timeout)
+        except (paramiko.SSHException, EOFError, OSError):
+            logger.info(f"SSH connection to {key} lost, reconnecting")
+            client = self._get_client(key, host, user, fresh=True)
+            return client.get_transport().open_session(timeout=self.connect_timeout)
+
+    def _run_paramiko(self, key, host, cmd, user, timeout, on_line=None):
+        channel = self._open_channel(key, host, user)
+        try:
+            channel.exec_command(cmd)
+            out, err = [], []
+            out_lines, err_lines = _LineSplitter(on_line), _LineSplitter(on_line)
+            deadline = time.monotonic() + timeout
+
+            while True:
+                if channel.recv_ready():
+                    chunk = channel.recv(65536)
+                    out.append(chunk)
+                    out_lines.feed(chunk)
+                    continue
+                if channel.recv_stderr_ready():
+                    chunk = channel.recv_stderr(65536)
+                    err.append(chunk)
+                    err_lines.feed(chunk)
+                    continue
+                if channel.exit_status_ready():
+                    # Output can arrive together with the exit status; drain it until EOF
+                    channel.settimeout(max(deadline - time.monotonic(), 1.0))
+                    while True:
+                        chunk = channel.recv(65536)
+                        if not chunk:
+                            break
+                        out.append(chunk)
+                        out_lines.feed(chunk)
+                    while True:
+                        chunk = channel.recv_stderr(65536)
+                        if not chunk:
+                            break
+                        err.append(chunk)
+                        err_lines.feed(chunk)
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Command timed out after {timeout}s")
+                select.select([channel], [], [], min(remaining, 1.0))
+
+            out_lines.flush()
+            err_lines.flush()
+            rc = channel.recv_exit_status()
+            return (
+                b"".join(out).decode("utf-8", "replace"),
+                b"".join(err).decode("utf-8", "replace"),
+                rc,
+            )
+        finally:
+            channel.close()
+
+    def _run_controlmaster(self, host, cmd, user, timeout):
+        result = subprocess.run(
+            [
+                "ssh", "-i", self.key_path,
+                "-o", "StrictHostKeyChecking=no",
+                "-o", "BatchMode=yes",
+                "-o", f"ConnectTimeout={self.connect_timeout}",
+                "-o", f"ServerAliveInterval={self.keepalive}",
+                "-o", "ControlMaster=auto",
+                "-o", "ControlPath=/tmp/ssh-cm-%r@%h:%p",
+                "-o", "ControlPersist=300",
+                f"{user}@{host}", cmd,
+            ],
+            capture_output=True, text=True, timeout=timeout
+        )
+        return result.stdout, result.stderr, result.returncode
+
+    def _stream_controlmaster(self, host, cmd, user, timeout, on_line):
+        """ControlMaster variant of run() with on_line; stderr is merged into stdout."""
+        proc = subprocess.Popen(
+            [
+                "ssh", "-i", self.key_path,
+                "-o", "StrictHostKeyChecking=no",
+                "-o", "BatchMode=yes",
+                "-o", f"ConnectTimeout={self.connect_timeout}",
+                "-o", f"ServerAliveInterval={self.keepalive}",
+                "-o", "ControlMaster=auto",
+                "-o", "ControlPath=/tmp/ssh-cm-%r@%h:%p",
+                "-o", "ControlPersist=300",
+                f"{user}@{host}", cmd,
+            ],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        )
+        out = []
+        lines = _LineSplitter(on_line)
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Command timed out after {timeout}s")
+                ready, _, _ = select.select([proc.stdout], [], [], min(remaining, 1.0))
+                if not ready:
+                    continue
+                chunk = os.read(proc.stdout.fileno(), 65536)
+                if not chunk:
+                    break
+                out.append(chunk)
+                lines.feed(chunk)
+            lines.flush()
+            rc = proc.wait(timeout=max(deadline - time.monotonic(), 1))
+            return b"".join(out).decode("utf-8", "replace"), "", rc
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+            proc.stdout.close()
+
+
+class _LineSplitter:
+    """Feeds decoded output lines to a callback as chunks arrive."""
+
+    def __init__(self, on_line):
+        self.on_line = on_line
+        self.buffer = b""
+
+    def feed(self, chunk):
+        if not self.on_line:
+            return
+        self.buffer += chunk
+        # Progress output often redraws with \r; treat it as a line break too
+        *lines, self.buffer = self.buffer.replace(b"\r\n", b"\n").replace(b"\r", b"\n").split(b"\n")
+        for line in lines:
+            if line.strip():
+                self.on_line(line.decode("utf-8", "replace"))
+
+    def flush(self):
+        if self.on_line and self.buffer.strip():
+            self.on_line(self.buffer.decode("utf-8", "replace"))
+        self.buffer = b""
+
+
+# ------------------------------------------------------------
+# Benchmark: python3 ssh_transport.py user@host [key_path] [runs]
+# ------------------------------------------------------------
+
+def _benchmark(target, key_path, runs):
+    user, host = target.split("@", 1)
+    cmd = "echo ok"
+
+    def measure(label, fn):
+        fn()  # warm up (connects pooled transports)
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        print(f"{label:<28} p50 {samples[len(samples) // 2]:7.1f} ms   p95 {samples[int(len(samples) * 0.95) - 1]:7.1f} ms")
+
+    def spawn_per_command():
+        subprocess.run(
+            ["ssh", "-i", key_path, "-o", "StrictHostKeyChecking=no", "-o", "BatchMode=yes",
+             f"{user}@{host}", cmd],
+            capture_output=True, text=True, timeout=30
+        )
+
+    measure("ssh process per command", spawn_per_command)
+    for mode in ("controlmaster", "paramiko"):
+        if mode == "paramiko" and paramiko is None:
+            continue
+        transport = SSHTransport(key_path, mode=mode)
+        measure(f"SSHTransport ({mode})", lambda: transport.run(host, cmd, user))
+        transport.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: ssh_transport.py user@host [key_path] [runs]")
+        sys.exit(1)
+    _benchmark(
+        sys.argv[1],
+        sys.argv[2] if len(sys.argv) > 2 else "/root/.ssh/homelab_ed25519",
+        int(sys.argv[3]) if len(sys.argv) > 3 else 50,
+    )
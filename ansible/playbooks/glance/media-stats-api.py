@@ -6,10 +6,20 @@ Returns all media stats in a format suitable for the 3x3 tile grid layout.
 """
 
 import os
+import time
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 import requests
 from flask import Flask, jsonify
 from flask_cors import CORS
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 app = Flask(__name__)
 CORS(app)
 
@@ -18,108 +28,180 @@ RADARR_URL = os.getenv('RADARR_URL', 'http://192.168.40.11:7878')
 RADARR_API_KEY = os.getenv('RADARR_API_KEY', '')
 SONARR_URL = os.getenv('SONARR_URL', 'http://192.168.40.11:8989')
 SONARR_API_KEY = os.getenv('SONARR_API_KEY', '')
+REFRESH_INTERVAL = int(os.getenv('REFRESH_INTERVAL', '60'))
 
+# Pooled keep-alive sessions, one per service
+radarr_session = requests.Session()
+radarr_session.headers['X-Api-Key'] = RADARR_API_KEY
+sonarr_session = requests.Session()
+sonarr_session.headers['X-Api-Key'] = SONARR_API_KEY
 
-def fetch_radarr_stats():
-    """Fetch all Radarr statistics."""
-    headers = {'X-Api-Key': RADARR_API_KEY}
-    stats = {
-        'wanted': 0,
-        'downloading': 0,
-        'downloaded': 0
-    }
+# All six figures are fetched concurrently
+fetch_executor = ThreadPoolExecutor(max_workers=6)
 
-    try:
-        # Wanted movies
-        resp = requests.get(
-            f'{RADARR_URL}/api/v3/wanted/missing',
-            headers=headers,
-            params={'pageSize': 1},
-            timeout=5
-        )
-        if resp.ok:
-            stats['wanted'] = resp.json().get('totalRecords', 0)
-
-        # Downloading
-        resp = requests.get(
-            f'{RADARR_URL}/api/v3/queue',
-            headers=headers,
-            params={'pageSize': 1},
-            timeout=5
-        )
-        if resp.ok:
-            stats['downloading'] = resp.json().get('totalRecords', 0)
-
-        # Downloaded (movies with files)
-        resp = requests.get(
-            f'{RADARR_URL}/api/v3/movie',
-            headers=headers,
-            timeout=10
-        )
-        if resp.ok:
-            movies = resp.json()
-            stats['downloaded'] = sum(1 for m in movies if m.get('hasFile', False))
-
-    except requests.RequestException as e:
-        print(f"Radarr error: {e}")
-
-    return stats
-
-
-def fetch_sonarr_stats():
-    """Fetch all Sonarr statistics."""
-    headers = {'X-Api-Key': SONARR_API_KEY}
-    stats = {
-        'wanted': 0,
-        'downloading': 0,
-        'downloaded': 0
-    }
+# Last completed refresh, served as-is by /api/stats
+snapshot = {
+    'radarr': {'wanted': 0, 'downloading': 0, 'downloaded': 0},
+    'sonarr': {'wanted': 0, 'downloading': 0, 'downloaded': 0},
+    'timestamp': None,
+    'errors': [],
+}
+snapshot_lock = threading.Lock()
+refresh_lock = threading.Lock()
+background_thread = None
+stop_event = threading.Event()
+
+
+def fetch_total_records(session, url, timeout=5):
+    """Get totalRecords from a paged *arr endpoint without fetching the records."""
+    resp = session.get(url, params={'pageSize': 1}, timeout=timeout)
+    resp.raise_for_status()
+    return resp.json().get('totalRecords', 0)
+
+
+def stream_sum(session, url, prefix, timeout=10):
+    """Sum the values at an ijson prefix of a JSON array response.
+
+    The body is parsed incrementally as it downloads, so only the counted
+    field is ever materialized, not the whole library listing.
+    """
+    with session.get(url, timeout=timeout, stream=True) as resp:
+        resp.raise_for_status()
+        if ijson is None:
+            return sum_prefix(resp.json(), prefix)
+
+        reader = ChunkReader(resp.iter_content(chunk_size=64 * 1024))
+        return sum(ijson.items(reader, prefix))
+
+
+class ChunkReader:
+    """File-like read() over an iterator of byte chunks, for ijson."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.buffer = b''
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            chunk = next(self.chunks, b'')
+            if not chunk:
+                break
+            self.buffer += chunk
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def sum_prefix(items, prefix):
+    """Non-streaming fallback for stream_sum when ijson is unavailable."""
+    total = 0
+    for item in items:
+        for key in prefix.split('.')[1:]:
+            item = item.get(key, {}) if isinstance(item, dict) else {}
+        total += item if isinstance(item, (int, bool)) else 0
+    return total
+
+
+def count_radarr_downloaded():
+    """Count movies with files."""
+    return stream_sum(radarr_session, f'{RADARR_URL}/api/v3/movie', 'item.hasFile')
+
+
+def count_sonarr_downloaded():
+    """Count downloaded episodes across all series."""
+    return stream_sum(sonarr_session, f'{SONARR_URL}/api/v3/series', 'item.statistics.episodeFileCount')
+
+
+# (service, figure) -> fetch function
+FIGURES = {
+    ('radarr', 'wanted'): lambda: fetch_total_records(radarr_session, f'{RADARR_URL}/api/v3/wanted/missing'),
+    ('radarr', 'downloading'): lambda: fetch_total_records(radarr_session, f'{RADARR_URL}/api/v3/queue'),
+    ('radarr', 'downloaded'): count_radarr_downloaded,
+    ('sonarr', 'wanted'): lambda: fetch_total_records(sonarr_session, f'{SONARR_URL}/api/v3/wanted/missing'),
+    ('sonarr', 'downloading'): lambda: fetch_total_records(sonarr_session, f'{SONARR_URL}/api/v3/queue'),
+    ('sonarr', 'downloaded'): count_sonarr_downloaded,
+}
+
+
+def refresh_stats():
+    """Refresh all six figures concurrently.
+
+    A figure that fails for any reason (connection errors, unexpected
+    response shapes) keeps its previous value and is listed in errors. If a
+    refresh is already running, wait for it instead of starting another one.
+    """
+    global snapshot
+    if not refresh_lock.acquire(blocking=False):
+        with refresh_lock:
+            return
 
     try:
-        # Wanted episodes
-        resp = requests.get(
-            f'{SONARR_URL}/api/v3/wanted/missing',
-            headers=headers,
-            params={'pageSize': 1},
-            timeout=5
-        )
-        if resp.ok:
-            stats['wanted'] = resp.json().get('totalRecords', 0)
-
-        # Downloading
-        resp = requests.get(
-            f'{SONARR_URL}/api/v3/queue',
-            headers=headers,
-            params={'pageSize': 1},
-            timeout=5
-        )
-        if resp.ok:
-            stats['downloading'] = resp.json().get('totalRecords', 0)
-
-        # Downloaded episodes
-        resp = requests.get(
-            f'{SONARR_URL}/api/v3/series',
-            headers=headers,
-            timeout=10
-        )
-        if resp.ok:
-            series = resp.json()
-            stats['downloaded'] = sum(
-                s.get('statistics', {}).get('episodeFileCount', 0)
-                for s in series
-            )
-
-    except requests.RequestException as e:
-        print(f"Sonarr error: {e}")
-
-    return stats
+        futures = {key: fetch_executor.submit(fn) for key, fn in FIGURES.items()}
+        with snapshot_lock:
+            radarr = dict(snapshot['radarr'])
+            sonarr = dict(snapshot['sonarr'])
+        values = {'radarr': radarr, 'sonarr': sonarr}
+        errors = []
+
+        for (service, figure), future in futures.items():
+            try:
+                values[service][figure] = future.result()
+            except Exception as e:
+                errors.append(f"{service} {figure}: {e}")
+                print(f"{service.capitalize()} error ({figure}): {e}")
+
+        with snapshot_lock:
+            snapshot = {'radarr': radarr, 'sonarr': sonarr, 'timestamp': time.time(), 'errors': errors}
+    finally:
+        refresh_lock.release()
+
+
+def background_refresh():
+    """Background thread that keeps the snapshot fresh."""
+    print(f"[{datetime.now()}] Starting background refresh (every {REFRESH_INTERVAL}s)")
+    while True:
+        try:
+            refresh_stats()
+        except Exception as e:
+            print(f"[{datetime.now()}] Error refreshing stats: {e}")
+        if stop_event.wait(timeout=REFRESH_INTERVAL):
+            break
+
+    print(f"[{datetime.now()}] Background refresh stopped")
+
+
+def start_background_refresh():
+    global background_thread
+    if background_thread is None or not background_thread.is_alive():
+        stop_event.clear()
+        background_thread = threading.Thread(target=background_refresh, daemon=True)
+        background_thread.start()
+
+
+def stop_background_refresh():
+    stop_event.set()
+    if background_thread and background_thread.is_alive():
+        background_thread.join(timeout=5)
+    fetch_executor.shutdown(wait=False)
+
+
+atexit.register(stop_background_refresh)
 
 
 @app.route('/api/stats')
 def get_stats():
     """Return combined media stats for Glance dashboard grid."""
-    radarr = fetch_radarr_stats()
-    sonarr = fetch_sonarr_stats()
+    with snapshot_lock:
+        current = snapshot
+    if current['timestamp'] is None:
+        # First request before the background refresh finished
+        refresh_stats()
+        with snapshot_lock:
+            current = snapshot
+
+    radarr = current['radarr']
+    sonarr = current['sonarr']
 
     # Return structured data for the 6-tile grid (3x2)
     return jsonify({
@@ -162,7 +244,10 @@ def get_stats():
             }
         ],
         'radarr': radarr,
-        'sonarr': sonarr
+        'sonarr': sonarr,
+        'updated': datetime.fromtimestamp(current['timestamp']).isoformat() if current['timestamp'] else None,
+        'age_seconds': round(time.time() - current['timestamp'], 1) if current['timestamp'] else None,
+        'errors': current['errors']
     })
 
 
@@ -172,5 +257,7 @@ def health():
     return jsonify({'status': 'ok'})
 
 
+start_background_refresh()
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5054, debug=False)
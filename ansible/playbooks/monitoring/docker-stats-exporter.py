@@ -3,98 +3,88 @@
 Docker Stats Prometheus Exporter
 Exposes container metrics with proper container names.
 Includes uptime and start time metrics.
+Per-container stats are fetched concurrently into a snapshot; a custom
+collector exports the latest snapshot at scrape time, so only containers
+that currently exist have series.
+
+On cgroup v2 hosts, CPU, memory, block I/O, throttling, pressure (PSI),
+page fault, PID and network counters are read straight from the cgroup
+hierarchy and /proc instead of the Docker stats API
+(COLLECTION_BACKEND=auto|cgroup|api). Containers whose cgroup can't be
+found fall back to the API.
+
+The container inventory is loaded once and then kept current from the
+Docker events stream, which also drives the restart and OOM counters.
+
+`python3 docker-stats-exporter.py --churn-check [cycles] [containers]`
+replays container create/destroy churn against a stand-in Docker client and
+checks that the number of exported series stays flat.
 """
 
+import itertools
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timezone
 import docker
-from prometheus_client import start_http_server, Gauge, Info
-from prometheus_client.core import GaugeMetricFamily, REGISTRY
+from prometheus_client import start_http_server, Counter
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, REGISTRY
 
 REFRESH_INTERVAL = int(os.getenv("REFRESH_INTERVAL", "15"))
 EXPORTER_PORT = int(os.getenv("EXPORTER_PORT", "9417"))
-
-# Docker client
-client = docker.from_env()
-
-# Metrics
-container_cpu_percent = Gauge(
-    'docker_container_cpu_percent',
-    'CPU usage percentage',
-    ['name', 'id', 'image']
-)
-
-container_memory_usage = Gauge(
-    'docker_container_memory_usage_bytes',
-    'Memory usage in bytes',
-    ['name', 'id', 'image']
-)
-
-container_memory_limit = Gauge(
-    'docker_container_memory_limit_bytes',
-    'Memory limit in bytes',
-    ['name', 'id', 'image']
-)
-
-container_memory_percent = Gauge(
-    'docker_container_memory_percent',
-    'Memory usage percentage',
-    ['name', 'id', 'image']
-)
-
-container_network_rx = Gauge(
-    'docker_container_network_rx_bytes',
-    'Network received bytes',
-    ['name', 'id', 'image']
-)
-
-container_network_tx = Gauge(
-    'docker_container_network_tx_bytes',
-    'Network transmitted bytes',
-    ['name', 'id', 'image']
-)
-
-container_status = Gauge(
-    'docker_container_running',
-    'Container running status (1=running, 0=stopped)',
-    ['name', 'id', 'image', 'status']
-)
-
-host_total_memory = Gauge(
-    'docker_host_memory_total_bytes',
-    'Total host memory in bytes',
-    ['host']
-)
-
-host_containers_total = Gauge(
-    'docker_host_containers_total',
-    'Total number of containers',
-    ['host']
-)
-
-host_containers_running = Gauge(
-    'docker_host_containers_running',
-    'Number of running containers',
-    ['host']
-)
-
-host_uptime_seconds = Gauge(
-    'docker_host_uptime_seconds',
-    'Host VM uptime in seconds',
-    ['host']
-)
-
-container_uptime_seconds = Gauge(
-    'docker_container_uptime_seconds',
-    'Container uptime in seconds',
-    ['name', 'id', 'image']
-)
-
-container_started_at = Gauge(
-    'docker_container_started_at',
-    'Container start time as Unix timestamp',
-    ['name', 'id', 'image']
+STATS_WORKERS = int(os.getenv("STATS_WORKERS", "16"))
+STATS_TIMEOUT = float(os.getenv("STATS_TIMEOUT", "10"))
+COLLECTION_BACKEND = os.getenv("COLLECTION_BACKEND", "auto")  # auto | cgroup | api
+CGROUP_ROOT = os.getenv("CGROUP_ROOT", "/sys/fs/cgroup")
+PROC_ROOT = os.getenv("PROC_ROOT", "/host/proc")
+
+# Docker client and container inventory, created by main()
+client = None
+inventory = None
+
+# Each stats call blocks ~1-2s while Docker samples CPU, so fetch them in parallel
+stats_executor = ThreadPoolExecutor(max_workers=STATS_WORKERS, thread_name_prefix="stats")
+
+# Per-container gauges exported from the snapshot: (metric, help, value key)
+CONTAINER_METRICS = [
+    ('docker_container_cpu_percent', 'CPU usage percentage', 'cpu_percent'),
+    ('docker_container_memory_usage_bytes', 'Memory usage in bytes', 'memory_usage'),
+    ('docker_container_memory_limit_bytes', 'Memory limit in bytes', 'memory_limit'),
+    ('docker_container_memory_percent', 'Memory usage percentage', 'memory_percent'),
+    ('docker_container_network_rx_bytes', 'Network received bytes', 'network_rx'),
+    ('docker_container_network_tx_bytes', 'Network transmitted bytes', 'network_tx'),
+    ('docker_container_pids', 'Number of processes and threads in the container', 'pids'),
+]
+
+# Per-container counters exported from the snapshot: (metric, help, value key)
+CONTAINER_COUNTERS = [
+    ('docker_container_blkio_read_bytes', 'Block I/O bytes read', 'io_read_bytes'),
+    ('docker_container_blkio_write_bytes', 'Block I/O bytes written', 'io_write_bytes'),
+    ('docker_container_blkio_reads', 'Block I/O read operations', 'io_reads'),
+    ('docker_container_blkio_writes', 'Block I/O write operations', 'io_writes'),
+    ('docker_container_cpu_periods', 'CPU CFS enforcement periods elapsed', 'cpu_periods'),
+    ('docker_container_cpu_throttled_periods', 'CPU CFS periods in which the container was throttled', 'cpu_throttled_periods'),
+    ('docker_container_cpu_throttled_seconds', 'Time the container was CPU throttled in seconds', 'cpu_throttled_seconds'),
+    ('docker_container_cpu_pressure_some_seconds', 'CPU PSI: time some tasks stalled waiting for CPU', 'cpu_pressure_some'),
+    ('docker_container_cpu_pressure_full_seconds', 'CPU PSI: time all tasks stalled waiting for CPU', 'cpu_pressure_full'),
+    ('docker_container_memory_pressure_some_seconds', 'Memory PSI: time some tasks stalled on memory', 'memory_pressure_some'),
+    ('docker_container_memory_pressure_full_seconds', 'Memory PSI: time all tasks stalled on memory', 'memory_pressure_full'),
+    ('docker_container_io_pressure_some_seconds', 'I/O PSI: time some tasks stalled on I/O', 'io_pressure_some'),
+    ('docker_container_io_pressure_full_seconds', 'I/O PSI: time all tasks stalled on I/O', 'io_pressure_full'),
+    ('docker_container_page_faults', 'Page faults', 'page_faults'),
+    ('docker_container_major_page_faults', 'Major page faults', 'major_page_faults'),
+    ('docker_container_restarts', 'Container restarts seen in the Docker event stream', 'restarts'),
+    ('docker_container_oom_events', 'OOM kill events seen in the Docker event stream', 'oom_events'),
+]
+
+# Latest completed collection cycle, replaced as a whole by collect_metrics()
+latest_snapshot = None
+
+# Exporter self-metrics (duration and timestamp are exported from the snapshot)
+exporter_stats_errors = Counter(
+    'docker_exporter_stats_errors_total',
+    'Per-container stats fetches that failed or missed the cycle timeout'
 )
 
 
@@ -124,103 +114,692 @@ def get_network_stats(stats):
     return rx_bytes, tx_bytes
 
 
+def get_blkio_stats(stats):
+    """Extract block I/O totals from Docker stats (cgroup v1 or v2 layout)."""
+    values = {}
+    blkio = stats.get('blkio_stats') or {}
+    for key, read_key, write_key in (
+        ('io_service_bytes_recursive', 'io_read_bytes', 'io_write_bytes'),
+        ('io_serviced_recursive', 'io_reads', 'io_writes'),
+    ):
+        entries = blkio.get(key)
+        if not entries:
+            continue
+        values[read_key] = sum(e.get('value', 0) for e in entries if e.get('op', '').lower() == 'read')
+        values[write_key] = sum(e.get('value', 0) for e in entries if e.get('op', '').lower() == 'write')
+    return values
+
+
+def values_from_api_stats(stats):
+    """Convert a Docker stats API sample to snapshot values."""
+    mem_usage = stats['memory_stats'].get('usage', 0)
+    mem_limit = stats['memory_stats'].get('limit', 0)
+    rx, tx = get_network_stats(stats)
+    values = {
+        'cpu_percent': calculate_cpu_percent(stats),
+        'memory_usage': mem_usage,
+        'memory_limit': mem_limit,
+        'memory_percent': (mem_usage / mem_limit * 100) if mem_limit > 0 else 0,
+        'network_rx': rx,
+        'network_tx': tx,
+    }
+    values.update(get_blkio_stats(stats))
+
+    throttling = stats['cpu_stats'].get('throttling_data') or {}
+    if throttling:
+        values['cpu_periods'] = throttling.get('periods', 0)
+        values['cpu_throttled_periods'] = throttling.get('throttled_periods', 0)
+        values['cpu_throttled_seconds'] = throttling.get('throttled_time', 0) / 1e9
+
+    memory_detail = stats['memory_stats'].get('stats') or {}
+    if 'pgfault' in memory_detail:
+        values['page_faults'] = memory_detail['pgfault']
+        values['major_page_faults'] = memory_detail.get('pgmajfault', 0)
+
+    pids = (stats.get('pids_stats') or {}).get('current')
+    if pids is not None:
+        values['pids'] = pids
+    return values
+
+
+class CgroupReader:
+    """Reads container stats directly from the cgroup v2 hierarchy.
+
+    A handful of small file reads per container instead of a daemon round-trip
+    with a one-second sampling window. CPU percent is derived from the
+    usage delta between consecutive cycles, so it appears from the second
+    cycle a container is seen.
+    """
+
+    def __init__(self, cgroup_root, proc_root):
+        self.cgroup_root = cgroup_root
+        self.proc_root = proc_root
+        self._dirs = {}         # container id -> cgroup directory
+        self._cpu_samples = {}  # container id -> (usage_usec, monotonic time)
+
+    @property
+    def available(self):
+        return os.path.exists(os.path.join(self.cgroup_root, 'cgroup.controllers'))
+
+    def read(self, container_id, pid, host_memory_total):
+        """Snapshot values for one container, or None if its cgroup isn't found."""
+        cgroup_dir = self._cgroup_dir(container_id)
+        if not cgroup_dir:
+            return None
+
+        cpu_stat = self._read_keyed(os.path.join(cgroup_dir, 'cpu.stat'))
+        mem_usage = int(self._read_file(os.path.join(cgroup_dir, 'memory.current')))
+        mem_max = self._read_file(os.path.join(cgroup_dir, 'memory.max'))
+        # Unlimited containers report the host's memory as their limit, like the API
+        mem_limit = host_memory_total if mem_max == 'max' else int(mem_max)
+
+        values = {
+            'memory_usage': mem_usage,
+            'memory_limit': mem_limit,
+            'memory_percent': (mem_usage / mem_limit * 100) if mem_limit > 0 else 0,
+        }
+
+        if 'nr_periods' in cpu_stat:
+            values['cpu_periods'] = cpu_stat['nr_periods']
+            values['cpu_throttled_periods'] = cpu_stat.get('nr_throttled', 0)
+            values['cpu_throttled_seconds'] = cpu_stat.get('throttled_usec', 0) / 1e6
+
+        memory_stat = self._read_keyed(os.path.join(cgroup_dir, 'memory.stat'), optional=True)
+        if 'pgfault' in memory_stat:
+            values['page_faults'] = memory_stat['pgfault']
+            values['major_page_faults'] = memory_stat.get('pgmajfault', 0)
+
+        pids = self._read_file(os.path.join(cgroup_dir, 'pids.current'), optional=True)
+        if pids:
+            values['pids'] = int(pids)
+
+        for resource in ('cpu', 'memory', 'io'):
+            pressure = self._read_pressure(os.path.join(cgroup_dir, f'{resource}.pressure'))
+            for kind, total_usec in pressure.items():
+                values[f'{resource}_pressure_{kind}'] = total_usec / 1e6
+
+        now = time.monotonic()
+        usage = cpu_stat.get('usage_usec', 0)
+        previous = self._cpu_samples.get(container_id)
+        self._cpu_samples[container_id] = (usage, now)
+        if previous and now > previous[1]:
+            values['cpu_percent'] = max(usage - previous[0], 0) / ((now - previous[1]) * 1e6) * 100.0
+
+        values.update(self._read_io(cgroup_dir))
+        if pid:
+            values.update(self._read_net(pid))
+        return values
+
+    def prune(self, live_ids):
+        """Forget containers that no longer exist."""
+        for cache in (self._dirs, self._cpu_samples):
+            for container_id in list(cache):
+                if container_id not in live_ids:
+                    del cache[container_id]
+
+    def _cgroup_dir(self, container_id):
+        cgroup_dir = self._dirs.get(container_id)
+        if cgroup_dir and os.path.isdir(cgroup_dir):
+            return cgroup_dir
+        # systemd cgroup driver, then cgroupfs driver
+        for candidate in (
+            os.path.join(self.cgroup_root, 'system.slice', f'docker-{container_id}.scope'),
+            os.path.join(self.cgroup_root, 'docker', container_id),
+        ):
+            if os.path.isdir(candidate):
+                self._dirs[container_id] = candidate
+                return candidate
+        return None
+
+    @staticmethod
+    def _read_file(path, optional=False):
+        try:
+            with open(path) as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            if optional:
+                return None
+            raise
+
+    @staticmethod
+    def _read_keyed(path, optional=False):
+        """Parse a flat keyed file like cpu.stat ("key value" per line)."""
+        values = {}
+        try:
+            with open(path) as f:
+                for line in f:
+                    key, _, value = line.partition(' ')
+                    if value:
+                        values[key] = int(value)
+        except FileNotFoundError:
+            if not optional:
+                raise
+        return values
+
+    @staticmethod
+    def _read_pressure(path):
+        """Parse a PSI file ("some avg10=0.00 avg60=0.00 avg300=0.00 total=123").
+
+        Returns {'some': total_usec, 'full': total_usec}; empty if PSI is off.
+        """
+        totals = {}
+        try:
+            with open(path) as f:
+                for line in f:
+                    kind, _, fields = line.partition(' ')
+                    for pair in fields.split():
+                        key, _, value = pair.partition('=')
+                        if key == 'total':
+                            totals[kind] = int(value)
+        except (FileNotFoundError, OSError):
+            # Missing when the controller or PSI (psi=0) is disabled
+            return {}
+        return totals
+
+    @staticmethod
+    def _read_io(cgroup_dir):
+        """Sum io.stat across devices ("8:0 rbytes=1 wbytes=2 rios=3 wios=4 ...")."""
+        totals = {'io_read_bytes': 0, 'io_write_bytes': 0, 'io_reads': 0, 'io_writes': 0}
+        fields = {'rbytes': 'io_read_bytes', 'wbytes': 'io_write_bytes', 'rios': 'io_reads', 'wios': 'io_writes'}
+        try:
+            with open(os.path.join(cgroup_dir, 'io.stat')) as f:
+                for line in f:
+                    for pair in line.split()[1:]:
+                        key, _, value = pair.partition('=')
+                        if key in fields:
+                            totals[fields[key]] += int(value)
+        except FileNotFoundError:
+            return {}
+        return totals
+
+    def _read_net(self, pid):
+        """Sum non-loopback interface counters from the container's network namespace."""
+        rx = tx = 0
+        try:
+            with open(os.path.join(self.proc_root, str(pid), 'net', 'dev')) as f:
+                for line in f.readlines()[2:]:
+                    iface, _, data = line.partition(':')
+                    if iface.strip() == 'lo':
+                        continue
+                    fields = data.split()
+                    rx += int(fields[0])
+                    tx += int(fields[8])
+        except (FileNotFoundError, ProcessLookupError):
+            return {}
+        return {'network_rx': rx, 'network_tx': tx}
+
+
+cgroup_reader = CgroupReader(CGROUP_ROOT, PROC_ROOT)
+
+
+def parse_started_at(started_at_str):
+    """Parse Docker's StartedAt (e.g. "2024-12-21T08:00:00.123456789Z") to a datetime."""
+    # Handle nanoseconds by truncating to microseconds
+    if '.' in started_at_str:
+        base, frac = started_at_str.rsplit('.', 1)
+        # Remove 'Z' and truncate to 6 digits for microseconds
+        frac = frac.rstrip('Z')[:6]
+        started_at_str = f"{base}.{frac}+00:00"
+    else:
+        started_at_str = started_at_str.replace('Z', '+00:00')
+    return datetime.fromisoformat(started_at_str)
+
+
+class ContainerInventory:
+    """In-memory container inventory kept current from `docker events`.
+
+    Containers are inspected once when first seen and again only when an
+    event says something changed; start times are parsed once per start and
+    image tags are cached by image ID. Restarts and OOM kills are counted
+    from the event stream.
+    """
+
+    EVENTS = ['create', 'start', 'die', 'destroy', 'rename', 'update', 'oom', 'pause', 'unpause']
+
+    def __init__(self, docker_client):
+        self.client = docker_client
+        self._containers = {}  # container id -> entry dict
+        self._image_tags = {}  # image id -> display tag
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Load the inventory and follow the event stream in the background."""
+        since_ns = time.time_ns()
+        self._sync()
+        threading.Thread(target=self._follow_events, args=(since_ns,), daemon=True, name="docker-events").start()
+
+    def snapshot(self):
+        """Copies of all inventory entries."""
+        with self._lock:
+            return [dict(entry) for entry in self._containers.values()]
+
+    def _sync(self):
+        """Reconcile with a full container listing (startup and after stream errors)."""
+        listed = {c['Id'] for c in self.client.api.containers(all=True)}
+        with self._lock:
+            for container_id in set(self._containers) - listed:
+                del self._containers[container_id]
+        for container_id in listed:
+            self._inspect(container_id)
+
+    def _follow_events(self, since_ns):
+        # Reconnects resume from the last event's nanosecond timestamp. The
+        # daemon also returns events at exactly that instant, so the ones
+        # already applied there are skipped by (id, action, timeNano).
+        seen = set()
+        while True:
+            try:
+                for event in self.client.events(
+                    decode=True, since=f"{since_ns // 10**9}.{since_ns % 10**9:09d}",
+                    filters={'type': 'container', 'event': self.EVENTS},
+                ):
+                    time_ns = event.get('timeNano') or event.get('time', 0) * 10**9
+                    key = (event.get('id'), event.get('Action') or event.get('status'), time_ns)
+                    if time_ns < since_ns or key in seen:
+                        continue
+                    if time_ns > since_ns:
+                        since_ns = time_ns
+                        seen.clear()
+                    seen.add(key)
+                    self._apply(event)
+            except Exception as e:
+                print(f"Docker event stream error: {e}")
+            time.sleep(5)
+            try:
+                self._sync()
+            except Exception as e:
+                print(f"Error resyncing container inventory: {e}")
+
+    def _apply(self, event):
+        action = event.get('Action') or event.get('status')
+        container_id = event.get('id') or event.get('Actor', {}).get('ID')
+        if not container_id:
+            return
+
+        if action == 'destroy':
+            with self._lock:
+                self._containers.pop(container_id, None)
+            return
+
+        if action == 'oom':
+            with self._lock:
+                entry = self._containers.get(container_id)
+                if entry:
+                    entry['oom_events'] += 1
+            return
+
+        if action == 'start':
+            # Every start except a container's first one is a restart. Decided
+            # from the event sequence, since by the time we inspect, the
+            # container may already be in a later state.
+            with self._lock:
+                entry = self._containers.get(container_id)
+                if entry:
+                    if entry['first_start_pending']:
+                        entry['first_start_pending'] = False
+                    else:
+                        entry['restarts'] += 1
+
+        # create, start, die, rename, update, pause, unpause: re-read the container
+        self._inspect(container_id)
+
+        if action == 'create':
+            with self._lock:
+                entry = self._containers.get(container_id)
+                if entry:
+                    entry['first_start_pending'] = True
+
+    def _inspect(self, container_id):
+        try:
+            attrs = self.client.api.inspect_container(container_id)
+        except docker.errors.NotFound:
+            with self._lock:
+                self._containers.pop(container_id, None)
+            return
+        except Exception as e:
+            print(f"Error inspecting container {container_id[:12]}: {e}")
+            return
+
+        state = attrs.get('State', {})
+        status = state.get('Status', 'unknown')
+        started_at = state.get('StartedAt', '')
+        start_time = None
+        if status == 'running' and started_at:
+            try:
+                start_time = parse_started_at(started_at).timestamp()
+            except Exception as e:
+                print(f"Error parsing start time for {attrs.get('Name')}: {e}")
+
+        image_tag = self._image_tag(attrs.get('Image', ''))
+        # Docker reports 0001-01-01T00:00:00Z for never-started containers
+        never_started = not started_at or started_at.startswith('0001-')
+        with self._lock:
+            entry = self._containers.setdefault(container_id, {
+                'id': container_id,
+                'restarts': 0,
+                'oom_events': 0,
+                'first_start_pending': never_started,
+            })
+            entry.update({
+                'name': attrs.get('Name', '').lstrip('/'),
+                'short_id': container_id[:12],
+                'image': image_tag,
+                'status': status,
+                'pid': state.get('Pid') or None,
+                'start_time': start_time,
+            })
+
+    def _image_tag(self, image_id):
+        tag = self._image_tags.get(image_id)
+        if tag is None:
+            try:
+                tags = self.client.api.inspect_image(image_id).get('RepoTags') or []
+            except Exception:
+                tags = []
+            short_id = image_id[:17] if image_id.startswith('sha256:') else image_id[:10]
+            tag = tags[0] if tags else short_id
+            self._image_tags[image_id] = tag
+        return tag
+
+
+
 def collect_metrics():
-    """Collect metrics from all containers."""
+    """Collect one snapshot of host and container metrics.
+
+    Stats are fetched in parallel (bounded by STATS_TIMEOUT) and the finished
+    snapshot replaces latest_snapshot in one assignment, so a scrape always
+    sees a single complete cycle.
+    """
+    global latest_snapshot
     hostname = os.uname().nodename
+    started = time.monotonic()
 
     try:
         # Host info
         info = client.info()
-        host_total_memory.labels(host=hostname).set(info.get('MemTotal', 0))
-        host_containers_total.labels(host=hostname).set(info.get('Containers', 0))
-        host_containers_running.labels(host=hostname).set(info.get('ContainersRunning', 0))
+        host = {
+            'name': hostname,
+            'memory_total': info.get('MemTotal', 0),
+            'containers_total': info.get('Containers', 0),
+            'containers_running': info.get('ContainersRunning', 0),
+            'uptime': None,
+        }
 
         # Host uptime from /proc/uptime
         try:
             with open('/proc/uptime', 'r') as f:
-                uptime_seconds = float(f.read().split()[0])
-                host_uptime_seconds.labels(host=hostname).set(uptime_seconds)
+                host['uptime'] = float(f.read().split()[0])
         except Exception as e:
             print(f"Error reading host uptime: {e}")
 
-        # Container stats
-        containers = client.containers.list(all=True)
-
-        for container in containers:
-            name = container.name
-            cid = container.short_id
-            image = container.image.tags[0] if container.image.tags else container.image.short_id
-            status = container.status
-
-            # Status metric
-            is_running = 1 if status == 'running' else 0
-            container_status.labels(name=name, id=cid, image=image, status=status).set(is_running)
-
-            # Uptime metrics (only for running containers)
-            if status == 'running':
+        # Container inventory (kept current by the event stream)
+        records = []
+        for entry in inventory.snapshot():
+            record = {
+                'labels': [entry['name'], entry['short_id'], entry['image']],
+                'status': entry['status'],
+                # Uptime metrics (only for running containers)
+                'start_time': entry['start_time'],
+                'values': {'restarts': entry['restarts'], 'oom_events': entry['oom_events']},
+            }
+            records.append((record, entry))
+
+        # Container stats: cgroup fast path where possible, API (concurrently) otherwise
+        running = [(record, entry) for record, entry in records if record['status'] == 'running']
+        api_needed = running
+        if COLLECTION_BACKEND != 'api' and cgroup_reader.available:
+            api_needed = []
+            for record, entry in running:
                 try:
-                    started_at_str = container.attrs['State'].get('StartedAt', '')
-                    if started_at_str:
-                        # Parse ISO 8601 timestamp (e.g., "2024-12-21T08:00:00.123456789Z")
-                        # Handle nanoseconds by truncating to microseconds
-                        if '.' in started_at_str:
-                            base, frac = started_at_str.rsplit('.', 1)
-                            # Remove 'Z' and truncate to 6 digits for microseconds
-                            frac = frac.rstrip('Z')[:6]
-                            started_at_str = f"{base}.{frac}+00:00"
-                        else:
-                            started_at_str = started_at_str.replace('Z', '+00:00')
-
-                        start_time = datetime.fromisoformat(started_at_str)
-                        now = datetime.now(timezone.utc)
-                        uptime = (now - start_time).total_seconds()
-
-                        container_uptime_seconds.labels(name=name, id=cid, image=image).set(uptime)
-                        container_started_at.labels(name=name, id=cid, image=image).set(start_time.timestamp())
-                except Exception as e:
-                    print(f"Error getting uptime for {name}: {e}")
-
-            if status == 'running':
-                try:
-                    stats = container.stats(stream=False)
-
-                    # CPU
-                    cpu_pct = calculate_cpu_percent(stats)
-                    container_cpu_percent.labels(name=name, id=cid, image=image).set(cpu_pct)
-
-                    # Memory
-                    mem_usage = stats['memory_stats'].get('usage', 0)
-                    mem_limit = stats['memory_stats'].get('limit', 0)
-                    mem_pct = (mem_usage / mem_limit * 100) if mem_limit > 0 else 0
-
-                    container_memory_usage.labels(name=name, id=cid, image=image).set(mem_usage)
-                    container_memory_limit.labels(name=name, id=cid, image=image).set(mem_limit)
-                    container_memory_percent.labels(name=name, id=cid, image=image).set(mem_pct)
-
-                    # Network
-                    rx, tx = get_network_stats(stats)
-                    container_network_rx.labels(name=name, id=cid, image=image).set(rx)
-                    container_network_tx.labels(name=name, id=cid, image=image).set(tx)
-
-                except Exception as e:
-                    print(f"Error collecting stats for {name}: {e}")
+                    values = cgroup_reader.read(entry['id'], entry['pid'], host['memory_total'])
+                except (OSError, ValueError) as e:
+                    print(f"Error reading cgroup stats for {entry['name']}: {e}")
+                    values = None
+                if values is None:
+                    api_needed.append((record, entry))
+                else:
+                    record['values'].update(values)
+            cgroup_reader.prune({entry['id'] for _, entry in running})
+
+        futures = {
+            stats_executor.submit(client.api.stats, entry['id'], stream=False): record
+            for record, entry in api_needed
+        }
+        done, not_done = wait(futures, timeout=STATS_TIMEOUT) if futures else (set(), set())
+        for future in done:
+            record = futures[future]
+            try:
+                record['values'].update(values_from_api_stats(future.result()))
+            except Exception as e:
+                exporter_stats_errors.inc()
+                print(f"Error collecting stats for {record['labels'][0]}: {e}")
+        for future in not_done:
+            future.cancel()
+            exporter_stats_errors.inc()
+            print(f"Stats for {futures[future]['labels'][0]} timed out after {STATS_TIMEOUT}s")
+
+        latest_snapshot = {
+            'host': host,
+            'containers': [record for record, _ in records],
+            'duration': time.monotonic() - started,
+            'timestamp': time.time(),
+        }
 
     except Exception as e:
         print(f"Error collecting metrics: {e}")
 
+    return time.monotonic() - started
+
+
+class DockerStatsCollector:
+    """Exports the latest snapshot at scrape time.
+
+    Series exist only for containers present in the snapshot, so recreated
+    containers and status changes don't leave stale label sets behind.
+    """
+
+    def collect(self):
+        snapshot = latest_snapshot
+        if snapshot is None:
+            return
+
+        host = snapshot['host']
+        host_metrics = [
+            ('docker_host_memory_total_bytes', 'Total host memory in bytes', host['memory_total']),
+            ('docker_host_containers_total', 'Total number of containers', host['containers_total']),
+            ('docker_host_containers_running', 'Number of running containers', host['containers_running']),
+            ('docker_host_uptime_seconds', 'Host VM uptime in seconds', host['uptime']),
+        ]
+        for metric, doc, value in host_metrics:
+            family = GaugeMetricFamily(metric, doc, labels=['host'])
+            if value is not None:
+                family.add_metric([host['name']], value)
+            yield family
+
+        containers = snapshot['containers']
+        label_names = ['name', 'id', 'image']
+
+        running = GaugeMetricFamily(
+            'docker_container_running', 'Container running status (1=running, 0=stopped)',
+            labels=label_names + ['status']
+        )
+        uptime = GaugeMetricFamily('docker_container_uptime_seconds', 'Container uptime in seconds', labels=label_names)
+        started_at = GaugeMetricFamily(
+            'docker_container_started_at', 'Container start time as Unix timestamp', labels=label_names
+        )
+        now = time.time()
+        for record in containers:
+            running.add_metric(record['labels'] + [record['status']], 1 if record['status'] == 'running' else 0)
+            if record['start_time']:
+                uptime.add_metric(record['labels'], now - record['start_time'])
+                started_at.add_metric(record['labels'], record['start_time'])
+        yield running
+        yield uptime
+        yield started_at
+
+        for metric, doc, key in CONTAINER_METRICS:
+            family = GaugeMetricFamily(metric, doc, labels=label_names)
+            for record in containers:
+                if key in record['values']:
+                    family.add_metric(record['labels'], record['values'][key])
+            yield family
+
+        for metric, doc, key in CONTAINER_COUNTERS:
+            family = CounterMetricFamily(metric, doc, labels=label_names)
+            for record in containers:
+                if key in record['values']:
+                    family.add_metric(record['labels'], record['values'][key])
+            yield family
+
+        yield GaugeMetricFamily(
+            'docker_exporter_collection_duration_seconds',
+            'Duration of the last collection cycle in seconds', value=snapshot['duration']
+        )
+        yield GaugeMetricFamily(
+            'docker_exporter_last_collection_timestamp_seconds',
+            'Unix timestamp of the last completed collection cycle', value=snapshot['timestamp']
+        )
+
 
 def main():
     """Main function."""
+    global client, inventory
     print(f"Starting Docker Stats Exporter on port {EXPORTER_PORT}")
     print(f"Refresh interval: {REFRESH_INTERVAL}s")
+    if COLLECTION_BACKEND != 'api' and cgroup_reader.available:
+        print(f"Collection backend: cgroup v2 ({CGROUP_ROOT}), Docker API fallback")
+    else:
+        if COLLECTION_BACKEND == 'cgroup':
+            print(f"cgroup v2 not mounted at {CGROUP_ROOT}, falling back to the Docker API")
+        print("Collection backend: Docker API")
+
+    # Connection pool sized for the stats workers
+    client = docker.from_env(max_pool_size=STATS_WORKERS)
+    inventory = ContainerInventory(client)
+    inventory.start()
 
     # Start Prometheus HTTP server
+    REGISTRY.register(DockerStatsCollector())
     start_http_server(EXPORTER_PORT)
 
     while True:
+        duration = collect_metrics()
+        # Keep a steady cadence: the cycle's own duration counts toward the interval
+        time.sleep(max(REFRESH_INTERVAL - duration, 1))
+
+
+# ------------------------------------------------------------
+# Churn check: python3 docker-stats-exporter.py --churn-check [cycles] [containers]
+# ------------------------------------------------------------
+
+class _FakeDockerClient:
+    """Stand-in for the parts of docker.DockerClient the exporter uses."""
+
+    IMAGE_ID = 'sha256:' + '0' * 64
+
+    def __init__(self):
+        self.api = self
+        self.attrs = {}  # container id -> inspect output
+
+    def info(self):
+        return {'MemTotal': 8 << 30, 'Containers': len(self.attrs), 'ContainersRunning': len(self.attrs)}
+
+    def inspect_container(self, container_id):
+        if container_id not in self.attrs:
+            raise docker.errors.NotFound(container_id)
+        return self.attrs[container_id]
+
+    def inspect_image(self, image_id):
+        return {'RepoTags': ['churn:latest']}
+
+    def stats(self, container_id, stream=False):
+        return {
+            'cpu_stats': {'cpu_usage': {'total_usage': 200}, 'system_cpu_usage': 2000, 'online_cpus': 2},
+            'precpu_stats': {'cpu_usage': {'total_usage': 100}, 'system_cpu_usage': 1000},
+            'memory_stats': {'usage': 64 << 20, 'limit': 1 << 30},
+            'networks': {'eth0': {'rx_bytes': 1, 'tx_bytes': 2}},
+        }
+
+
+def _churn_check(cycles, containers):
+    """Recreate half the containers every cycle and check series stay bounded.
+
+    Containers keep their names but get new IDs, like a compose redeploy, so
+    a leak of old label sets shows up as a growing series count.
+    """
+    global client, inventory, COLLECTION_BACKEND
+    from prometheus_client import CollectorRegistry, generate_latest
+
+    client = _FakeDockerClient()
+    inventory = ContainerInventory(client)
+    COLLECTION_BACKEND = 'api'
+    registry = CollectorRegistry()
+    registry.register(DockerStatsCollector())
+    serial = itertools.count()
+    live = []
+
+    def create(slot):
+        next(serial)
+        container_id = os.urandom(32).hex()
+        client.attrs[container_id] = {
+            'Name': f'/churn-{slot}',
+            'Image': client.IMAGE_ID,
+            'State': {
+                'Status': 'running',
+                'StartedAt': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+                'Pid': 0,
+            },
+        }
+        inventory._apply({'Action': 'create', 'id': container_id})
+        inventory._apply({'Action': 'start', 'id': container_id})
+        live.append((slot, container_id))
+
+    def destroy(slot, container_id):
+        client.attrs[container_id]['State']['Status'] = 'exited'
+        inventory._apply({'Action': 'die', 'id': container_id})
+        del client.attrs[container_id]
+        inventory._apply({'Action': 'destroy', 'id': container_id})
+
+    def exported():
+        lines = generate_latest(registry).decode().splitlines()
+        series = [line for line in lines if line and not line.startswith('#')]
+        ids = {line.split('id="', 1)[1].split('"', 1)[0] for line in series if 'id="' in line}
+        return len(series), ids
+
+    for slot in range(containers):
+        create(slot)
+    collect_metrics()
+    baseline, _ = exported()
+
+    worst = baseline
+    for cycle in range(1, cycles + 1):
+        for slot, container_id in live[:containers // 2]:
+            destroy(slot, container_id)
+            create(slot)
+        del live[:containers // 2]
         collect_metrics()
-        time.sleep(REFRESH_INTERVAL)
+
+        count, ids = exported()
+        worst = max(worst, count)
+        expected_ids = {container_id[:12] for _, container_id in live}
+        if count != baseline or ids != expected_ids or len(inventory.snapshot()) != containers:
+            print(f"FAIL cycle {cycle}: {count} series (baseline {baseline}), "
+                  f"{len(ids)} exported ids, {len(inventory.snapshot())} inventory entries, "
+                  f"{containers} containers")
+            return False
+
+    print(f"{cycles} cycles, {next(serial)} containers created, {containers} alive: "
+          f"series baseline {baseline}, max {worst}")
+    return True
 
 
 if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == '--churn-check':
+        ok = _churn_check(
+            int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+            int(sys.argv[3]) if len(sys.argv) > 3 else 40,
+        )
+        sys.exit(0 if ok else 1)
     main()
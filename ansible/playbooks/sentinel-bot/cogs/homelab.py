@@ -3,12 +3,14 @@ Sentinel Bot - Homelab Cog
 Commands for Proxmox cluster and infrastructure management.
 """
 
+import asyncio
 import logging
 import json
 import discord
+from dataclasses import dataclass
 from discord import app_commands
 from discord.ext import commands
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from core.progress import make_progress_bar, ProgressEmbed
 
@@ -17,6 +19,19 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger('sentinel.cogs.homelab')
 
+# /insight timeouts (seconds): per host, and per whole probe
+INSIGHT_HOST_TIMEOUT = 15
+INSIGHT_PROBE_TIMEOUT = 30
+
+_TIMED_OUT = object()
+
+
+@dataclass
+class InsightSection:
+    """Outcome of one /insight probe."""
+    level: Optional[str]  # 'issue', 'warning', 'healthy' or None (informational)
+    text: str
+
 
 class HomelabCog(commands.Cog, name="Homelab"):
     """Proxmox cluster and infrastructure management."""
@@ -53,7 +68,8 @@ class HomelabCog(commands.Cog, name="Homelab"):
             name="📦 Containers",
             value=(
                 "`/check` `/update <name>` `/restart <name>`\n"
-                "`/containers` `/logs <name>` `/vmcheck`"
+                "`/containers` `/logs <name>` `/vmcheck`\n"
+                "`/updateall` runs as a background job → `/jobs`"
             ),
             inline=False
         )
@@ -109,30 +125,153 @@ class HomelabCog(commands.Cog, name="Homelab"):
         """Check homelab health: high memory, errors, storage, and issues."""
         await interaction.response.defer()
 
-        progress = ProgressEmbed(":mag: Analyzing Homelab Health...", 5)
-        status_msg = await interaction.followup.send(embed=progress.embed)
-
-        issues = []
-        warnings = []
-        healthy = []
-
         # Docker hosts to check
         docker_hosts = [
             ('utilities', self.config.ssh.docker_utilities_ip),
             ('media', self.config.ssh.docker_media_ip),
             ('glance', self.config.ssh.docker_glance_ip),
         ]
+        all_hosts = docker_hosts + [
+            ('traefik', self.config.ssh.traefik_ip),
+            ('authentik', self.config.ssh.authentik_ip),
+        ]
+        nodes = [
+            ('node01', self.config.ssh.node01_ip),
+            ('node02', self.config.ssh.node02_ip),
+            ('node03', self.config.ssh.node03_ip),
+        ]
 
-        # Step 1: Check container memory usage
-        progress.update(0, ":hourglass: Checking container memory usage...")
-        await status_msg.edit(embed=progress.embed)
+        # Independent probes, run concurrently; each fills its own field as it finishes
+        probes = [
+            ("Memory", self._insight_memory(docker_hosts)),
+            ("Containers", self._insight_containers(docker_hosts)),
+            ("Disk", self._insight_disk(all_hosts)),
+            ("Proxmox", self._insight_proxmox(nodes)),
+            ("Downloads", self._insight_downloads()),
+        ]
 
-        high_memory_containers = []
-        for host_name, host_ip in docker_hosts:
-            result = await self.ssh.run(
-                host_ip,
-                'docker stats --no-stream --format "{{.Name}}:{{.MemPerc}}" 2>/dev/null'
+        progress = ProgressEmbed(":mag: Analyzing Homelab Health...", len(probes))
+        progress.update(0, f":hourglass: Running {len(probes)} checks...")
+        for name, _ in probes:
+            progress.embed.add_field(name=name, value=":hourglass: Checking...", inline=True)
+        status_msg = await interaction.followup.send(embed=progress.embed)
+
+        async def run_probe(index: int, name: str, probe) -> Tuple[int, InsightSection]:
+            try:
+                section = await asyncio.wait_for(probe, timeout=INSIGHT_PROBE_TIMEOUT)
+            except asyncio.TimeoutError:
+                section = InsightSection('warning', f"⏱️ **{name}**: timed out after {INSIGHT_PROBE_TIMEOUT}s")
+            except Exception as e:
+                logger.error(f"Insight probe {name} failed: {e}")
+                section = InsightSection('warning', f"⚠️ **{name}**: check failed")
+            return index, section
+
+        tasks = [run_probe(i, name, probe) for i, (name, probe) in enumerate(probes)]
+        sections: List[InsightSection] = [None] * len(probes)
+
+        for done, next_result in enumerate(asyncio.as_completed(tasks), start=1):
+            index, section = await next_result
+            sections[index] = section
+
+            pending = [probes[i][0] for i, s in enumerate(sections) if s is None]
+            status = f":hourglass: Waiting on {', '.join(pending)}..." if pending else "Finishing up..."
+            progress.update(done, status)
+            progress.embed.set_field_at(index + 1, name=probes[index][0], value=section.text[:1024], inline=True)
+            try:
+                await status_msg.edit(embed=progress.embed)
+            except discord.HTTPException as e:
+                logger.debug(f"Insight progress edit failed: {e}")
+
+        issues = [s.text for s in sections if s.level == 'issue']
+        warnings = [s.text for s in sections if s.level == 'warning']
+        healthy = [s.text for s in sections if s.level == 'healthy']
+
+        # Build final embed
+        total_issues = len(issues) + len(warnings)
+        if total_issues == 0:
+            color = discord.Color.green()
+            title = "✅ Homelab Health: All Clear!"
+        elif issues:
+            color = discord.Color.red()
+            title = f"🚨 Homelab Health: {len(issues)} Issue(s) Found"
+        else:
+            color = discord.Color.yellow()
+            title = f"⚠️ Homelab Health: {len(warnings)} Warning(s)"
+
+        embed = progress.complete(title, "Health check complete", color)
+        embed.clear_fields()
+
+        if issues:
+            embed.add_field(
+                name="🚨 Issues",
+                value="\n".join(issues) or "None",
+                inline=False
+            )
+
+        if warnings:
+            embed.add_field(
+                name="⚠️ Warnings",
+                value="\n".join(warnings) or "None",
+                inline=False
             )
+
+        if healthy and not issues:
+            embed.add_field(
+                name="✅ Healthy",
+                value="\n".join(healthy[:5]),
+                inline=False
+            )
+
+        embed.set_footer(text="Run /check for container updates • /downloads for queue status")
+        await status_msg.edit(embed=embed)
+
+    async def _probe_hosts(
+        self,
+        hosts: List[Tuple[str, str]],
+        probe: Callable[[str], Awaitable[Any]]
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Run a probe against several hosts concurrently, each with its own timeout.
+
+        Returns:
+            (results by host name, names of hosts that timed out)
+        """
+        async def bounded(host_ip: str):
+            try:
+                return await asyncio.wait_for(probe(host_ip), timeout=INSIGHT_HOST_TIMEOUT)
+            except asyncio.TimeoutError:
+                return _TIMED_OUT
+
+        outcomes = await asyncio.gather(*(bounded(host_ip) for _, host_ip in hosts))
+
+        results = {}
+        timed_out = []
+        for (host_name, _), outcome in zip(hosts, outcomes):
+            if outcome is _TIMED_OUT:
+                timed_out.append(host_name)
+            else:
+                results[host_name] = outcome
+        return results, timed_out
+
+    @staticmethod
+    def _with_timeouts(section: InsightSection, timed_out: List[str]) -> InsightSection:
+        """Mark hosts that did not answer in time; a clean result becomes a warning."""
+        if not timed_out:
+            return section
+        text = f"{section.text} (⏱️ timeout: {', '.join(timed_out)})"
+        if section.level in ('healthy', None):
+            return InsightSection('warning', text.replace("✅", "🟡", 1))
+        return InsightSection(section.level, text)
+
+    async def _insight_memory(self, docker_hosts: List[Tuple[str, str]]) -> InsightSection:
+        """Probe: containers using more than 80% of their memory limit."""
+        results, timed_out = await self._probe_hosts(docker_hosts, lambda host_ip: self.ssh.run(
+            host_ip,
+            'docker stats --no-stream --format "{{.Name}}:{{.MemPerc}}" 2>/dev/null'
+        ))
+
+        high_memory_containers = []
+        for result in results.values():
             if result.success:
                 for line in result.output.split('\n'):
                     if ':' in line:
@@ -145,20 +284,20 @@ class HomelabCog(commands.Cog, name="Homelab"):
                             pass
 
         if high_memory_containers:
-            issues.append(f"🔴 **High Memory** ({len(high_memory_containers)}): " + ", ".join(high_memory_containers[:5]))
+            section = InsightSection('issue', f"🔴 **High Memory** ({len(high_memory_containers)}): " + ", ".join(high_memory_containers[:5]))
         else:
-            healthy.append("✅ Container memory usage normal")
+            section = InsightSection('healthy', "✅ Container memory usage normal")
+        return self._with_timeouts(section, timed_out)
 
-        # Step 2: Check for unhealthy/restarting containers
-        progress.update(1, ":hourglass: Checking container health...")
-        await status_msg.edit(embed=progress.embed)
+    async def _insight_containers(self, docker_hosts: List[Tuple[str, str]]) -> InsightSection:
+        """Probe: restarting, unhealthy or crashed containers."""
+        results, timed_out = await self._probe_hosts(docker_hosts, lambda host_ip: self.ssh.run(
+            host_ip,
+            'docker ps -a --format "{{.Names}}:{{.Status}}" 2>/dev/null'
+        ))
 
         unhealthy_containers = []
-        for host_name, host_ip in docker_hosts:
-            result = await self.ssh.run(
-                host_ip,
-                'docker ps -a --format "{{.Names}}:{{.Status}}" 2>/dev/null'
-            )
+        for result in results.values():
             if result.success:
                 for line in result.output.split('\n'):
                     if ':' in line:
@@ -172,22 +311,22 @@ class HomelabCog(commands.Cog, name="Homelab"):
                             unhealthy_containers.append(f"{name} (crashed)")
 
         if unhealthy_containers:
-            issues.append(f"🔴 **Unhealthy Containers** ({len(unhealthy_containers)}): " + ", ".join(unhealthy_containers[:5]))
+            section = InsightSection('issue', f"🔴 **Unhealthy Containers** ({len(unhealthy_containers)}): " + ", ".join(unhealthy_containers[:5]))
         else:
-            healthy.append("✅ All containers healthy")
-
-        # Step 3: Check disk usage
-        progress.update(2, ":hourglass: Checking disk usage...")
-        await status_msg.edit(embed=progress.embed)
+            section = InsightSection('healthy', "✅ All containers healthy")
+        return self._with_timeouts(section, timed_out)
+
+    async def _insight_disk(self, hosts: List[Tuple[str, str]]) -> InsightSection:
+        """Probe: root filesystems above 80% usage."""
+        results, timed_out = await self._probe_hosts(
+            hosts,
+            lambda host_ip: self.ssh.run(host_ip, "df -h / | tail -1 | awk '{print $5}'")
+        )
 
         disk_warnings = []
-        all_hosts = docker_hosts + [
-            ('traefik', self.config.ssh.traefik_ip),
-            ('authentik', self.config.ssh.authentik_ip),
-        ]
-        for host_name, host_ip in all_hosts:
-            result = await self.ssh.run(host_ip, "df -h / | tail -1 | awk '{print $5}'")
-            if result.success:
+        for host_name, _ in hosts:
+            result = results.get(host_name)
+            if result and result.success:
                 try:
                     usage = int(result.output.replace('%', '').strip())
                     if usage > 90:
@@ -198,17 +337,22 @@ class HomelabCog(commands.Cog, name="Homelab"):
                     pass
 
         if disk_warnings:
-            warnings.append(f"💾 **Disk Usage**: " + ", ".join(disk_warnings))
+            section = InsightSection('warning', f"💾 **Disk Usage**: " + ", ".join(disk_warnings))
         else:
-            healthy.append("✅ Disk usage normal (<80%)")
+            section = InsightSection('healthy', "✅ Disk usage normal (<80%)")
+        return self._with_timeouts(section, timed_out)
 
-        # Step 4: Check Proxmox nodes
-        progress.update(3, ":hourglass: Checking Proxmox nodes...")
-        await status_msg.edit(embed=progress.embed)
+    async def _insight_proxmox(self, nodes: List[Tuple[str, str]]) -> InsightSection:
+        """Probe: Proxmox node CPU/RAM pressure and reachability."""
+        results, timed_out = await self._probe_hosts(nodes, self.ssh.pve_node_status)
 
         proxmox_issues = []
-        for node_name, node_ip in [('node01', self.config.ssh.node01_ip), ('node02', self.config.ssh.node02_ip), ('node03', self.config.ssh.node03_ip)]:
-            result = await self.ssh.pve_node_status(node_ip)
+        for node_name, _ in nodes:
+            if node_name in timed_out:
+                proxmox_issues.append(f"{node_name} timeout ⏱️")
+                continue
+
+            result = results[node_name]
             if result.success:
                 try:
                     data = json.loads(result.stdout)
@@ -231,73 +375,39 @@ class HomelabCog(commands.Cog, name="Homelab"):
                 proxmox_issues.append(f"{node_name} unreachable 🔴")
 
         if proxmox_issues:
-            warnings.append(f"🖥️ **Proxmox**: " + ", ".join(proxmox_issues))
-        else:
-            healthy.append("✅ Proxmox nodes healthy")
+            return InsightSection('warning', f"🖥️ **Proxmox**: " + ", ".join(proxmox_issues))
+        return InsightSection('healthy', "✅ Proxmox nodes healthy")
+
+    async def _insight_downloads(self) -> InsightSection:
+        """Probe: failed or stalled items in the Radarr/Sonarr queues."""
+        services = [
+            ('radarr', "🎬", f"{self.bot.config.api.radarr_url}/api/v3/queue"),
+            ('sonarr', "📺", f"{self.bot.config.api.sonarr_url}/api/v3/queue"),
+        ]
 
-        # Step 5: Check for failed downloads
-        progress.update(4, ":hourglass: Checking download queues...")
-        await status_msg.edit(embed=progress.embed)
+        async def fetch(service: str, url: str):
+            try:
+                return await asyncio.wait_for(self.bot.api_get(url, service), timeout=INSIGHT_HOST_TIMEOUT)
+            except asyncio.TimeoutError:
+                return _TIMED_OUT
+
+        queues = await asyncio.gather(*(fetch(service, url) for service, _, url in services))
 
         failed_downloads = []
-        # Check Radarr
-        radarr_url = f"{self.bot.config.api.radarr_url}/api/v3/queue"
-        radarr_data = await self.bot.api_get(radarr_url, 'radarr')
-        if radarr_data:
-            for item in radarr_data.get('records', []):
-                if item.get('status', '').lower() in ['failed', 'warning']:
-                    failed_downloads.append(f"🎬 {item.get('title', 'Unknown')[:20]}")
-
-        # Check Sonarr
-        sonarr_url = f"{self.bot.config.api.sonarr_url}/api/v3/queue"
-        sonarr_data = await self.bot.api_get(sonarr_url, 'sonarr')
-        if sonarr_data:
-            for item in sonarr_data.get('records', []):
-                if item.get('status', '').lower() in ['failed', 'warning']:
-                    failed_downloads.append(f"📺 {item.get('title', 'Unknown')[:20]}")
+        timed_out = []
+        for (service, emoji, _), data in zip(services, queues):
+            if data is _TIMED_OUT:
+                timed_out.append(service)
+            elif data:
+                for item in data.get('records', []):
+                    if item.get('status', '').lower() in ['failed', 'warning']:
+                        failed_downloads.append(f"{emoji} {item.get('title', 'Unknown')[:20]}")
 
         if failed_downloads:
-            warnings.append(f"⬇️ **Failed Downloads** ({len(failed_downloads)}): " + ", ".join(failed_downloads[:3]))
-
-        # Build final embed
-        total_issues = len(issues) + len(warnings)
-        if total_issues == 0:
-            color = discord.Color.green()
-            title = "✅ Homelab Health: All Clear!"
-        elif issues:
-            color = discord.Color.red()
-            title = f"🚨 Homelab Health: {len(issues)} Issue(s) Found"
+            section = InsightSection('warning', f"⬇️ **Failed Downloads** ({len(failed_downloads)}): " + ", ".join(failed_downloads[:3]))
         else:
-            color = discord.Color.yellow()
-            title = f"⚠️ Homelab Health: {len(warnings)} Warning(s)"
-
-        embed = progress.complete(title, "Health check complete", color)
-        embed.clear_fields()
-
-        if issues:
-            embed.add_field(
-                name="🚨 Issues",
-                value="\n".join(issues) or "None",
-                inline=False
-            )
-
-        if warnings:
-            embed.add_field(
-                name="⚠️ Warnings",
-                value="\n".join(warnings) or "None",
-                inline=False
-            )
-
-        if healthy and not issues:
-            embed.add_field(
-                name="✅ Healthy",
-                value="\n".join(healthy[:5]),
-                inline=False
-            )
-
-        embed.set_footer(text="Run /check for container updates • /downloads for queue status")
-
-        await status_msg.edit(embed=embed)
+            section = InsightSection(None, "✅ No failed downloads")
+        return self._with_timeouts(section, timed_out)
 
     @property
     def config(self):
@@ -0,0 +1,148 @@
+"""
+Sentinel Bot - Jobs Cog
+Inspect background jobs and follow their progress.
+"""
+
+import asyncio
+import logging
+import discord
+from discord import app_commands
+from discord.ext import commands
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from core.progress import make_progress_bar
+
+if TYPE_CHECKING:
+    from core import SentinelBot
+
+logger = logging.getLogger('sentinel.cogs.jobs')
+
+STATUS_EMOJIS = {
+    'queued': ":hourglass:",
+    'running': ":arrows_counterclockwise:",
+    'completed': ":white_check_mark:",
+    'failed': ":x:",
+}
+
+# Live view refresh settings (interaction tokens expire after 15 minutes)
+LIVE_REFRESH_SECONDS = 5
+LIVE_MAX_SECONDS = 600
+
+
+class JobsCog(commands.Cog, name="Jobs"):
+    """Background job status and live progress."""
+
+    def __init__(self, bot: 'SentinelBot'):
+        self.bot = bot
+
+    @property
+    def db(self):
+        return self.bot.db
+
+    @app_commands.command(name="jobs", description="Show background jobs or follow one live")
+    @app_commands.describe(job_id="Job ID to follow (omit to list recent jobs)")
+    async def jobs_command(self, interaction: discord.Interaction, job_id: Optional[int] = None):
+        """List recent jobs, or show live progress for a single job."""
+        await interaction.response.defer()
+
+        if not self.db:
+            await interaction.followup.send(":x: Database not available")
+            return
+
+        if job_id is None:
+            await interaction.followup.send(embed=await self._list_embed())
+            return
+
+        job = await self.db.get_job(job_id)
+        if not job:
+            await interaction.followup.send(f":x: Job #{job_id} not found")
+            return
+
+        status_msg = await interaction.followup.send(embed=await self._job_embed(job))
+
+        # Keep the view live while the job is unfinished
+        elapsed = 0
+        while job['status'] in ('queued', 'running') and elapsed < LIVE_MAX_SECONDS:
+            await asyncio.sleep(LIVE_REFRESH_SECONDS)
+            elapsed += LIVE_REFRESH_SECONDS
+
+            job = await self.db.get_job(job_id)
+            if not job:
+                break
+            try:
+                await status_msg.edit(embed=await self._job_embed(job))
+            except discord.HTTPException as e:
+                logger.debug(f"Stopped live view of job #{job_id}: {e}")
+                break
+
+    async def _list_embed(self) -> discord.Embed:
+        """Build the recent jobs overview."""
+        jobs = await self.db.get_recent_jobs(limit=10)
+
+        embed = discord.Embed(title=":gear: Background Jobs", color=discord.Color.blue())
+        if not jobs:
+            embed.description = "No jobs yet."
+            return embed
+
+        lines = []
+        for job in jobs:
+            emoji = STATUS_EMOJIS.get(job['status'], ":grey_question:")
+            line = f"{emoji} **#{job['id']}** `{job['kind']}` - {job['status']}"
+            if job['status'] == 'running' and job['step_total']:
+                line += f" ({job['step_current'] + 1}/{job['step_total']}: {job['step_status']})"
+            elif job['status'] == 'failed' and job['error']:
+                line += f" ({job['error'][:60]})"
+            lines.append(line)
+
+        embed.description = "\n".join(lines)
+        embed.set_footer(text="Use /jobs <id> to follow a job live")
+        return embed
+
+    async def _job_embed(self, job: Dict[str, Any]) -> discord.Embed:
+        """Build the detail view for a single job."""
+        status = job['status']
+        color = {
+            'queued': discord.Color.blue(),
+            'running': discord.Color.yellow(),
+            'completed': discord.Color.green(),
+            'failed': discord.Color.red(),
+        }.get(status, discord.Color.greyple())
+
+        total = job['step_total'] or 0
+        if status == 'completed':
+            done = total
+        elif status == 'running':
+            done = job['step_current'] or 0
+        else:
+            done = 0
+
+        embed = discord.Embed(
+            title=f"{STATUS_EMOJIS.get(status, '')} Job #{job['id']}: {job['kind']}",
+            description=make_progress_bar(done, total) if total else status.title(),
+            color=color
+        )
+        embed.add_field(name="Status", value=status.title(), inline=True)
+        if job['step_status']:
+            embed.add_field(name="Step", value=job['step_status'], inline=True)
+        if job['attempts'] > 1:
+            embed.add_field(name="Attempt", value=f"{job['attempts']}/{job['max_attempts']}", inline=True)
+        if job['result']:
+            embed.add_field(name="Result", value=job['result'][:1000], inline=False)
+        if job['error']:
+            embed.add_field(name="Error", value=job['error'][:1000], inline=False)
+
+        logs = await self.db.get_job_logs(job['id'], limit=8)
+        if logs:
+            embed.add_field(
+                name="Log",
+                value="\n".join(f"`{log['timestamp'][11:19]}` {log['message'][:100]}" for log in logs),
+                inline=False
+            )
+
+        embed.set_footer(text=f"Requested by {job['created_by'] or 'system'} • Created {job['created_at']} UTC")
+        return embed
+
+
+async def setup(bot: 'SentinelBot'):
+    """Load the Jobs cog."""
+    await bot.add_cog(JobsCog(bot))
@@ -18,6 +18,7 @@ from config import (
     NODE_SHUTDOWN_ORDER, NODE_STARTUP_ORDER,
     LXC_STARTUP_ORDER, CRITICAL_LXCS
 )
+from core.jobs import JobContext, JobError
 
 if TYPE_CHECKING:
     from core import SentinelBot
@@ -28,6 +29,9 @@ logger = logging.getLogger('sentinel.cogs.power')
 CONFIRM_EMOJI = "\u26a0\ufe0f"  # Warning sign
 CANCEL_EMOJI = "\u274c"  # Red X
 
+# How long a confirmation prompt stays tracked (it expires for approval after 60s)
+CONFIRMATION_TRACK_SECONDS = 3600
+
 
 @dataclass
 class PowerOperationReport:
@@ -132,7 +136,13 @@ class PowerCog(commands.Cog, name="Power"):
 
     def __init__(self, bot: 'SentinelBot'):
         self.bot = bot
-        self._pending_confirmations: dict = {}
+
+    async def cog_load(self):
+        """Register background job and reaction handlers."""
+        self.bot.jobs.register('power.shutdownall', self._perform_shutdown_all)
+        self.bot.jobs.register('power.shutdown-nodns', self._perform_shutdown_nodns)
+        self.bot.jobs.register('power.startall', self._perform_startup_all)
+        self.bot.reactions.add_handler('power.confirm', self._on_confirm_reaction)
 
     @property
     def ssh(self):
@@ -191,7 +201,7 @@ class PowerCog(commands.Cog, name="Power"):
                 ":warning: **Everything will be offline!**\n"
                 "Use `/startall` to bring it back up."
             ),
-            callback=self._perform_shutdown_all
+            job_kind='power.shutdownall'
         )
 
     # ==================== Shutdown (Keep DNS) ====================
@@ -256,7 +266,7 @@ class PowerCog(commands.Cog, name="Power"):
                 f"- {len(nodes_to_shutdown)} nodes ({', '.join(nodes_to_shutdown)})\n\n"
                 ":information_source: DNS will remain available."
             ),
-            callback=self._perform_shutdown_nodns
+            job_kind='power.shutdown-nodns'
         )
 
     # ==================== Start All ====================
@@ -310,7 +320,7 @@ class PowerCog(commands.Cog, name="Power"):
                 "4. Start all VMs\n\n"
                 f":hourglass: This may take 5-10 minutes.{warning_text}"
             ),
-            callback=self._perform_startup_all
+            job_kind='power.startall'
         )
 
     # ==================== Confirmation Pattern ====================
@@ -321,7 +331,7 @@ class PowerCog(commands.Cog, name="Power"):
         operation: str,
         title: str,
         description: str,
-        callback
+        job_kind: str
     ):
         """Show confirmation embed and wait for reaction approval."""
         embed = discord.Embed(
@@ -338,38 +348,35 @@ class PowerCog(commands.Cog, name="Power"):
         await msg.add_reaction(CONFIRM_EMOJI)
         await msg.add_reaction(CANCEL_EMOJI)
 
-        # Store pending confirmation
-        self._pending_confirmations[msg.id] = {
+        # Track pending confirmation (kept past expiry so late reactions get a reply)
+        await self.bot.reactions.track(msg.id, 'power.confirm', {
             'operation': operation,
             'user_id': interaction.user.id,
-            'callback': callback,
-            'message': msg,
-            'channel': interaction.channel,
+            'job_kind': job_kind,
             'expires': time.time() + 60,
-        }
+        }, ttl=CONFIRMATION_TRACK_SECONDS)
 
-    @commands.Cog.listener()
-    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+    async def _on_confirm_reaction(self, payload: discord.RawReactionActionEvent, info: dict):
         """Handle confirmation reactions."""
-        # Ignore bot's own reactions
-        if payload.user_id == self.bot.user.id:
-            return
-
-        # Check if this is a pending confirmation
-        if payload.message_id not in self._pending_confirmations:
-            return
-
-        info = self._pending_confirmations[payload.message_id]
         emoji = str(payload.emoji)
 
         # Only original user can confirm
         if payload.user_id != info['user_id']:
             return
 
+        channel = self.bot.get_channel(payload.channel_id)
+        if channel is None:
+            return
+        try:
+            message = await channel.fetch_message(payload.message_id)
+        except discord.HTTPException as e:
+            logger.warning(f"Confirmation message {payload.message_id} unavailable: {e}")
+            await self.bot.reactions.untrack(payload.message_id)
+            return
+
         # Check expiration
         if time.time() > info['expires']:
-            del self._pending_confirmations[payload.message_id]
-            message = info['message']
+            await self.bot.reactions.untrack(payload.message_id)
             embed = discord.Embed(
                 title=":clock1: Operation Expired",
                 description="Confirmation timed out. Please run the command again.",
@@ -379,17 +386,29 @@ class PowerCog(commands.Cog, name="Power"):
             await message.clear_reactions()
             return
 
-        message = info['message']
-
         if emoji == CONFIRM_EMOJI:
-            # Execute the operation
-            del self._pending_confirmations[payload.message_id]
+            # Hand the operation to the job runner; it edits this message as it goes
+            await self.bot.reactions.untrack(payload.message_id)
             await message.clear_reactions()
-            await info['callback'](message, info['channel'])
+
+            job_id = await self.bot.jobs.enqueue(
+                info['job_kind'],
+                resources=[f"node:{name}" for name in PROXMOX_NODES],
+                created_by=str(payload.user_id),
+                channel_id=message.channel.id,
+                message_id=message.id
+            )
+            embed = discord.Embed(
+                title=":inbox_tray: Power Operation Queued",
+                description=f"Job #{job_id} will start as soon as no other power job holds the nodes.",
+                color=discord.Color.blue()
+            )
+            embed.set_footer(text=f"Job #{job_id} • /jobs {job_id} for live progress")
+            await message.edit(embed=embed)
 
         elif emoji == CANCEL_EMOJI:
             # Cancel
-            del self._pending_confirmations[payload.message_id]
+            await self.bot.reactions.untrack(payload.message_id)
             embed = discord.Embed(
                 title=":x: Operation Cancelled",
                 description="Power operation was cancelled by user.",
@@ -400,8 +419,16 @@ class PowerCog(commands.Cog, name="Power"):
 
     # ==================== Shutdown Implementation ====================
 
-    async def _perform_shutdown_all(self, message: discord.Message, channel):
-        """Execute full cluster shutdown."""
+    async def _job_message(self, ctx: JobContext) -> discord.Message:
+        """Get the progress message for a power job."""
+        message = await ctx.get_message()
+        if message is None:
+            raise JobError("Progress channel is no longer available")
+        return message
+
+    async def _perform_shutdown_all(self, ctx: JobContext) -> str:
+        """Job: execute full cluster shutdown."""
+        message = await self._job_message(ctx)
         report = PowerOperationReport(operation='shutdown')
 
         # Update embed to show progress
@@ -414,19 +441,24 @@ class PowerCog(commands.Cog, name="Power"):
         await message.edit(embed=embed)
 
         # Phase 1: Stop VMs (in reverse node order - services on node02 first)
+        await ctx.step(0, "Stopping VMs", total=3)
         await self._shutdown_vms(message, embed, report, exclude_node_ips=[])
 
         # Phase 2: Stop LXCs
+        await ctx.step(1, "Stopping LXC containers")
         await self._shutdown_lxcs(message, embed, report, exclude_ctids=[])
 
         # Phase 3: Shutdown nodes
+        await ctx.step(2, "Shutting down nodes")
         await self._shutdown_nodes(message, embed, report, exclude_node_ips=[])
 
         # Final report
         await message.edit(embed=report.to_embed())
+        return report.to_embed().title
 
-    async def _perform_shutdown_nodns(self, message: discord.Message, channel):
-        """Execute partial shutdown keeping Pi-hole and node01."""
+    async def _perform_shutdown_nodns(self, ctx: JobContext) -> str:
+        """Job: execute partial shutdown keeping Pi-hole and node01."""
+        message = await self._job_message(ctx)
         report = PowerOperationReport(operation='shutdown')
 
         # Get Pi-hole info
@@ -451,18 +483,22 @@ class PowerCog(commands.Cog, name="Power"):
 
         # Phase 1: Stop VMs on all nodes except Pi-hole's node
         # Actually, we stop VMs on ALL nodes since Pi-hole is an LXC, not a VM
+        await ctx.step(0, "Stopping VMs", total=3)
         await self._shutdown_vms(message, embed, report, exclude_node_ips=[])
 
         # Phase 2: Stop LXCs except Pi-hole
+        await ctx.step(1, "Stopping LXC containers (keeping Pi-hole)")
         await self._shutdown_lxcs(message, embed, report, exclude_ctids=[pihole_ctid])
         report.lxcs_skipped.append(f"pi-hole (CT{pihole_ctid})")
 
         # Phase 3: Shutdown nodes except Pi-hole's host
+        await ctx.step(2, f"Shutting down nodes (keeping {kept_node})")
         await self._shutdown_nodes(message, embed, report, exclude_node_ips=[pihole_node_ip])
         report.nodes_skipped.append(f"{kept_node} (Pi-hole host)")
 
         # Final report
         await message.edit(embed=report.to_embed())
+        return report.to_embed().title
 
     async def _shutdown_vms(
         self,
@@ -602,8 +638,9 @@ class PowerCog(commands.Cog, name="Power"):
 
     # ==================== Startup Implementation ====================
 
-    async def _perform_startup_all(self, message: discord.Message, channel):
-        """Execute full cluster startup."""
+    async def _perform_startup_all(self, ctx: JobContext) -> str:
+        """Job: execute full cluster startup."""
+        message = await self._job_message(ctx)
         report = PowerOperationReport(operation='startup')
 
         embed = discord.Embed(
@@ -615,19 +652,24 @@ class PowerCog(commands.Cog, name="Power"):
         await message.edit(embed=embed)
 
         # Phase 1: Wake nodes via WoL
+        await ctx.step(0, "Sending Wake-on-LAN", total=4)
         await self._wake_nodes(message, embed, report)
 
         # Phase 2: Wait for nodes to come online
+        await ctx.step(1, "Waiting for nodes")
         await self._wait_for_nodes(message, embed, report)
 
         # Phase 3: Start LXCs (Pi-hole first for DNS)
+        await ctx.step(2, "Starting LXC containers")
         await self._start_lxcs(message, embed, report)
 
         # Phase 4: Start VMs
+        await ctx.step(3, "Starting VMs")
         await self._start_vms(message, embed, report)
 
         # Final report
         await message.edit(embed=report.to_embed())
+        return report.to_embed().title
 
     async def _wake_nodes(
         self,
@@ -11,12 +11,16 @@ from discord.ext import commands, tasks
 from typing import TYPE_CHECKING, List, Dict
 
 from config import CONTAINER_HOSTS
+from core.reactions import PendingStore
 
 if TYPE_CHECKING:
     from core import SentinelBot
 
 logger = logging.getLogger('sentinel.cogs.scheduler')
 
+# Failed downloads are re-announced if still failing after this long
+FAILURE_NOTIFY_TTL = 7 * 86400
+
 
 class SchedulerCog(commands.Cog, name="Scheduler"):
     """Scheduled tasks and background jobs."""
@@ -24,16 +28,18 @@ class SchedulerCog(commands.Cog, name="Scheduler"):
     def __init__(self, bot: 'SentinelBot'):
         self.bot = bot
         self._download_cache: Dict[str, Dict] = {}
-        self._notified_failures: set = set()  # Track notified failed downloads
-        self._failed_download_messages: Dict[int, Dict] = {}  # msg_id -> {queue_id, service}
+        self._notified_failures = PendingStore(max_size=1000, default_ttl=FAILURE_NOTIFY_TTL)
 
     async def cog_load(self):
-        """Called when cog is loaded. Start scheduled tasks."""
+        """Called when cog is loaded. Register reaction handlers and start scheduled tasks."""
+        self.bot.reactions.add_handler('scheduler.failed_download', self._on_failed_download_reaction)
         self.daily_update_report.start()
         self.download_progress_check.start()
         self.failed_download_check.start()
         self.stale_task_cleanup.start()
         self.daily_onboarding_report.start()
+        self.apt_inventory_refresh.change_interval(hours=self.bot.config.apt.refresh_hours)
+        self.apt_inventory_refresh.start()
         logger.info("Scheduler tasks started")
 
     async def cog_unload(self):
@@ -43,6 +49,7 @@ class SchedulerCog(commands.Cog, name="Scheduler"):
         self.failed_download_check.cancel()
         self.stale_task_cleanup.cancel()
         self.daily_onboarding_report.cancel()
+        self.apt_inventory_refresh.cancel()
         logger.info("Scheduler tasks stopped")
 
     # ==================== Daily Update Report (7 PM) ====================
@@ -92,6 +99,12 @@ class SchedulerCog(commands.Cog, name="Scheduler"):
                     for i, _ in enumerate(updates_available[:10]):
                         await msg.add_reaction(f"{i+1}\ufe0f\u20e3")
 
+                    # Approvals are handled by the Updates cog
+                    await self.bot.reactions.track(msg.id, 'updates.approval', {
+                        'containers': [[u['container'], u['host']] for u in updates_available],
+                        'channel_id': msg.channel.id
+                    })
+
         except Exception as e:
             logger.error(f"Daily update report failed: {e}")
 
@@ -255,7 +268,7 @@ class SchedulerCog(commands.Cog, name="Scheduler"):
 
                 if failure_key not in self._notified_failures:
                     await self._notify_failed_download(item, 'radarr')
-                    self._notified_failures.add(failure_key)
+                    self._notified_failures.set(failure_key, True)
 
     async def _check_sonarr_failures(self):
         """Check Sonarr queue for failed downloads."""
@@ -273,7 +286,7 @@ class SchedulerCog(commands.Cog, name="Scheduler"):
 
                 if failure_key not in self._notified_failures:
                     await self._notify_failed_download(item, 'sonarr')
-                    self._notified_failures.add(failure_key)
+                    self._notified_failures.set(failure_key, True)
 
     async def _notify_failed_download(self, item: Dict, service: str):
         """Send notification for failed download with removal option."""
@@ -312,30 +325,20 @@ class SchedulerCog(commands.Cog, name="Scheduler"):
             msg = await self.bot.channel_router.send('media', embed=embed)
             if msg:
                 await msg.add_reaction("\U0001F5D1")  # wastebasket emoji
-                # Store message mapping for reaction handler
-                self._failed_download_messages[msg.id] = {
+                # Track message for the reaction handler
+                await self.bot.reactions.track(msg.id, 'scheduler.failed_download', {
                     'queue_id': queue_id,
                     'service': service,
                     'title': title
-                }
+                })
                 logger.info(f"Notified failed download: {title} ({service})")
 
-    @commands.Cog.listener()
-    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+    async def _on_failed_download_reaction(self, payload: discord.RawReactionActionEvent, info: Dict):
         """Handle reactions on failed download notifications."""
-        # Ignore bot's own reactions
-        if payload.user_id == self.bot.user.id:
-            return
-
-        # Check if this is a failed download message
-        if payload.message_id not in self._failed_download_messages:
-            return
-
         # Check for wastebasket emoji
         if str(payload.emoji) != "\U0001F5D1":
             return
 
-        info = self._failed_download_messages[payload.message_id]
         queue_id = info['queue_id']
         service = info['service']
         title = info['title']
@@ -357,8 +360,8 @@ class SchedulerCog(commands.Cog, name="Scheduler"):
                     )
                     # Clean up tracking
                     failure_key = f"{service}_{queue_id}"
-                    self._notified_failures.discard(failure_key)
-                    del self._failed_download_messages[payload.message_id]
+                    self._notified_failures.pop(failure_key)
+                    await self.bot.reactions.untrack(payload.message_id)
                 else:
                     embed = discord.Embed(
                         title=":warning: Removal Failed",
@@ -398,6 +401,23 @@ class SchedulerCog(commands.Cog, name="Scheduler"):
             logger.error(f"Error removing queue item: {e}")
             return False
 
+    # ==================== Apt Inventory Refresh (APT_REFRESH_HOURS) ====================
+
+    @tasks.loop(hours=6)
+    async def apt_inventory_refresh(self):
+        """Refresh the stored apt upgradable-package inventory on all VMs."""
+        try:
+            if not self.bot.apt_inventory:
+                return
+            await self.bot.apt_inventory.refresh()
+        except Exception as e:
+            logger.error(f"Apt inventory refresh failed: {e}")
+
+    @apt_inventory_refresh.before_loop
+    async def before_apt_inventory_refresh(self):
+        """Wait for bot to be ready before refreshing."""
+        await self.bot.wait_until_ready()
+
     # ==================== Stale Task Cleanup (Every 30 min) ====================
 
     @tasks.loop(minutes=30)
@@ -416,6 +436,18 @@ class SchedulerCog(commands.Cog, name="Scheduler"):
             if removed > 0:
                 logger.debug(f"Cleaned up {removed} old download records")
 
+            # And finished background jobs
+            removed = await self.bot.db.cleanup_old_jobs(days=7)
+            if removed > 0:
+                logger.debug(f"Cleaned up {removed} old job records")
+
+            # And expired reaction prompts
+            if self.bot.reactions:
+                removed = await self.bot.reactions.purge()
+                if removed > 0:
+                    logger.debug(f"Dropped {removed} expired reaction prompts")
+            self._notified_failures.purge_expired()
+
         except Exception as e:
             logger.error(f"Stale task cleanup failed: {e}")
 
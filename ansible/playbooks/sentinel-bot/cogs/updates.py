@@ -11,6 +11,8 @@ from discord.ext import commands
 from typing import TYPE_CHECKING, Dict, List
 
 from config import CONTAINER_HOSTS, VM_HOSTS, COMPOSE_DIRS
+from core.apt_inventory import format_age
+from core.jobs import JobContext, JobError
 from core.progress import make_progress_bar, ProgressEmbed
 
 if TYPE_CHECKING:
@@ -30,7 +32,12 @@ class UpdatesCog(commands.Cog, name="Updates"):
 
     def __init__(self, bot: 'SentinelBot'):
         self.bot = bot
-        self._pending_updates: Dict[int, Dict] = {}  # message_id -> update info
+
+    async def cog_load(self):
+        """Register background job and reaction handlers."""
+        self.bot.jobs.register('updates.update', self._run_update_job, resumable=True)
+        self.bot.jobs.register('updates.updateall', self._run_update_all_job)
+        self.bot.reactions.add_handler('updates.approval', self._on_approval_reaction)
 
     @property
     def ssh(self):
@@ -86,11 +93,11 @@ class UpdatesCog(commands.Cog, name="Updates"):
             )
             embed.set_footer(text=f"Use /update <container> to update")
 
-            # Store for reaction handling
-            self._pending_updates[status_msg.id] = {
-                'containers': [(u['container'], u['host']) for u in updates_available],
+            # Track for reaction handling
+            await self.bot.reactions.track(status_msg.id, 'updates.approval', {
+                'containers': [[u['container'], u['host']] for u in updates_available],
                 'channel_id': interaction.channel_id
-            }
+            })
         else:
             embed = progress.complete(
                 ":white_check_mark: Update Check Complete",
@@ -219,9 +226,35 @@ class UpdatesCog(commands.Cog, name="Updates"):
 
     @app_commands.command(name="updateall", description="Update all containers with available updates")
     async def update_all_containers(self, interaction: discord.Interaction):
-        """Check and update all containers that have updates available."""
+        """Queue a background job that checks and updates all containers."""
         await interaction.response.defer()
 
+        embed = discord.Embed(
+            title=":inbox_tray: Update All Queued",
+            description=make_progress_bar(0, 1),
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="Status", value="Waiting for a worker...", inline=False)
+        status_msg = await interaction.followup.send(embed=embed, wait=True)
+
+        job_id = await self.bot.jobs.enqueue(
+            'updates.updateall',
+            created_by=str(interaction.user),
+            channel_id=interaction.channel_id,
+            message_id=status_msg.id
+        )
+
+        embed.set_footer(text=f"Job #{job_id} • /jobs {job_id} for live progress")
+        await status_msg.edit(embed=embed)
+
+    async def _run_update_all_job(self, ctx: JobContext) -> str:
+        """Job: check every container and recreate the ones with updates."""
+        status_msg = await ctx.get_message()
+
+        async def show(embed: discord.Embed):
+            if status_msg:
+                await status_msg.edit(embed=embed)
+
         # Group containers by host
         hosts = {}
         for container, host_ip in CONTAINER_HOSTS.items():
@@ -231,7 +264,9 @@ class UpdatesCog(commands.Cog, name="Updates"):
 
         total_containers = len(CONTAINER_HOSTS)
         progress = ProgressEmbed(":mag: Checking for Updates...", total_containers)
-        status_msg = await interaction.followup.send(embed=progress.embed)
+        progress.embed.set_footer(text=f"Job #{ctx.id}")
+        await ctx.step(0, f"Checking {total_containers} containers", total=2)
+        await show(progress.embed)
 
         # First, find all containers with updates
         updates_available = []
@@ -239,18 +274,19 @@ class UpdatesCog(commands.Cog, name="Updates"):
         checked = 0
 
         for host_ip, containers in hosts.items():
-            for container in containers:
-                progress.update(checked, f":hourglass: Checking **{container}**...")
-                await status_msg.edit(embed=progress.embed)
+            async with ctx.resource(f"host:{host_ip}"):
+                for container in containers:
+                    progress.update(checked, f":hourglass: Checking **{container}**...")
+                    await show(progress.embed)
 
-                has_update, error = await self._check_container_update(host_ip, container)
-                if error:
-                    if f"**{host_ip}**" not in str(errors):
-                        errors.append(f"**{host_ip}**: {error}")
-                elif has_update:
-                    updates_available.append({'container': container, 'host': host_ip})
+                    has_update, error = await self._check_container_update(host_ip, container)
+                    if error:
+                        if f"**{host_ip}**" not in str(errors):
+                            errors.append(f"**{host_ip}**: {error}")
+                    elif has_update:
+                        updates_available.append({'container': container, 'host': host_ip})
 
-                checked += 1
+                    checked += 1
 
         if not updates_available:
             embed = progress.complete(
@@ -259,13 +295,15 @@ class UpdatesCog(commands.Cog, name="Updates"):
             )
             if errors:
                 embed.add_field(name=":warning: Errors", value="\n".join(errors[:10]), inline=False)
-            await status_msg.edit(embed=embed)
-            return
+            await show(embed)
+            return "No updates available"
 
         # Now update all containers with available updates
         total_updates = len(updates_available)
         progress = ProgressEmbed(f":arrows_counterclockwise: Updating {total_updates} Containers...", total_updates)
-        await status_msg.edit(embed=progress.embed)
+        progress.embed.set_footer(text=f"Job #{ctx.id}")
+        await ctx.step(1, f"Updating {total_updates} containers")
+        await show(progress.embed)
 
         updated = []
         failed = []
@@ -277,23 +315,26 @@ class UpdatesCog(commands.Cog, name="Updates"):
             compose_dir = COMPOSE_DIRS.get(container)
 
             progress.update(i, f":hourglass: Updating **{container}**...")
-            await status_msg.edit(embed=progress.embed)
+            await show(progress.embed)
 
             if not compose_dir:
                 skipped.append(f"{container}: No compose dir configured")
                 continue
 
             # Recreate container with new image (image already pulled during check)
-            result = await self.ssh.docker_compose_recreate(host_ip, compose_dir, container)
+            async with ctx.resource(f"host:{host_ip}"):
+                result = await self.ssh.docker_compose_recreate(host_ip, compose_dir, container)
 
             if result.success:
                 updated.append(container)
+                await ctx.log(f"Updated {container} on {host_ip}")
                 if self.db:
-                    await self.db.record_update(container, host_ip, 'success', str(interaction.user))
+                    await self.db.record_update(container, host_ip, 'success', ctx.created_by)
             else:
                 failed.append(f"{container}: {result.stderr[:50]}")
+                await ctx.log(f"Failed to update {container} on {host_ip}")
                 if self.db:
-                    await self.db.record_update(container, host_ip, 'failed', str(interaction.user))
+                    await self.db.record_update(container, host_ip, 'failed', ctx.created_by)
 
         # Final result
         if failed or skipped:
@@ -315,7 +356,8 @@ class UpdatesCog(commands.Cog, name="Updates"):
         if errors:
             embed.add_field(name=":warning: Connection Errors", value="\n".join(errors[:5]), inline=False)
 
-        await status_msg.edit(embed=embed)
+        await show(embed)
+        return f"Updated {len(updated)}/{total_updates} containers"
 
     @app_commands.command(name="containers", description="List all monitored containers")
     async def list_containers(self, interaction: discord.Interaction):
@@ -419,79 +461,87 @@ class UpdatesCog(commands.Cog, name="Updates"):
             await status_msg.edit(embed=embed)
 
     @app_commands.command(name="vmcheck", description="Check VMs for apt updates")
-    async def vm_check(self, interaction: discord.Interaction):
-        """Check all VMs for available apt updates."""
+    @app_commands.describe(refresh="Run apt update on every VM now instead of using stored data")
+    async def vm_check(self, interaction: discord.Interaction, refresh: bool = False):
+        """Show available apt updates from the background inventory."""
         await interaction.response.defer()
 
-        total_vms = len(VM_HOSTS)
-        progress = ProgressEmbed(":mag: Checking VMs for Updates...", total_vms)
-        status_msg = await interaction.followup.send(embed=progress.embed)
+        inventory = self.bot.apt_inventory
+        rows = await inventory.get_inventory()
+
+        # Refresh on request, or when nothing has been collected yet
+        if refresh or not rows:
+            embed = discord.Embed(
+                title=":arrows_counterclockwise: Refreshing Apt Inventory...",
+                description=f"Running `apt update` on {len(VM_HOSTS)} VMs in parallel...",
+                color=discord.Color.blue()
+            )
+            status_msg = await interaction.followup.send(embed=embed)
+            await inventory.refresh()
+            rows = await inventory.get_inventory()
+        else:
+            status_msg = None
 
         updates_found = []
         errors = []
-        checked = 0
+        for row in rows:
+            if row['upgradable']:
+                line = f"**{row['host']}** ({row['host_ip']}): {row['upgradable']} packages"
+                if row['security']:
+                    line += f" - :lock: {row['security']} security"
+                updates_found.append(line)
+            if row['error']:
+                errors.append(f"**{row['host']}**: {row['error'][:80]} (last good: {format_age(row['checked_at'])})")
 
-        for name, host_ip in VM_HOSTS.items():
-            progress.update(checked, f":hourglass: Checking **{name}** ({host_ip})...")
-            await status_msg.edit(embed=progress.embed)
-
-            # Run apt update
-            update_result = await self.ssh.apt_update(host_ip)
-            if not update_result.success:
-                errors.append(f"**{name}**: Connection failed")
-                checked += 1
-                continue
-
-            # Check for upgradable packages
-            result = await self.ssh.apt_upgradable(host_ip)
-            if result.success and result.output.strip():
-                count = len(result.output.strip().split('\n'))
-                updates_found.append(f"**{name}** ({host_ip}): {count} packages")
-
-            checked += 1
-
-        # Final result
         if updates_found:
-            embed = progress.complete(
-                ":arrow_up: Updates Available",
-                "\n".join(updates_found),
-                discord.Color.yellow()
+            embed = discord.Embed(
+                title=":arrow_up: Updates Available",
+                description="\n".join(updates_found),
+                color=discord.Color.yellow()
             )
+            security_packages = sorted({
+                pkg['name'] for row in rows for pkg in row['packages'] if pkg.get('security')
+            })
+            if security_packages:
+                embed.add_field(
+                    name=":lock: Security Updates",
+                    value=", ".join(f"`{name}`" for name in security_packages[:20])[:1024],
+                    inline=False
+                )
         else:
-            embed = progress.complete(
-                ":white_check_mark: All VMs Up to Date",
-                "All VMs are up to date!"
+            embed = discord.Embed(
+                title=":white_check_mark: All VMs Up to Date",
+                description="All VMs are up to date!",
+                color=discord.Color.green()
             )
 
         if errors:
             embed.add_field(name=":warning: Errors", value="\n".join(errors), inline=False)
 
-        embed.set_footer(text=f"Checked {total_vms} VMs")
-        await status_msg.edit(embed=embed)
+        checked = [row['checked_at'] for row in rows if row['checked_at']]
+        age = format_age(min(checked)) if checked else "never"
+        embed.set_footer(text=f"{len(rows)} VMs • Data from {age} • /vmcheck refresh:True to refresh now")
+
+        if status_msg:
+            await status_msg.edit(embed=embed)
+        else:
+            await interaction.followup.send(embed=embed)
 
     # ==================== Reaction Handler ====================
 
-    @commands.Cog.listener()
-    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+    async def _on_approval_reaction(self, payload: discord.RawReactionActionEvent, update_info: Dict):
         """Handle reactions for update approval."""
-        if payload.user_id == self.bot.user.id:
-            return
-
-        if payload.message_id not in self._pending_updates:
-            return
-
-        update_info = self._pending_updates[payload.message_id]
         emoji = str(payload.emoji)
 
         if emoji == APPROVE_ALL_EMOJI:
             # Approve all updates
             logger.info(f"User {payload.user_id} approved all updates")
+            await self.bot.reactions.untrack(payload.message_id)
+
             # Process all pending updates
             for container, host_ip in update_info.get('containers', []):
                 await self._perform_update(container, host_ip, update_info.get('channel_id'))
 
-            del self._pending_updates[payload.message_id]
-
         elif emoji in NUMBER_EMOJIS:
             # Approve single update
             index = NUMBER_EMOJIS.index(emoji)
@@ -501,33 +551,59 @@ class UpdatesCog(commands.Cog, name="Updates"):
                 await self._perform_update(container, host_ip, update_info.get('channel_id'))
 
     async def _perform_update(self, container: str, host_ip: str, channel_id: int):
-        """Perform a container update using docker-compose."""
-        logger.info(f"Updating {container} on {host_ip}")
+        """Queue a reaction-approved container update as a background job."""
+        job_id = await self.bot.jobs.enqueue(
+            'updates.update',
+            params={'container': container, 'host_ip': host_ip},
+            resources=[f"host:{host_ip}"],
+            created_by='reaction',
+            max_attempts=2
+        )
+        logger.info(f"Queued update of {container} on {host_ip} as job #{job_id}")
+
+    async def _run_update_job(self, ctx: JobContext) -> str:
+        """Job: pull and recreate a single container using docker-compose."""
+        container = ctx.params['container']
+        host_ip = ctx.params['host_ip']
 
         compose_dir = COMPOSE_DIRS.get(container)
         if not compose_dir:
-            logger.error(f"No compose directory configured for {container}")
             if self.db:
-                await self.db.record_update(container, host_ip, 'failed', 'reaction')
-            return
+                await self.db.record_update(container, host_ip, 'failed', ctx.created_by)
+            raise JobError(f"No compose directory configured for {container}")
+
+        if ctx.resume_step >= 1:
+            # The previous attempt died while recreating - most likely because the
+            # container was Sentinel itself. Don't recreate again, just check it.
+            await ctx.step(2, f"Verifying {container} after restart", total=3)
+            result = await self.ssh.run(host_ip, f'docker inspect {container} --format "{{{{.State.Running}}}}"')
+            success = result.success and result.output == 'true'
+        else:
+            await ctx.step(0, f"Pulling image for {container} on {host_ip}", total=3)
+            await self.ssh.docker_compose_pull_service(host_ip, compose_dir, container)
 
-        # Pull and recreate using docker-compose
-        await self.ssh.docker_compose_pull_service(host_ip, compose_dir, container)
-        result = await self.ssh.docker_compose_recreate(host_ip, compose_dir, container)
+            await ctx.step(1, f"Recreating {container}")
+            result = await self.ssh.docker_compose_recreate(host_ip, compose_dir, container)
+            success = result.success
+
+        status = 'success' if success else 'failed'
 
         # Record result
         if self.db:
-            status = 'success' if result.success else 'failed'
-            await self.db.record_update(container, host_ip, status, 'reaction')
+            await self.db.record_update(container, host_ip, status, ctx.created_by)
 
         # Send notification
         if self.bot.channel_router:
             await self.bot.channel_router.send_update_notification(
                 container_name=container,
                 host_ip=host_ip,
-                status='success' if result.success else 'failed'
+                status=status
             )
 
+        if not success:
+            raise JobError(f"Update of {container} failed: {result.stderr[:200]}")
+        return f"Updated {container} on {host_ip}"
+
 
 async def setup(bot: 'SentinelBot'):
     """Load the Updates cog."""
@@ -83,12 +83,36 @@ class WebhookConfig:
     port: int
     api_key: str
 
+    # 'inline' (bot event loop), 'thread' (own event loop) or 'process' (IPC)
+    mode: str
+    ipc_socket: str
+    access_log: bool
+
 
 @dataclass
 class DatabaseConfig:
     path: str
 
 
+@dataclass
+class JobsConfig:
+    workers: int
+
+
+@dataclass
+class ReactionsConfig:
+    # Messages tracked for reaction approval (oldest evicted first)
+    max_pending: int
+    ttl_hours: int
+    persist: bool
+
+
+@dataclass
+class AptConfig:
+    # How often the background collector runs `apt update` on every VM
+    refresh_hours: int
+
+
 @dataclass
 class Config:
     discord: DiscordConfig
@@ -96,6 +120,9 @@ class Config:
     ssh: SSHConfig
     webhook: WebhookConfig
     database: DatabaseConfig
+    jobs: JobsConfig
+    reactions: ReactionsConfig
+    apt: AptConfig
     domain: str
 
 
@@ -153,18 +180,38 @@ def load_config() -> Config:
     webhook = WebhookConfig(
         port=int(os.environ.get('WEBHOOK_PORT', 5050)),
         api_key=os.environ.get('API_KEY', 'sentinel-secret-key'),
+        mode=os.environ.get('WEBHOOK_MODE', 'inline').lower(),
+        ipc_socket=os.environ.get('WEBHOOK_IPC_SOCKET', '/tmp/sentinel-webhooks.sock'),
+        access_log=os.environ.get('WEBHOOK_ACCESS_LOG', 'true').lower() == 'true',
     )
 
     database = DatabaseConfig(
         path=os.environ.get('DB_PATH', '/app/data/sentinel.db'),
     )
 
+    jobs = JobsConfig(
+        workers=int(os.environ.get('JOB_WORKERS', 3)),
+    )
+
+    reactions = ReactionsConfig(
+        max_pending=int(os.environ.get('REACTION_MAX_PENDING', 500)),
+        ttl_hours=int(os.environ.get('REACTION_TTL_HOURS', 72)),
+        persist=os.environ.get('REACTION_PERSIST', 'true').lower() == 'true',
+    )
+
+    apt = AptConfig(
+        refresh_hours=int(os.environ.get('APT_REFRESH_HOURS', 6)),
+    )
+
     return Config(
         discord=discord,
         api=api,
         ssh=ssh,
         webhook=webhook,
         database=database,
+        jobs=jobs,
+        reactions=reactions,
+        apt=apt,
         domain=os.environ.get('DOMAIN', 'hrmsmrflrii.xyz'),
     )
 
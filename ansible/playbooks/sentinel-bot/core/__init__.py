@@ -6,5 +6,8 @@ from .bot import SentinelBot
 from .database import Database
 from .channel_router import ChannelRouter
 from .ssh_manager import SSHManager
+from .jobs import JobManager, JobContext, JobError
+from .reactions import ReactionDispatcher, PendingStore
 
-__all__ = ['SentinelBot', 'Database', 'ChannelRouter', 'SSHManager']
+__all__ = ['SentinelBot', 'Database', 'ChannelRouter', 'SSHManager', 'JobManager', 'JobContext', 'JobError',
+           'ReactionDispatcher', 'PendingStore']
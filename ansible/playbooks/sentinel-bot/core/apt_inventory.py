@@ -0,0 +1,116 @@
+"""
+Sentinel Bot Apt Inventory
+Background collector for upgradable apt packages on every VM.
+"""
+
+import asyncio
+import logging
+import re
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from .bot import SentinelBot
+
+logger = logging.getLogger('sentinel.apt')
+
+# e.g. "openssl/jammy-updates,jammy-security 3.0.2-0ubuntu1.15 amd64 [upgradable from: 3.0.2-0ubuntu1.14]"
+UPGRADABLE_RE = re.compile(
+    r'^(?P<name>[^/\s]+)/(?P<sources>\S+)\s+(?P<candidate>\S+)\s+\S+'
+    r'(?:\s+\[upgradable from:\s*(?P<current>[^\]]+)\])?'
+)
+
+
+def parse_upgradable(output: str) -> List[Dict[str, Any]]:
+    """
+    Parse `apt list --upgradable` output.
+
+    Returns:
+        List of {'name', 'current', 'candidate', 'security'} dicts
+    """
+    packages = []
+    for line in output.splitlines():
+        match = UPGRADABLE_RE.match(line.strip())
+        if not match:
+            continue
+        packages.append({
+            'name': match.group('name'),
+            'current': (match.group('current') or '').strip(),
+            'candidate': match.group('candidate'),
+            'security': '-security' in match.group('sources'),
+        })
+    return packages
+
+
+def format_age(timestamp: Optional[str]) -> str:
+    """Format a SQLite UTC timestamp as a short age like '3h ago'."""
+    if not timestamp:
+        return "never"
+
+    checked = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+    seconds = int((datetime.now(timezone.utc) - checked).total_seconds())
+    if seconds < 60:
+        return "just now"
+    if seconds < 3600:
+        return f"{seconds // 60}m ago"
+    if seconds < 86400:
+        return f"{seconds // 3600}h ago"
+    return f"{seconds // 86400}d ago"
+
+
+class AptInventory:
+    """
+    Keeps a per-host snapshot of upgradable packages in SQLite.
+
+    Hosts are refreshed concurrently. Overlapping refresh requests share the
+    run already in progress instead of starting another `apt update`.
+    """
+
+    def __init__(self, bot: 'SentinelBot', hosts: Dict[str, str]):
+        self.bot = bot
+        self.hosts = hosts
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def refreshing(self) -> bool:
+        return self._refresh_task is not None and not self._refresh_task.done()
+
+    async def refresh(self) -> Dict[str, Optional[str]]:
+        """
+        Refresh every host, joining a refresh that is already running.
+
+        Returns:
+            Host name -> error message (None on success)
+        """
+        if not self.refreshing:
+            self._refresh_task = asyncio.create_task(self._refresh_all())
+        return await asyncio.shield(self._refresh_task)
+
+    async def get_inventory(self) -> List[Dict[str, Any]]:
+        """Get the stored snapshot for all configured hosts."""
+        rows = {row['host']: row for row in await self.bot.db.get_apt_inventory()}
+        return [rows[name] for name in self.hosts if name in rows]
+
+    async def _refresh_all(self) -> Dict[str, Optional[str]]:
+        """Refresh all hosts concurrently."""
+        names = list(self.hosts)
+        errors = await asyncio.gather(*(self._refresh_host(name, self.hosts[name]) for name in names))
+        failed = sum(1 for error in errors if error)
+        logger.info(f"Apt inventory refreshed: {len(names) - failed}/{len(names)} hosts")
+        return dict(zip(names, errors))
+
+    async def _refresh_host(self, name: str, host_ip: str) -> Optional[str]:
+        """Refresh package lists on one host and store its upgradable packages."""
+        update_result = await self.bot.ssh.apt_update(host_ip)
+        if not update_result.success:
+            error = update_result.stderr.strip().splitlines()[-1] if update_result.stderr.strip() else "apt update failed"
+            await self.bot.db.set_apt_inventory_error(name, host_ip, error[:200])
+            return error
+
+        result = await self.bot.ssh.apt_upgradable(host_ip)
+        if not result.success:
+            await self.bot.db.set_apt_inventory_error(name, host_ip, "apt list failed")
+            return "apt list failed"
+
+        await self.bot.db.save_apt_inventory(name, host_ip, parse_upgradable(result.stdout))
+        return None
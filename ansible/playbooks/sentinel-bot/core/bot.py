@@ -50,6 +50,9 @@ class SentinelBot(commands.Bot):
         self.db = None
         self.ssh = None
         self.channel_router = None
+        self.jobs = None
+        self.reactions = None
+        self.apt_inventory = None
 
     async def setup_hook(self) -> None:
         """Called when the bot is starting up."""
@@ -71,9 +74,31 @@ class SentinelBot(commands.Bot):
         from .channel_router import ChannelRouter
         self.channel_router = ChannelRouter(self, self.config.discord)
 
+        # Initialize job runner (cogs register their job handlers on load)
+        from .jobs import JobManager
+        self.jobs = JobManager(self, workers=self.config.jobs.workers)
+
+        # Initialize reaction dispatcher (cogs register their handlers on load)
+        from .reactions import ReactionDispatcher
+        self.reactions = ReactionDispatcher(
+            self,
+            max_size=self.config.reactions.max_pending,
+            default_ttl=self.config.reactions.ttl_hours * 3600,
+            persist=self.config.reactions.persist
+        )
+        await self.reactions.load()
+
+        # Initialize apt inventory (refreshed by the scheduler)
+        from config import VM_HOSTS
+        from .apt_inventory import AptInventory
+        self.apt_inventory = AptInventory(self, VM_HOSTS)
+
         # Load cogs
         await self._load_cogs()
 
+        # Resume unfinished jobs and start workers
+        await self.jobs.start()
+
         # Skip command sync on normal restarts - commands are already registered
         # Only sync if SYNC_COMMANDS env var is set to "true"
         import os
@@ -106,6 +131,7 @@ class SentinelBot(commands.Bot):
             'cogs.onboarding',
             'cogs.scheduler',
             'cogs.power',
+            'cogs.jobs',
         ]
 
         for cog in cogs:
@@ -134,6 +160,12 @@ class SentinelBot(commands.Bot):
             embed.add_field(name="Modules", value="Homelab | Updates | Media | GitLab | Tasks | Onboarding", inline=False)
             await channel.send(embed=embed)
 
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent) -> None:
+        """Route reactions to the handler tracking the message."""
+        if payload.user_id == self.user.id or not self.reactions:
+            return
+        await self.reactions.dispatch(payload)
+
     async def on_command_error(self, ctx: commands.Context, error: Exception) -> None:
         """Global error handler for prefix commands."""
         logger.error(f"Command error: {error}")
@@ -142,6 +174,9 @@ class SentinelBot(commands.Bot):
         """Clean up resources when shutting down."""
         logger.info("Sentinel Bot shutting down...")
 
+        if self.jobs:
+            await self.jobs.stop()
+
         if self.http_session:
             await self.http_session.close()
 
@@ -106,6 +106,63 @@ class Database:
                 docs_ok INTEGER DEFAULT 0,
                 last_checked TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             );
+
+            -- Background Jobs
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                status TEXT DEFAULT 'queued',
+                params TEXT DEFAULT '{}',
+                resources TEXT DEFAULT '[]',
+                step_current INTEGER DEFAULT 0,
+                step_total INTEGER DEFAULT 0,
+                step_status TEXT,
+                attempts INTEGER DEFAULT 0,
+                max_attempts INTEGER DEFAULT 1,
+                result TEXT,
+                error TEXT,
+                created_by TEXT,
+                channel_id INTEGER,
+                message_id INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_at TIMESTAMP,
+                completed_at TIMESTAMP
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+
+            -- Job Progress Log
+            CREATE TABLE IF NOT EXISTS job_logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id INTEGER REFERENCES jobs(id),
+                message TEXT NOT NULL,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_job_logs_job ON job_logs(job_id);
+
+            -- Messages Awaiting Reactions
+            CREATE TABLE IF NOT EXISTS pending_reactions (
+                message_id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                data TEXT DEFAULT '{}',
+                expires_at REAL NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_pending_reactions_expires ON pending_reactions(expires_at);
+
+            -- Apt Inventory (upgradable packages per VM)
+            CREATE TABLE IF NOT EXISTS apt_inventory (
+                host TEXT PRIMARY KEY,
+                host_ip TEXT NOT NULL,
+                packages TEXT DEFAULT '[]',
+                upgradable INTEGER DEFAULT 0,
+                security INTEGER DEFAULT 0,
+                error TEXT,
+                checked_at TIMESTAMP,
+                attempted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
         ''')
         await self._connection.commit()
 
@@ -382,3 +439,240 @@ class Database:
         )
         await self._connection.commit()
         return cursor.rowcount
+
+    # ==================== Job Methods ====================
+
+    async def create_job(
+        self,
+        kind: str,
+        params: Dict[str, Any] = None,
+        resources: List[str] = None,
+        created_by: str = None,
+        channel_id: int = None,
+        message_id: int = None,
+        max_attempts: int = 1
+    ) -> int:
+        """Create a queued job and return its ID."""
+        cursor = await self._connection.execute(
+            '''INSERT INTO jobs (kind, params, resources, created_by, channel_id, message_id, max_attempts)
+               VALUES (?, ?, ?, ?, ?, ?, ?)''',
+            (kind, json.dumps(params or {}), json.dumps(resources or []),
+             created_by, channel_id, message_id, max_attempts)
+        )
+        await self._connection.commit()
+        return cursor.lastrowid
+
+    async def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Get a single job by ID."""
+        cursor = await self._connection.execute(
+            '''SELECT * FROM jobs WHERE id = ?''',
+            (job_id,)
+        )
+        row = await cursor.fetchone()
+        return dict(row) if row else None
+
+    async def get_recent_jobs(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get the most recently created jobs."""
+        cursor = await self._connection.execute(
+            '''SELECT * FROM jobs ORDER BY id DESC LIMIT ?''',
+            (limit,)
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    async def get_unfinished_jobs(self) -> List[Dict[str, Any]]:
+        """Get queued and running jobs, oldest first."""
+        cursor = await self._connection.execute(
+            '''SELECT * FROM jobs WHERE status IN ('queued', 'running') ORDER BY id ASC'''
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    async def start_job(self, job_id: int) -> None:
+        """Mark a job as running and count the attempt."""
+        await self._connection.execute(
+            '''UPDATE jobs SET status = 'running', attempts = attempts + 1,
+               started_at = CURRENT_TIMESTAMP WHERE id = ?''',
+            (job_id,)
+        )
+        await self._connection.commit()
+
+    async def requeue_job(self, job_id: int) -> None:
+        """Put an interrupted job back in the queue (progress is kept for resuming)."""
+        await self._connection.execute(
+            '''UPDATE jobs SET status = 'queued' WHERE id = ?''',
+            (job_id,)
+        )
+        await self._connection.commit()
+
+    async def update_job_progress(
+        self,
+        job_id: int,
+        step_current: int,
+        step_total: int,
+        step_status: str
+    ) -> None:
+        """Record the current step of a running job."""
+        await self._connection.execute(
+            '''UPDATE jobs SET step_current = ?, step_total = ?, step_status = ?
+               WHERE id = ?''',
+            (step_current, step_total, step_status, job_id)
+        )
+        await self._connection.commit()
+
+    async def set_job_message(self, job_id: int, channel_id: int, message_id: int) -> None:
+        """Attach the Discord progress message to a job."""
+        await self._connection.execute(
+            '''UPDATE jobs SET channel_id = ?, message_id = ? WHERE id = ?''',
+            (channel_id, message_id, job_id)
+        )
+        await self._connection.commit()
+
+    async def finish_job(
+        self,
+        job_id: int,
+        status: str,
+        result: str = None,
+        error: str = None
+    ) -> None:
+        """Mark a job as completed or failed."""
+        await self._connection.execute(
+            '''UPDATE jobs SET status = ?, result = ?, error = ?,
+               completed_at = CURRENT_TIMESTAMP WHERE id = ?''',
+            (status, result, error, job_id)
+        )
+        await self._connection.commit()
+
+    async def add_job_log(self, job_id: int, message: str) -> None:
+        """Append a line to a job's progress log."""
+        await self._connection.execute(
+            '''INSERT INTO job_logs (job_id, message) VALUES (?, ?)''',
+            (job_id, message)
+        )
+        await self._connection.commit()
+
+    async def get_job_logs(self, job_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get the latest progress log lines for a job, oldest first."""
+        cursor = await self._connection.execute(
+            '''SELECT * FROM (SELECT * FROM job_logs WHERE job_id = ? ORDER BY id DESC LIMIT ?)
+               ORDER BY id ASC''',
+            (job_id, limit)
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    async def cleanup_old_jobs(self, days: int = 7) -> int:
+        """Remove finished jobs (and their logs) older than X days."""
+        await self._connection.execute(
+            '''DELETE FROM job_logs WHERE job_id IN
+               (SELECT id FROM jobs WHERE completed_at IS NOT NULL
+                AND completed_at < datetime('now', ? || ' days'))''',
+            (f'-{days}',)
+        )
+        cursor = await self._connection.execute(
+            '''DELETE FROM jobs WHERE completed_at IS NOT NULL
+               AND completed_at < datetime('now', ? || ' days')''',
+            (f'-{days}',)
+        )
+        await self._connection.commit()
+        return cursor.rowcount
+
+    # ==================== Pending Reaction Methods ====================
+
+    async def save_pending_reaction(
+        self,
+        message_id: int,
+        kind: str,
+        data: Dict[str, Any],
+        expires_at: float
+    ) -> None:
+        """Insert or replace a message awaiting reactions."""
+        await self._connection.execute(
+            '''INSERT OR REPLACE INTO pending_reactions (message_id, kind, data, expires_at)
+               VALUES (?, ?, ?, ?)''',
+            (message_id, kind, json.dumps(data), expires_at)
+        )
+        await self._connection.commit()
+
+    async def delete_pending_reaction(self, message_id: int) -> None:
+        """Forget a message awaiting reactions."""
+        await self._connection.execute(
+            '''DELETE FROM pending_reactions WHERE message_id = ?''',
+            (message_id,)
+        )
+        await self._connection.commit()
+
+    async def get_pending_reactions(self, limit: int = 500) -> List[Dict[str, Any]]:
+        """Get the newest messages awaiting reactions, oldest first."""
+        cursor = await self._connection.execute(
+            '''SELECT * FROM (SELECT * FROM pending_reactions ORDER BY expires_at DESC LIMIT ?)
+               ORDER BY expires_at ASC''',
+            (limit,)
+        )
+        rows = await cursor.fetchall()
+        results = []
+        for row in rows:
+            item = dict(row)
+            item['data'] = json.loads(item['data'] or '{}')
+            results.append(item)
+        return results
+
+    async def purge_expired_reactions(self, now: float) -> int:
+        """Remove messages whose reaction window has passed."""
+        cursor = await self._connection.execute(
+            '''DELETE FROM pending_reactions WHERE expires_at <= ?''',
+            (now,)
+        )
+        await self._connection.commit()
+        return cursor.rowcount
+
+    # ==================== Apt Inventory Methods ====================
+
+    async def save_apt_inventory(
+        self,
+        host: str,
+        host_ip: str,
+        packages: List[Dict[str, Any]]
+    ) -> None:
+        """Store a successful upgradable-package snapshot for a host."""
+        security = sum(1 for pkg in packages if pkg.get('security'))
+        await self._connection.execute(
+            '''INSERT INTO apt_inventory
+               (host, host_ip, packages, upgradable, security, error, checked_at, attempted_at)
+               VALUES (?, ?, ?, ?, ?, NULL, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+               ON CONFLICT(host) DO UPDATE SET
+                   host_ip = excluded.host_ip,
+                   packages = excluded.packages,
+                   upgradable = excluded.upgradable,
+                   security = excluded.security,
+                   error = NULL,
+                   checked_at = excluded.checked_at,
+                   attempted_at = excluded.attempted_at''',
+            (host, host_ip, json.dumps(packages), len(packages), security)
+        )
+        await self._connection.commit()
+
+    async def set_apt_inventory_error(self, host: str, host_ip: str, error: str) -> None:
+        """Record a failed refresh, keeping the last good snapshot."""
+        await self._connection.execute(
+            '''INSERT INTO apt_inventory (host, host_ip, error, attempted_at)
+               VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+               ON CONFLICT(host) DO UPDATE SET
+                   error = excluded.error,
+                   attempted_at = excluded.attempted_at''',
+            (host, host_ip, error)
+        )
+        await self._connection.commit()
+
+    async def get_apt_inventory(self) -> List[Dict[str, Any]]:
+        """Get the stored apt snapshot for every host."""
+        cursor = await self._connection.execute(
+            '''SELECT * FROM apt_inventory ORDER BY host'''
+        )
+        rows = await cursor.fetchall()
+        results = []
+        for row in rows:
+            item = dict(row)
+            item['packages'] = json.loads(item['packages'] or '[]')
+            results.append(item)
+        return results
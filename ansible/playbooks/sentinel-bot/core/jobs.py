@@ -0,0 +1,330 @@
+"""
+Sentinel Bot Job Runner
+Persistent background jobs with a worker pool and per-resource locks.
+"""
+
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional
+
+import discord
+
+if TYPE_CHECKING:
+    from .bot import SentinelBot
+
+logger = logging.getLogger('sentinel.jobs')
+
+# Job states
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+
+
+class JobError(Exception):
+    """Raised by a job handler to fail the job with a readable message."""
+
+
+@dataclass
+class JobHandler:
+    """A registered job kind."""
+    func: Callable[['JobContext'], Awaitable[Optional[str]]]
+    resumable: bool = False
+
+
+class JobContext:
+    """Handle given to a running job for reporting steps, logs and progress."""
+
+    def __init__(self, manager: 'JobManager', job: Dict[str, Any]):
+        self.manager = manager
+        self.bot = manager.bot
+        self.id: int = job['id']
+        self.kind: str = job['kind']
+        self.params: Dict[str, Any] = json.loads(job['params'] or '{}')
+        self.created_by: Optional[str] = job['created_by']
+        self.channel_id: Optional[int] = job['channel_id']
+        self.message_id: Optional[int] = job['message_id']
+        self.attempt: int = job['attempts']
+        self.current: int = 0
+        self.total: int = job['step_total'] or 0
+
+        # Step reached by the previous attempt (0 on a fresh run)
+        self.resume_step: int = (job['step_current'] or 0) if self.attempt > 1 else 0
+
+    @property
+    def resumed(self) -> bool:
+        return self.attempt > 1
+
+    async def step(self, index: int, status: str, total: int = None) -> None:
+        """
+        Record that the job reached a step.
+
+        Args:
+            index: Step number (0-based)
+            status: Human readable step description
+            total: Total number of steps (unchanged if omitted)
+        """
+        self.current = index
+        if total is not None:
+            self.total = total
+        await self.bot.db.update_job_progress(self.id, index, self.total, status)
+        await self.log(status)
+
+    async def log(self, message: str) -> None:
+        """Append a line to the job's progress log."""
+        logger.info(f"Job #{self.id} ({self.kind}): {message}")
+        await self.bot.db.add_job_log(self.id, message)
+
+    def resource(self, *keys: str):
+        """Hold one or more resource locks (e.g. 'host:192.168.40.11') for a block."""
+        return self.manager.resource(*keys)
+
+    async def get_message(self) -> Optional[discord.Message]:
+        """
+        Get the Discord message used to report progress.
+
+        If the original message is gone, a new one is posted in the job's
+        channel. Returns None if the job has no channel.
+        """
+        if not self.channel_id:
+            return None
+
+        channel = self.bot.get_channel(self.channel_id)
+        if channel is None:
+            try:
+                channel = await self.bot.fetch_channel(self.channel_id)
+            except discord.HTTPException as e:
+                logger.warning(f"Job #{self.id}: channel {self.channel_id} unavailable: {e}")
+                return None
+
+        if self.message_id:
+            try:
+                return await channel.fetch_message(self.message_id)
+            except discord.HTTPException:
+                logger.warning(f"Job #{self.id}: progress message {self.message_id} not found, posting a new one")
+
+        try:
+            message = await channel.send(embed=discord.Embed(
+                title=f":gear: Job #{self.id}",
+                description=f"Running `{self.kind}`...",
+                color=discord.Color.blue()
+            ))
+        except discord.HTTPException as e:
+            logger.warning(f"Job #{self.id}: cannot post progress message: {e}")
+            return None
+
+        self.message_id = message.id
+        await self.bot.db.set_job_message(self.id, channel.id, message.id)
+        return message
+
+
+class JobManager:
+    """
+    SQLite-backed job queue served by a pool of asyncio workers.
+
+    Jobs declare the resources they touch (per host, per node). A worker
+    holds those locks for the whole run, so jobs on different resources run
+    concurrently while jobs on the same resource are serialized.
+    """
+
+    def __init__(self, bot: 'SentinelBot', workers: int = 3):
+        self.bot = bot
+        self.worker_count = workers
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[int, JobContext] = {}
+
+    def register(
+        self,
+        kind: str,
+        func: Callable[[JobContext], Awaitable[Optional[str]]],
+        resumable: bool = False
+    ) -> None:
+        """
+        Register a handler for a job kind.
+
+        Resumable jobs are re-queued after a restart (up to their
+        max_attempts); all others are marked failed.
+        """
+        self._handlers[kind] = JobHandler(func=func, resumable=resumable)
+
+    def is_running(self, job_id: int) -> bool:
+        """Check if a job is currently executing on a worker."""
+        return job_id in self._running
+
+    async def start(self) -> None:
+        """Recover unfinished jobs from the database and start the workers."""
+        interrupted = await self._recover()
+
+        for n in range(self.worker_count):
+            self._workers.append(asyncio.create_task(self._worker(n)))
+
+        if interrupted:
+            asyncio.create_task(self._announce_interrupted(interrupted))
+
+        logger.info(f"Job runner started with {self.worker_count} workers")
+
+    async def stop(self) -> None:
+        """Stop the workers. Running jobs stay 'running' and are recovered on next start."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        logger.info("Job runner stopped")
+
+    async def enqueue(
+        self,
+        kind: str,
+        params: Dict[str, Any] = None,
+        resources: List[str] = None,
+        created_by: str = None,
+        channel_id: int = None,
+        message_id: int = None,
+        max_attempts: int = 1
+    ) -> int:
+        """
+        Persist a job and hand it to the worker pool.
+
+        Args:
+            kind: Registered job kind
+            params: JSON-serializable handler parameters
+            resources: Resource keys locked for the whole run
+            created_by: User (or source) that requested the job
+            channel_id: Channel of the progress message
+            message_id: Progress message to edit while running
+            max_attempts: Runs allowed across restarts (resumable jobs only)
+
+        Returns:
+            The new job ID
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job_id = await self.bot.db.create_job(
+            kind,
+            params=params,
+            resources=resources,
+            created_by=created_by,
+            channel_id=channel_id,
+            message_id=message_id,
+            max_attempts=max_attempts
+        )
+        await self.bot.db.add_job_log(job_id, f"Queued by {created_by or 'system'}")
+        self._queue.put_nowait(job_id)
+        logger.info(f"Queued job #{job_id} ({kind})")
+        return job_id
+
+    @asynccontextmanager
+    async def resource(self, *keys: str):
+        """Acquire resource locks in a stable order to avoid deadlocks."""
+        locks = [self._locks.setdefault(key, asyncio.Lock()) for key in sorted(set(keys))]
+        acquired = []
+        try:
+            for lock in locks:
+                await lock.acquire()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+
+    # ==================== Internals ====================
+
+    async def _recover(self) -> List[Dict[str, Any]]:
+        """Re-queue unfinished jobs; fail interrupted ones that cannot resume."""
+        interrupted = []
+
+        for job in await self.bot.db.get_unfinished_jobs():
+            job_id = job['id']
+
+            if job['status'] == JOB_RUNNING:
+                handler = self._handlers.get(job['kind'])
+                if handler and handler.resumable and job['attempts'] < job['max_attempts']:
+                    await self.bot.db.requeue_job(job_id)
+                    await self.bot.db.add_job_log(job_id, "Resuming after restart")
+                    logger.info(f"Resuming job #{job_id} ({job['kind']})")
+                else:
+                    await self.bot.db.finish_job(job_id, JOB_FAILED, error="Interrupted by restart")
+                    await self.bot.db.add_job_log(job_id, "Interrupted by restart")
+                    logger.warning(f"Job #{job_id} ({job['kind']}) interrupted by restart")
+                    interrupted.append(job)
+                    continue
+
+            self._queue.put_nowait(job_id)
+
+        return interrupted
+
+    async def _announce_interrupted(self, jobs: List[Dict[str, Any]]) -> None:
+        """Mark the progress messages of interrupted jobs as failed."""
+        await self.bot.wait_until_ready()
+
+        for job in jobs:
+            if not job['message_id']:
+                continue
+            channel = self.bot.get_channel(job['channel_id'])
+            if channel is None:
+                continue
+            try:
+                message = await channel.fetch_message(job['message_id'])
+                await message.edit(embed=discord.Embed(
+                    title=f":x: Job #{job['id']} Interrupted",
+                    description=f"`{job['kind']}` was interrupted by a bot restart.\nUse `/jobs {job['id']}` for details.",
+                    color=discord.Color.red()
+                ))
+            except discord.HTTPException as e:
+                logger.debug(f"Could not update message for job #{job['id']}: {e}")
+
+    async def _worker(self, n: int) -> None:
+        """Take jobs off the queue and run them until cancelled."""
+        await self.bot.wait_until_ready()
+
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._execute(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Worker {n} crashed on job #{job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, job_id: int) -> None:
+        """Run a single job under its resource locks."""
+        db = self.bot.db
+        job = await db.get_job(job_id)
+        if not job or job['status'] != JOB_QUEUED:
+            return
+
+        handler = self._handlers.get(job['kind'])
+        if not handler:
+            await db.finish_job(job_id, JOB_FAILED, error=f"No handler for {job['kind']}")
+            return
+
+        resources = json.loads(job['resources'] or '[]')
+        async with self.resource(*resources):
+            await db.start_job(job_id)
+            ctx = JobContext(self, await db.get_job(job_id))
+            self._running[job_id] = ctx
+
+            try:
+                result = await handler.func(ctx)
+            except JobError as e:
+                await ctx.log(f"Failed: {e}")
+                await db.finish_job(job_id, JOB_FAILED, error=str(e))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Job #{job_id} ({job['kind']}) failed: {e}")
+                await ctx.log(f"Failed: {e}")
+                await db.finish_job(job_id, JOB_FAILED, error=str(e))
+            else:
+                await ctx.log("Completed")
+                await db.finish_job(job_id, JOB_COMPLETED, result=result)
+            finally:
+                self._running.pop(job_id, None)
@@ -0,0 +1,194 @@
+"""
+Sentinel Bot Reaction Dispatcher
+Routes reactions to the single handler registered for their message.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+import discord
+
+if TYPE_CHECKING:
+    from .bot import SentinelBot
+
+logger = logging.getLogger('sentinel.reactions')
+
+ReactionHandler = Callable[[discord.RawReactionActionEvent, Dict[str, Any]], Awaitable[None]]
+
+
+class PendingStore:
+    """
+    In-memory key/value store bounded by size (LRU) and age (TTL).
+
+    Expired entries are dropped lazily on access and by purge_expired().
+    """
+
+    def __init__(self, max_size: int = 500, default_ttl: float = 86400):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self._items: 'OrderedDict[Hashable, tuple]' = OrderedDict()  # key -> (value, expires_at)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    def set(self, key: Hashable, value: Any, ttl: float = None, expires_at: float = None) -> List[Hashable]:
+        """
+        Store a value, refreshing its position and expiry.
+
+        Returns:
+            Keys evicted to stay within max_size
+        """
+        if expires_at is None:
+            expires_at = time.time() + (ttl if ttl is not None else self.default_ttl)
+
+        self._items[key] = (value, expires_at)
+        self._items.move_to_end(key)
+
+        evicted = []
+        while len(self._items) > self.max_size:
+            old_key, _ = self._items.popitem(last=False)
+            evicted.append(old_key)
+        return evicted
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a live value (marking it recently used), or None."""
+        item = self._items.get(key)
+        if item is None:
+            return None
+
+        value, expires_at = item
+        if expires_at <= time.time():
+            del self._items[key]
+            return None
+
+        self._items.move_to_end(key)
+        return value
+
+    def expires_at(self, key: Hashable) -> Optional[float]:
+        """Get the expiry timestamp of a key."""
+        item = self._items.get(key)
+        return item[1] if item else None
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """Remove a key and return its value (even if expired)."""
+        item = self._items.pop(key, None)
+        return item[0] if item else None
+
+    def purge_expired(self) -> List[Hashable]:
+        """Drop all expired entries and return their keys."""
+        now = time.time()
+        expired = [key for key, (_, expires_at) in self._items.items() if expires_at <= now]
+        for key in expired:
+            del self._items[key]
+        return expired
+
+
+@dataclass
+class PendingReaction:
+    """A message awaiting reactions."""
+    kind: str
+    data: Dict[str, Any]
+
+
+class ReactionDispatcher:
+    """
+    Bot-level reaction index keyed by message ID.
+
+    Cogs register a handler per kind once, then track individual messages
+    with JSON-serializable state. Every reaction costs one dict lookup, and
+    tracked messages are persisted so approvals survive restarts.
+    """
+
+    def __init__(
+        self,
+        bot: 'SentinelBot',
+        max_size: int = 500,
+        default_ttl: float = 86400,
+        persist: bool = True
+    ):
+        self.bot = bot
+        self.persist = persist
+        self._handlers: Dict[str, ReactionHandler] = {}
+        self._pending = PendingStore(max_size=max_size, default_ttl=default_ttl)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add_handler(self, kind: str, handler: ReactionHandler) -> None:
+        """Register the handler for a kind of tracked message."""
+        self._handlers[kind] = handler
+
+    async def load(self) -> None:
+        """Restore tracked messages from the database."""
+        if not (self.persist and self.bot.db):
+            return
+
+        await self.bot.db.purge_expired_reactions(time.time())
+        rows = await self.bot.db.get_pending_reactions(limit=self._pending.max_size)
+        for row in rows:
+            self._pending.set(
+                row['message_id'],
+                PendingReaction(kind=row['kind'], data=row['data']),
+                expires_at=row['expires_at']
+            )
+        logger.info(f"Restored {len(rows)} pending reaction messages")
+
+    async def track(
+        self,
+        message_id: int,
+        kind: str,
+        data: Dict[str, Any],
+        ttl: float = None
+    ) -> None:
+        """
+        Route reactions on a message to the handler for `kind`.
+
+        Args:
+            message_id: Discord message ID
+            kind: Registered handler kind
+            data: JSON-serializable state passed to the handler
+            ttl: Seconds to keep tracking (defaults to the store TTL)
+        """
+        evicted = self._pending.set(message_id, PendingReaction(kind=kind, data=data), ttl=ttl)
+
+        if self.persist and self.bot.db:
+            await self.bot.db.save_pending_reaction(
+                message_id, kind, data, self._pending.expires_at(message_id)
+            )
+            for old_id in evicted:
+                await self.bot.db.delete_pending_reaction(old_id)
+
+    async def untrack(self, message_id: int) -> None:
+        """Stop routing reactions for a message."""
+        self._pending.pop(message_id)
+        if self.persist and self.bot.db:
+            await self.bot.db.delete_pending_reaction(message_id)
+
+    async def purge(self) -> int:
+        """Drop expired entries from memory and the database."""
+        expired = self._pending.purge_expired()
+        if self.persist and self.bot.db:
+            await self.bot.db.purge_expired_reactions(time.time())
+        return len(expired)
+
+    async def dispatch(self, payload: discord.RawReactionActionEvent) -> None:
+        """Hand a reaction to the handler tracking its message, if any."""
+        pending = self._pending.get(payload.message_id)
+        if pending is None:
+            return
+
+        handler = self._handlers.get(pending.kind)
+        if handler is None:
+            logger.warning(f"No reaction handler for kind {pending.kind}")
+            return
+
+        try:
+            await handler(payload, pending.data)
+        except Exception as e:
+            logger.exception(f"Reaction handler {pending.kind} failed: {e}")
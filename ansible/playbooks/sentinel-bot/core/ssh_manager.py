@@ -32,6 +32,7 @@ class SSHManager:
     def __init__(self, ssh_config):
         self.config = ssh_config
         self._connections: Dict[str, asyncssh.SSHClientConnection] = {}
+        self._connect_locks: Dict[str, asyncio.Lock] = {}
 
     @property
     def key_path(self) -> str:
@@ -55,33 +56,35 @@ class SSHManager:
         user = user or self.user
         cache_key = f"{user}@{host}"
 
-        # Check for existing connection
-        if not force_new and cache_key in self._connections:
-            conn = self._connections[cache_key]
-            # Verify connection is still alive
+        # One connection attempt per host at a time, so concurrent callers share it
+        async with self._connect_locks.setdefault(cache_key, asyncio.Lock()):
+            # Check for existing connection
+            if not force_new and cache_key in self._connections:
+                conn = self._connections[cache_key]
+                # Verify connection is still alive
+                try:
+                    # Quick test
+                    await asyncio.wait_for(conn.run('echo ok', check=False), timeout=5)
+                    return conn
+                except Exception:
+                    # Connection dead, remove from cache
+                    del self._connections[cache_key]
+
+            # Create new connection
             try:
-                # Quick test
-                await asyncio.wait_for(conn.run('echo ok', check=False), timeout=5)
+                conn = await asyncssh.connect(
+                    host,
+                    username=user,
+                    client_keys=[self.key_path],
+                    known_hosts=None,  # Accept all host keys
+                    connect_timeout=10,
+                )
+                self._connections[cache_key] = conn
+                logger.debug(f"SSH connected to {cache_key}")
                 return conn
-            except Exception:
-                # Connection dead, remove from cache
-                del self._connections[cache_key]
-
-        # Create new connection
-        try:
-            conn = await asyncssh.connect(
-                host,
-                username=user,
-                client_keys=[self.key_path],
-                known_hosts=None,  # Accept all host keys
-                connect_timeout=10,
-            )
-            self._connections[cache_key] = conn
-            logger.debug(f"SSH connected to {cache_key}")
-            return conn
-        except asyncssh.Error as e:
-            logger.error(f"SSH connection failed to {cache_key}: {e}")
-            raise
+            except asyncssh.Error as e:
+                logger.error(f"SSH connection failed to {cache_key}: {e}")
+                raise
 
     async def run(
         self,
@@ -15,8 +15,10 @@ Plus new features:
 
 import asyncio
 import logging
+import os
 import signal
 import sys
+import threading
 from typing import Optional
 
 from dotenv import load_dotenv
@@ -61,6 +63,7 @@ def setup_logging() -> None:
     logging.getLogger('sentinel.database').setLevel(logging.INFO)
     logging.getLogger('sentinel.ssh').setLevel(logging.INFO)
     logging.getLogger('sentinel.router').setLevel(logging.INFO)
+    logging.getLogger('sentinel.webhooks').setLevel(logging.INFO)
 
 
 class SentinelRunner:
@@ -71,6 +74,13 @@ class SentinelRunner:
         self.webhook_server = None
         self.logger = logging.getLogger('sentinel.runner')
 
+        # Webhook isolation (WEBHOOK_MODE=thread|process)
+        self.ipc_server = None
+        self.webhook_process: Optional[asyncio.subprocess.Process] = None
+        self._webhook_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._webhook_shutdown: Optional[asyncio.Event] = None
+        self._stopping = False
+
     async def start(self) -> None:
         """Start the bot and webhook server."""
         config = load_config()
@@ -82,37 +92,97 @@ class SentinelRunner:
         # Create bot instance
         self.bot = SentinelBot(config)
 
-        # Start webhook server in background
-        asyncio.create_task(self._start_webhook_server(config))
+        # Start webhook server (same loop, own thread loop, or child process)
+        await self._start_webhooks(config)
 
         # Start the bot
         self.logger.info("Starting Sentinel Bot...")
         await self.bot.start(config.discord.token)
 
-    async def _start_webhook_server(self, config) -> None:
+    async def _start_webhooks(self, config) -> None:
+        """Start the webhook server according to WEBHOOK_MODE."""
+        mode = config.webhook.mode
+
+        if mode == 'thread':
+            self._start_webhook_thread(config)
+        elif mode == 'process':
+            from webhooks.ipc import IPCServer
+            self.ipc_server = IPCServer(self.bot, config.webhook.ipc_socket)
+            await self.ipc_server.start()
+            self.webhook_server = asyncio.create_task(self._supervise_webhook_process())
+        else:
+            from webhooks.bridge import InlineBridge
+            self.webhook_server = asyncio.create_task(
+                self._start_webhook_server(InlineBridge(self.bot), config)
+            )
+
+    async def _start_webhook_server(self, bridge, config, shutdown_trigger=None) -> None:
         """Start the Quart webhook server."""
         try:
-            from webhooks.server import create_app
-            app = create_app(self.bot, config)
+            from webhooks.server import create_app, build_hypercorn_config
+            app = create_app(bridge, config)
 
             # Run with hypercorn for async support
             from hypercorn.asyncio import serve
-            from hypercorn.config import Config as HypercornConfig
-
-            hypercorn_config = HypercornConfig()
-            hypercorn_config.bind = [f"0.0.0.0:{config.webhook.port}"]
-            hypercorn_config.accesslog = '-'  # Log to stdout
 
-            self.logger.info(f"Starting webhook server on port {config.webhook.port}")
-            await serve(app, hypercorn_config)
+            self.logger.info(f"Starting webhook server on port {config.webhook.port} ({config.webhook.mode} mode)")
+            await serve(app, build_hypercorn_config(config), shutdown_trigger=shutdown_trigger)
         except ImportError:
             self.logger.warning("Webhook server not available (missing webhooks module)")
         except Exception as e:
             self.logger.error(f"Webhook server error: {e}")
 
+    def _start_webhook_thread(self, config) -> None:
+        """Run the webhook server on a dedicated thread with its own event loop."""
+        from webhooks.bridge import ThreadBridge
+        bridge = ThreadBridge(self.bot, asyncio.get_running_loop())
+
+        def run() -> None:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            self._webhook_shutdown = asyncio.Event()
+            self._webhook_loop = loop
+            try:
+                loop.run_until_complete(
+                    self._start_webhook_server(bridge, config, shutdown_trigger=self._webhook_shutdown.wait)
+                )
+            finally:
+                loop.close()
+
+        threading.Thread(target=run, name='sentinel-webhooks', daemon=True).start()
+
+    async def _supervise_webhook_process(self) -> None:
+        """Run the webhook server as a child process, restarting it if it exits."""
+        app_dir = os.path.dirname(os.path.abspath(__file__))
+
+        while not self._stopping:
+            self.webhook_process = await asyncio.create_subprocess_exec(
+                sys.executable, '-m', 'webhooks.process',
+                cwd=app_dir
+            )
+            self.logger.info(f"Webhook process started (pid {self.webhook_process.pid})")
+
+            code = await self.webhook_process.wait()
+            if self._stopping:
+                break
+
+            self.logger.warning(f"Webhook process exited with code {code}, restarting in 5s")
+            await asyncio.sleep(5)
+
     async def stop(self) -> None:
         """Gracefully stop the bot."""
         self.logger.info("Shutting down Sentinel...")
+        self._stopping = True
+
+        if self.webhook_process and self.webhook_process.returncode is None:
+            self.webhook_process.terminate()
+            await self.webhook_process.wait()
+
+        if self.ipc_server:
+            await self.ipc_server.stop()
+
+        if self._webhook_loop and not self._webhook_loop.is_closed():
+            self._webhook_loop.call_soon_threadsafe(self._webhook_shutdown.set)
 
         if self.bot:
             await self.bot.close()
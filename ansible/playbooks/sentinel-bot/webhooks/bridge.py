@@ -0,0 +1,97 @@
+"""
+Sentinel Bot Webhook Bridge
+How the webhook app reaches the bot: directly, across threads, or over IPC.
+"""
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Dict
+
+if TYPE_CHECKING:
+    from core import SentinelBot
+
+logger = logging.getLogger('sentinel.webhooks.bridge')
+
+# Bot calls the webhook app may make (method -> whether its result is returned).
+# Methods whose result is dropped are fire-and-forget notifications, which are
+# skipped when their target is not initialized yet.
+BOT_CALLS: Dict[str, bool] = {
+    'db.get_pending_tasks': True,
+    'db.create_task': True,
+    'db.get_next_task': True,
+    'db.claim_task': True,
+    'db.complete_task': True,
+    'db.update_instance_heartbeat': True,
+    'db.get_active_instances': True,
+    'db.get_task_stats': True,
+    'channel_router.send_update_notification': False,
+    'channel_router.send_media_notification': False,
+    'channel_router.send_task_notification': False,
+}
+
+
+class BotUnavailable(Exception):
+    """The bot (or the component a call needs) cannot be reached right now."""
+
+
+async def dispatch(bot: 'SentinelBot', method: str, args: list, kwargs: dict) -> Any:
+    """
+    Execute an exposed bot call on the bot's event loop.
+
+    Args:
+        bot: The running bot
+        method: 'status' or a key of BOT_CALLS
+        args: Positional arguments
+        kwargs: Keyword arguments
+
+    Returns:
+        The call result (None for notifications)
+    """
+    if method == 'status':
+        return {'ready': bot.is_ready(), 'guilds': len(bot.guilds)}
+
+    if method not in BOT_CALLS:
+        raise ValueError(f"Bot call not exposed: {method}")
+
+    returns_result = BOT_CALLS[method]
+    target_name, func_name = method.split('.', 1)
+    target = getattr(bot, target_name, None)
+
+    if target is None:
+        if returns_result:
+            raise BotUnavailable(f"{target_name} not available")
+        return None
+
+    result = await getattr(target, func_name)(*args, **kwargs)
+    return result if returns_result else None
+
+
+class InlineBridge:
+    """Calls the bot directly; the app shares the bot's event loop."""
+
+    def __init__(self, bot: 'SentinelBot'):
+        self.bot = bot
+
+    async def call(self, method: str, *args, **kwargs) -> Any:
+        return await dispatch(self.bot, method, list(args), kwargs)
+
+    async def close(self) -> None:
+        pass
+
+
+class ThreadBridge:
+    """Runs bot calls on the bot's loop from an app running on another thread's loop."""
+
+    def __init__(self, bot: 'SentinelBot', bot_loop: asyncio.AbstractEventLoop):
+        self.bot = bot
+        self.bot_loop = bot_loop
+
+    async def call(self, method: str, *args, **kwargs) -> Any:
+        future = asyncio.run_coroutine_threadsafe(
+            dispatch(self.bot, method, list(args), kwargs),
+            self.bot_loop
+        )
+        return await asyncio.wrap_future(future)
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,214 @@
+"""
+Sentinel Bot Webhook IPC
+Unix socket RPC between the bot and an out-of-process webhook server.
+
+Frames are a 4-byte big-endian length followed by a msgpack body:
+    request:  {'id': int, 'method': str, 'args': list, 'kwargs': dict}
+    response: {'id': int, 'result': any} or {'id': int, 'error': str, 'unavailable': bool}
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import struct
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set
+
+import msgpack
+
+from .bridge import BotUnavailable, dispatch
+
+if TYPE_CHECKING:
+    from core import SentinelBot
+
+logger = logging.getLogger('sentinel.webhooks.ipc')
+
+HEADER = struct.Struct('!I')
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+
+class IPCError(Exception):
+    """A bot call failed on the other side of the socket."""
+
+
+def encode_frame(message: Dict[str, Any]) -> bytes:
+    """Serialize a message into a length-prefixed msgpack frame."""
+    body = msgpack.packb(message, use_bin_type=True)
+    return HEADER.pack(len(body)) + body
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Dict[str, Any]:
+    """Read one frame. Raises asyncio.IncompleteReadError when the peer closes."""
+    header = await reader.readexactly(HEADER.size)
+    (size,) = HEADER.unpack(header)
+    if size > MAX_FRAME_SIZE:
+        raise IPCError(f"Frame too large: {size} bytes")
+    body = await reader.readexactly(size)
+    return msgpack.unpackb(body, raw=False)
+
+
+class IPCServer:
+    """Bot-side socket server that executes webhook calls on the bot loop."""
+
+    def __init__(self, bot: 'SentinelBot', path: str):
+        self.bot = bot
+        self.path = path
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: Set[asyncio.StreamWriter] = set()
+
+    async def start(self) -> None:
+        """Start listening, replacing a stale socket file."""
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        self._server = await asyncio.start_unix_server(self._handle_client, path=self.path)
+        os.chmod(self.path, 0o600)
+        logger.info(f"IPC server listening on {self.path}")
+
+    async def stop(self) -> None:
+        """Stop listening, drop connected clients and remove the socket file."""
+        if self._server:
+            self._server.close()
+            for writer in list(self._clients):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one connection; each request runs as its own task."""
+        write_lock = asyncio.Lock()
+        pending = set()
+        self._clients.add(writer)
+
+        try:
+            while True:
+                request = await read_frame(reader)
+                task = asyncio.create_task(self._respond(request, writer, write_lock))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.error(f"IPC connection error: {e}")
+        finally:
+            self._clients.discard(writer)
+            for task in pending:
+                task.cancel()
+            writer.close()
+
+    async def _respond(
+        self,
+        request: Dict[str, Any],
+        writer: asyncio.StreamWriter,
+        write_lock: asyncio.Lock
+    ) -> None:
+        """Execute a request and write its response frame."""
+        response: Dict[str, Any] = {'id': request.get('id')}
+        try:
+            response['result'] = await dispatch(
+                self.bot,
+                request.get('method', ''),
+                request.get('args') or [],
+                request.get('kwargs') or {}
+            )
+        except BotUnavailable as e:
+            response['error'] = str(e)
+            response['unavailable'] = True
+        except Exception as e:
+            logger.error(f"IPC call {request.get('method')} failed: {e}")
+            response['error'] = str(e)
+            response['unavailable'] = False
+
+        async with write_lock:
+            writer.write(encode_frame(response))
+            await writer.drain()
+
+
+class IPCBridge:
+    """App-side client: one multiplexed connection, reconnected on demand."""
+
+    def __init__(self, path: str, timeout: float = 30):
+        self.path = path
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._connect_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+
+    async def call(self, method: str, *args, **kwargs) -> Any:
+        """Invoke a bot call and wait for its result."""
+        await self._ensure_connected()
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        try:
+            async with self._write_lock:
+                self._writer.write(encode_frame({
+                    'id': request_id,
+                    'method': method,
+                    'args': list(args),
+                    'kwargs': kwargs,
+                }))
+                await self._writer.drain()
+            return await asyncio.wait_for(future, timeout=self.timeout)
+        except (ConnectionError, asyncio.TimeoutError) as e:
+            raise BotUnavailable(f"Bot IPC call {method} failed: {e or 'timeout'}") from e
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def close(self) -> None:
+        """Close the connection."""
+        if self._reader_task:
+            self._reader_task.cancel()
+        if self._writer:
+            self._writer.close()
+        self._writer = None
+        self._reader = None
+
+    async def _ensure_connected(self) -> None:
+        """Connect (or reconnect) to the bot's IPC socket."""
+        if self._writer and not self._writer.is_closing():
+            return
+
+        async with self._connect_lock:
+            if self._writer and not self._writer.is_closing():
+                return
+            try:
+                self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+            except OSError as e:
+                raise BotUnavailable(f"Bot IPC socket unavailable: {e}") from e
+
+            self._reader_task = asyncio.create_task(self._read_responses(self._reader))
+            logger.info(f"Connected to bot IPC at {self.path}")
+
+    async def _read_responses(self, reader: asyncio.StreamReader) -> None:
+        """Resolve pending calls as responses arrive."""
+        try:
+            while True:
+                response = await read_frame(reader)
+                future = self._pending.get(response.get('id'))
+                if future is None or future.done():
+                    continue
+
+                if 'error' in response:
+                    error_cls = BotUnavailable if response.get('unavailable') else IPCError
+                    future.set_exception(error_cls(response['error']))
+                else:
+                    future.set_result(response.get('result'))
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            logger.warning(f"Bot IPC connection lost: {e}")
+        finally:
+            if self._writer:
+                self._writer.close()
+            self._writer = None
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(BotUnavailable("Bot IPC connection lost"))
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Sentinel Bot Webhook Load Test
+Measures how responsive the bot's event loop stays while the webhook API is busy.
+
+Starts the webhook server in each given WEBHOOK_MODE against a stub bot and
+samples the bot loop's scheduling delay (what gateway heartbeats and
+interaction acknowledgements wait on), first idle and then while concurrent
+clients hit /api/tasks:
+    python -m webhooks.loadtest [inline] [thread] [process] [--clients N] [--seconds S]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import threading
+import time
+from typing import Dict, List
+
+import aiohttp
+
+from config import load_config
+
+MODES = ('inline', 'thread', 'process')
+PROBE_INTERVAL = 0.01
+BASE_PORT = 5099
+
+
+class StubDatabase:
+    """Answers the webhook API's database calls with canned data."""
+
+    async def get_pending_tasks(self, limit: int = 10) -> List[Dict]:
+        return [
+            {'id': i, 'description': f'Load test task {i}', 'priority': 'medium', 'status': 'pending'}
+            for i in range(limit)
+        ]
+
+    async def get_task_stats(self) -> Dict[str, int]:
+        return {'pending': 50, 'claimed': 0, 'completed': 0}
+
+    async def get_active_instances(self, minutes: int = 10) -> List[Dict]:
+        return []
+
+
+class StubBot:
+    """The parts of SentinelBot the webhook bridge touches."""
+
+    def __init__(self):
+        self.db = StubDatabase()
+        self.channel_router = None
+        self.guilds = []
+
+    def is_ready(self) -> bool:
+        return True
+
+    async def close(self) -> None:
+        pass
+
+
+async def probe_loop(seconds: float) -> List[float]:
+    """Scheduling delay of PROBE_INTERVAL sleeps on the running loop, in ms."""
+    delays = []
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        delays.append((time.perf_counter() - started - PROBE_INTERVAL) * 1000)
+    return delays
+
+
+async def generate_load(port: int, clients: int, seconds: float) -> int:
+    """Hit /api/tasks from concurrent clients; returns the number of requests."""
+    url = f"http://127.0.0.1:{port}/api/tasks"
+    end = time.monotonic() + seconds
+    count = 0
+
+    async with aiohttp.ClientSession() as session:
+        async def client():
+            nonlocal count
+            while time.monotonic() < end:
+                async with session.get(url) as resp:
+                    await resp.read()
+                count += 1
+
+        await asyncio.gather(*(client() for _ in range(clients)))
+    return count
+
+
+async def wait_for_server(port: int, timeout: float = 15) -> None:
+    """Wait until the webhook server answers /health."""
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while True:
+            try:
+                async with session.get(f"http://127.0.0.1:{port}/health") as resp:
+                    if resp.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Webhook server did not start on port {port}")
+            await asyncio.sleep(0.2)
+
+
+def percentiles(delays: List[float]) -> str:
+    ordered = sorted(delays)
+    p99 = ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)]
+    return f"p50 {statistics.median(ordered):6.2f} ms  p99 {p99:6.2f} ms  max {ordered[-1]:6.2f} ms"
+
+
+async def run_mode(mode: str, port: int, clients: int, seconds: float) -> None:
+    """Measure one webhook mode; the load generator runs on its own thread and loop."""
+    from sentinel import SentinelRunner
+
+    # The process-mode child reads its settings from the environment
+    os.environ['WEBHOOK_MODE'] = mode
+    os.environ['WEBHOOK_PORT'] = str(port)
+    os.environ['WEBHOOK_ACCESS_LOG'] = 'false'
+    config = load_config()
+
+    runner = SentinelRunner()
+    runner.bot = StubBot()
+    await runner._start_webhooks(config)
+    try:
+        await wait_for_server(port)
+        idle = await probe_loop(min(seconds, 2))
+
+        requests_done = []
+        load_thread = threading.Thread(
+            target=lambda: requests_done.append(asyncio.run(generate_load(port, clients, seconds))),
+            name='loadtest-clients'
+        )
+        load_thread.start()
+        busy = await probe_loop(seconds)
+        await asyncio.to_thread(load_thread.join)
+
+        print(f"{mode:<8} idle        {percentiles(idle)}")
+        print(f"{mode:<8} under load  {percentiles(busy)}  ({requests_done[0] / seconds:.0f} req/s, {clients} clients)")
+    finally:
+        await runner.stop()
+        if mode == 'inline' and runner.webhook_server:
+            # Inline mode has no shutdown trigger; the bot closing normally ends it
+            runner.webhook_server.cancel()
+            await asyncio.gather(runner.webhook_server, return_exceptions=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('modes', nargs='*', metavar='mode', help='inline, thread and/or process (default: all)')
+    parser.add_argument('--clients', type=int, default=20, help='concurrent API clients (default 20)')
+    parser.add_argument('--seconds', type=float, default=5, help='load duration per mode (default 5)')
+    args = parser.parse_args()
+
+    modes = args.modes or list(MODES)
+    for mode in modes:
+        if mode not in MODES:
+            parser.error(f"unknown mode: {mode}")
+
+    for offset, mode in enumerate(modes):
+        asyncio.run(run_mode(mode, BASE_PORT + offset, args.clients, args.seconds))
+
+
+if __name__ == '__main__':
+    main()
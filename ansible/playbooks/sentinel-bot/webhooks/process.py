@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Sentinel Bot Webhook Process
+Runs the webhook server in its own process, talking to the bot over IPC.
+
+Started by SentinelRunner when WEBHOOK_MODE=process:
+    python -m webhooks.process
+"""
+
+import asyncio
+import logging
+import sys
+
+from dotenv import load_dotenv
+
+from config import load_config
+from webhooks.ipc import IPCBridge
+from webhooks.server import build_hypercorn_config, create_app
+
+load_dotenv()
+
+logger = logging.getLogger('sentinel.webhooks.process')
+
+
+async def main() -> None:
+    """Serve the webhook app until terminated."""
+    from hypercorn.asyncio import serve
+
+    config = load_config()
+    bridge = IPCBridge(config.webhook.ipc_socket)
+    app = create_app(bridge, config)
+
+    logger.info(f"Starting webhook process on port {config.webhook.port} (IPC: {config.webhook.ipc_socket})")
+    try:
+        await serve(app, build_hypercorn_config(config))
+    finally:
+        await bridge.close()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S',
+        stream=sys.stdout
+    )
+    asyncio.run(main())
@@ -9,8 +9,9 @@ from typing import TYPE_CHECKING
 
 from quart import Quart, request, jsonify
 
+from .bridge import BotUnavailable
+
 if TYPE_CHECKING:
-    from core import SentinelBot
     from config import Config
 
 logger = logging.getLogger('sentinel.webhooks')
@@ -30,22 +31,66 @@ def require_api_key(f):
     return decorated
 
 
-def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
-    """Create and configure the Quart application."""
+def build_hypercorn_config(config: 'Config'):
+    """Hypercorn settings shared by every webhook server mode."""
+    from hypercorn.config import Config as HypercornConfig
+
+    hypercorn_config = HypercornConfig()
+    hypercorn_config.bind = [f"0.0.0.0:{config.webhook.port}"]
+    if config.webhook.access_log:
+        hypercorn_config.accesslog = '-'  # Log to stdout
+    return hypercorn_config
+
+
+def create_app(bridge, config: 'Config') -> Quart:
+    """
+    Create and configure the Quart application.
+
+    Args:
+        bridge: InlineBridge, ThreadBridge or IPCBridge used to reach the bot
+        config: Sentinel configuration
+    """
     app = Quart(__name__)
     app.config['API_KEY'] = config.webhook.api_key
-    app.bot = bot
+    app.bridge = bridge
     app.sentinel_config = config
 
+    def db_unavailable():
+        return jsonify({'error': 'Database not available'}), 503
+
+    async def notify_task(**kwargs):
+        """
+        Send a task notification after the task change is already stored.
+
+        Returns a warning message instead of raising, so a Discord failure
+        doesn't turn a completed change into an error the client retries.
+        """
+        try:
+            await bridge.call('channel_router.send_task_notification', **kwargs)
+        except Exception as e:
+            logger.warning(f"Task notification failed for task {kwargs.get('task_id')}: {e}")
+            return f"Task notification failed: {e}"
+        return None
+
+    def with_warning(body: dict, warning):
+        if warning:
+            body['warning'] = warning
+        return body
+
     # ==================== Health Check ====================
 
     @app.route('/health', methods=['GET'])
     async def health():
         """Health check endpoint."""
+        try:
+            status = await bridge.call('status')
+        except BotUnavailable:
+            status = {'ready': False, 'guilds': 0}
+
         return jsonify({
             'status': 'healthy',
-            'bot_ready': bot.is_ready() if bot else False,
-            'guilds': len(bot.guilds) if bot else 0,
+            'bot_ready': status['ready'],
+            'guilds': status['guilds'],
         })
 
     # ==================== Watchtower Webhook ====================
@@ -66,8 +111,9 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
                 status = entry.get('status', 'updated')
                 image = entry.get('image', 'unknown')
 
-                if container and bot.channel_router:
-                    await bot.channel_router.send_update_notification(
+                if container:
+                    await bridge.call(
+                        'channel_router.send_update_notification',
                         container_name=container,
                         host_ip='watchtower',
                         status='success' if status == 'updated' else status,
@@ -106,17 +152,17 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
             }
             event = event_map.get(notification_type, notification_type)
 
-            if bot.channel_router:
-                await bot.channel_router.send_media_notification(
-                    title=title,
-                    media_type=media_type,
-                    event=event,
-                    poster_url=f"https://image.tmdb.org/t/p/w500{poster}" if poster else None,
-                    details={
-                        'Requested By': request_info.get('requestedBy', {}).get('username', 'Unknown'),
-                        'Status': event.title(),
-                    }
-                )
+            await bridge.call(
+                'channel_router.send_media_notification',
+                title=title,
+                media_type=media_type,
+                event=event,
+                poster_url=f"https://image.tmdb.org/t/p/w500{poster}" if poster else None,
+                details={
+                    'Requested By': request_info.get('requestedBy', {}).get('username', 'Unknown'),
+                    'Status': event.title(),
+                }
+            )
 
             return jsonify({'status': 'ok'})
         except Exception as e:
@@ -129,11 +175,10 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
     async def list_tasks():
         """List pending tasks."""
         try:
-            if not bot.db:
-                return jsonify({'error': 'Database not available'}), 503
-
-            tasks = await bot.db.get_pending_tasks(limit=50)
+            tasks = await bridge.call('db.get_pending_tasks', limit=50)
             return jsonify({'tasks': tasks})
+        except BotUnavailable:
+            return db_unavailable()
         except Exception as e:
             logger.error(f"List tasks error: {e}")
             return jsonify({'error': str(e)}), 500
@@ -142,9 +187,6 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
     async def create_task():
         """Create a new task."""
         try:
-            if not bot.db:
-                return jsonify({'error': 'Database not available'}), 503
-
             data = await request.get_json()
             description = data.get('description')
             priority = data.get('priority', 'medium')
@@ -153,21 +195,23 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
             if not description:
                 return jsonify({'error': 'description required'}), 400
 
-            task_id = await bot.db.create_task(
+            task_id = await bridge.call(
+                'db.create_task',
                 description=description,
                 priority=priority,
                 submitted_by=submitted_by
             )
 
             # Notify via Discord
-            if bot.channel_router:
-                await bot.channel_router.send_task_notification(
-                    task_id=task_id,
-                    description=description,
-                    event='created'
-                )
+            warning = await notify_task(
+                task_id=task_id,
+                description=description,
+                event='created'
+            )
 
-            return jsonify({'task_id': task_id, 'status': 'created'}), 201
+            return jsonify(with_warning({'task_id': task_id, 'status': 'created'}, warning)), 201
+        except BotUnavailable:
+            return db_unavailable()
         except Exception as e:
             logger.error(f"Create task error: {e}")
             return jsonify({'error': str(e)}), 500
@@ -176,13 +220,12 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
     async def get_next_task():
         """Get the next available task."""
         try:
-            if not bot.db:
-                return jsonify({'error': 'Database not available'}), 503
-
-            task = await bot.db.get_next_task()
+            task = await bridge.call('db.get_next_task')
             if task:
                 return jsonify({'task': task})
             return jsonify({'task': None, 'message': 'No pending tasks'})
+        except BotUnavailable:
+            return db_unavailable()
         except Exception as e:
             logger.error(f"Get next task error: {e}")
             return jsonify({'error': str(e)}), 500
@@ -191,9 +234,6 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
     async def claim_task(task_id: int):
         """Claim a task for processing."""
         try:
-            if not bot.db:
-                return jsonify({'error': 'Database not available'}), 503
-
             data = await request.get_json()
             instance_id = data.get('instance_id')
             instance_name = data.get('instance_name')
@@ -201,25 +241,26 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
             if not instance_id:
                 return jsonify({'error': 'instance_id required'}), 400
 
-            success = await bot.db.claim_task(task_id, instance_id, instance_name)
+            success = await bridge.call('db.claim_task', task_id, instance_id, instance_name)
 
             if success:
                 # Update instance heartbeat
-                await bot.db.update_instance_heartbeat(instance_id, instance_name or instance_id, 'working')
+                await bridge.call('db.update_instance_heartbeat', instance_id, instance_name or instance_id, 'working')
 
                 # Notify via Discord
-                if bot.channel_router:
-                    task = await bot.db.get_pending_tasks(limit=100)
-                    task_desc = next((t['description'] for t in task if t['id'] == task_id), 'Unknown')
-                    await bot.channel_router.send_task_notification(
-                        task_id=task_id,
-                        description=task_desc,
-                        event='claimed',
-                        instance_name=instance_name
-                    )
+                task = await bridge.call('db.get_pending_tasks', limit=100)
+                task_desc = next((t['description'] for t in task if t['id'] == task_id), 'Unknown')
+                warning = await notify_task(
+                    task_id=task_id,
+                    description=task_desc,
+                    event='claimed',
+                    instance_name=instance_name
+                )
 
-                return jsonify({'status': 'claimed'})
+                return jsonify(with_warning({'status': 'claimed'}, warning))
             return jsonify({'error': 'Task not available'}), 409
+        except BotUnavailable:
+            return db_unavailable()
         except Exception as e:
             logger.error(f"Claim task error: {e}")
             return jsonify({'error': str(e)}), 500
@@ -228,9 +269,6 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
     async def complete_task(task_id: int):
         """Mark a task as completed."""
         try:
-            if not bot.db:
-                return jsonify({'error': 'Database not available'}), 503
-
             data = await request.get_json()
             instance_id = data.get('instance_id')
             notes = data.get('notes')
@@ -238,23 +276,24 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
             if not instance_id:
                 return jsonify({'error': 'instance_id required'}), 400
 
-            success = await bot.db.complete_task(task_id, instance_id, notes)
+            success = await bridge.call('db.complete_task', task_id, instance_id, notes)
 
             if success:
                 # Update instance heartbeat
-                await bot.db.update_instance_heartbeat(instance_id, instance_id, 'idle')
+                await bridge.call('db.update_instance_heartbeat', instance_id, instance_id, 'idle')
 
                 # Notify via Discord
-                if bot.channel_router:
-                    await bot.channel_router.send_task_notification(
-                        task_id=task_id,
-                        description=notes or 'Task completed',
-                        event='completed',
-                        instance_name=instance_id
-                    )
+                warning = await notify_task(
+                    task_id=task_id,
+                    description=notes or 'Task completed',
+                    event='completed',
+                    instance_name=instance_id
+                )
 
-                return jsonify({'status': 'completed'})
+                return jsonify(with_warning({'status': 'completed'}, warning))
             return jsonify({'error': 'Task not found or not claimed by this instance'}), 404
+        except BotUnavailable:
+            return db_unavailable()
         except Exception as e:
             logger.error(f"Complete task error: {e}")
             return jsonify({'error': str(e)}), 500
@@ -263,11 +302,10 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
     async def list_instances():
         """List active Claude instances."""
         try:
-            if not bot.db:
-                return jsonify({'error': 'Database not available'}), 503
-
-            instances = await bot.db.get_active_instances(minutes=10)
+            instances = await bridge.call('db.get_active_instances', minutes=10)
             return jsonify({'instances': instances})
+        except BotUnavailable:
+            return db_unavailable()
         except Exception as e:
             logger.error(f"List instances error: {e}")
             return jsonify({'error': str(e)}), 500
@@ -276,9 +314,6 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
     async def instance_heartbeat():
         """Record instance heartbeat."""
         try:
-            if not bot.db:
-                return jsonify({'error': 'Database not available'}), 503
-
             data = await request.get_json()
             instance_id = data.get('instance_id')
             instance_name = data.get('instance_name')
@@ -287,8 +322,10 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
             if not instance_id:
                 return jsonify({'error': 'instance_id required'}), 400
 
-            await bot.db.update_instance_heartbeat(instance_id, instance_name or instance_id, status)
+            await bridge.call('db.update_instance_heartbeat', instance_id, instance_name or instance_id, status)
             return jsonify({'status': 'ok'})
+        except BotUnavailable:
+            return db_unavailable()
         except Exception as e:
             logger.error(f"Heartbeat error: {e}")
             return jsonify({'error': str(e)}), 500
@@ -299,16 +336,15 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
     async def get_stats():
         """Get task queue statistics."""
         try:
-            if not bot.db:
-                return jsonify({'error': 'Database not available'}), 503
-
-            task_stats = await bot.db.get_task_stats()
-            instances = await bot.db.get_active_instances(minutes=10)
+            task_stats = await bridge.call('db.get_task_stats')
+            instances = await bridge.call('db.get_active_instances', minutes=10)
 
             return jsonify({
                 'tasks': task_stats,
                 'active_instances': len(instances),
             })
+        except BotUnavailable:
+            return db_unavailable()
         except Exception as e:
             logger.error(f"Stats error: {e}")
             return jsonify({'error': str(e)}), 500